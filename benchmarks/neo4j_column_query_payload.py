@@ -0,0 +1,133 @@
+"""
+Compares Bolt payload size and decode time of Neo4jProxy._exec_col_query result shapes per column count.
+
+  - row per column: db, clstr, schema, tbl, tbl_dscrpt, col, col_dscrpt nodes and stat nodes on every column row
+  - collected: table context returned once and columns collected as projected maps of name, type, sort_order,
+    description and stats
+
+Records are packed and unpacked with the PackStream implementation of neo4j-driver, the same way the records are
+serialized over Bolt. Decode time covers PackStream unpacking only, not hydration into driver types.
+
+Usage:
+    python3 benchmarks/neo4j_column_query_payload.py [column_count ...]
+"""
+import sys
+import timeit
+from io import BytesIO
+from typing import Any, Dict, List  # noqa: F401
+
+from neo4j.packstream import Packer, Structure, Unpacker
+
+NODE = b'N'
+DEFAULT_COLUMN_COUNTS = [10, 100, 1000, 2000, 5000]
+REPEAT = 5
+
+
+class _Source:
+    """
+    Minimal in-memory source for PackStream Unpacker
+    """
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._position = 0
+
+    def read(self, n: int = 1) -> memoryview:
+        value = self._data[self._position:self._position + n]
+        self._position += n
+        return value
+
+    def read_int(self) -> int:
+        if self._position >= len(self._data):
+            return -1
+        value = self._data[self._position]
+        self._position += 1
+        return value
+
+
+def _node(node_id: int, label: str, properties: Dict[str, Any]) -> Structure:
+    return Structure(NODE, node_id, [label], properties)
+
+
+def _stats(column_index: int) -> List[Dict[str, Any]]:
+    return [{'stat_name': stat_name, 'stat_val': str(column_index), 'start_epoch': '1570000000',
+             'end_epoch': '1570086400'} for stat_name in ('avg', 'max', 'min')]
+
+
+def _column(column_index: int) -> Dict[str, Any]:
+    return {'name': 'column_{}'.format(column_index),
+            'type': 'varchar',
+            'sort_order': column_index,
+            'key': 'hive://gold.foo_schema/foo_table/column_{}'.format(column_index)}
+
+
+def row_per_column_records(column_count: int) -> List[List[Any]]:
+    table_uri = 'hive://gold.foo_schema/foo_table'
+    db = _node(1, 'Database', {'name': 'hive', 'key': 'database://hive'})
+    clstr = _node(2, 'Cluster', {'name': 'gold', 'key': 'hive://gold'})
+    schema = _node(3, 'Schema', {'name': 'foo_schema', 'key': 'hive://gold.foo_schema'})
+    tbl = _node(4, 'Table', {'name': 'foo_table', 'key': table_uri, 'is_view': False})
+    tbl_dscrpt = _node(5, 'Description', {'description': 'foo description ' * 8,
+                                          'key': table_uri + '/_description'})
+
+    records = []
+    for i in range(column_count):
+        col = _column(i)
+        col_dscrpt = _node(100000 + i, 'Description',
+                           {'description': 'column description {}'.format(i), 'key': col['key'] + '/_description'})
+        col_stats = [_node(200000 + i * 3 + j, 'Stat', dict(stat, key=col['key'] + '/' + stat['stat_name']))
+                     for j, stat in enumerate(_stats(i))]
+        records.append([db, clstr, schema, tbl, tbl_dscrpt, _node(10000 + i, 'Column', col), col_dscrpt, col_stats])
+    return records
+
+
+def collected_records(column_count: int) -> List[List[Any]]:
+    cols = []
+    for i in range(column_count):
+        col = _column(i)
+        cols.append({'name': col['name'],
+                     'type': col['type'],
+                     'sort_order': col['sort_order'],
+                     'description': 'column description {}'.format(i),
+                     'stats': _stats(i)})
+    return [['hive', 'gold', 'foo_schema', 'foo_table', False, 'foo description ' * 8, cols]]
+
+
+def _pack(records: List[List[Any]]) -> bytes:
+    buffer = BytesIO()
+    packer = Packer(buffer)
+    for record in records:
+        packer.pack(record)
+    return buffer.getvalue()
+
+
+def _unpack(data: bytes, record_count: int) -> None:
+    unpacker = Unpacker()
+    unpacker.attach(_Source(data))
+    for _ in range(record_count):
+        unpacker.unpack()
+
+
+def _decode_ms(data: bytes, record_count: int) -> float:
+    return min(timeit.repeat(lambda: _unpack(data, record_count), number=1, repeat=REPEAT)) * 1000
+
+
+def main(column_counts: List[int]) -> None:
+    print('{:>8} {:>14} {:>14} {:>8} {:>12} {:>12} {:>8}'.format(
+        'columns', 'row bytes', 'collect bytes', 'saved', 'row ms', 'collect ms', 'saved'))
+
+    for column_count in column_counts:
+        rows = row_per_column_records(column_count)
+        collected = collected_records(column_count)
+
+        rows_data = _pack(rows)
+        collected_data = _pack(collected)
+        rows_ms = _decode_ms(rows_data, len(rows))
+        collected_ms = _decode_ms(collected_data, len(collected))
+
+        print('{:>8} {:>14} {:>14} {:>7.1%} {:>12.2f} {:>12.2f} {:>7.1%}'.format(
+            column_count, len(rows_data), len(collected_data), 1 - len(collected_data) / len(rows_data),
+            rows_ms, collected_ms, 1 - collected_ms / rows_ms))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COLUMN_COUNTS)
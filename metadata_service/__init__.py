@@ -7,14 +7,19 @@ from typing import Dict, Any  # noqa: F401
 
 from flask import Flask, Blueprint
 from flask_restful import Api
+from werkzeug.utils import import_string
 
+from metadata_service import config
+
+from metadata_service.api.change import ChangeAPI
 from metadata_service.api.column import ColumnDescriptionAPI
 from metadata_service.api.healthcheck import healthcheck
 from metadata_service.api.popular_tables import PopularTablesAPI
 from metadata_service.api.system import Neo4jDetailAPI
 from metadata_service.api.table \
-    import TableDetailAPI, TableOwnerAPI, TableTagAPI, TableDescriptionAPI
-from metadata_service.api.tag import TagAPI
+    import DescriptionBulkAPI, TableBulkAPI, TableColumnsAPI, TableDetailAPI, TableOwnerAPI, TableTagAPI, \
+    TableDescriptionAPI, TableUsageBulkAPI
+from metadata_service.api.tag import TagAPI, TagTablesAPI
 from metadata_service.api.user import UserDetailAPI, UserFollowAPI, UserOwnAPI, UserReadAPI
 
 # For customized flask use below arguments to override.
@@ -70,9 +75,15 @@ def create_app(*, config_module_class: str) -> Flask:
 
     api.add_resource(PopularTablesAPI, '/popular_tables/')
     api.add_resource(TableDetailAPI, '/table/<path:table_uri>')
+    api.add_resource(TableColumnsAPI, '/table/<path:table_uri>/columns')
+    api.add_resource(TableBulkAPI, '/tables')
     api.add_resource(TableDescriptionAPI,
                      '/table/<path:table_uri>/description',
                      '/table/<path:table_uri>/description/<path:description_val>')
+    api.add_resource(DescriptionBulkAPI,
+                     '/descriptions')
+    api.add_resource(TableUsageBulkAPI,
+                     '/table_usages')
     api.add_resource(TableTagAPI,
                      '/table/<path:table_uri>/tag',
                      '/table/<path:table_uri>/tag/<tag>')
@@ -83,8 +94,12 @@ def create_app(*, config_module_class: str) -> Flask:
                      '/table/<path:table_uri>/column/<column_name>/description/<path:description_val>')
     api.add_resource(Neo4jDetailAPI,
                      '/latest_updated_ts')
+    api.add_resource(ChangeAPI,
+                     '/changes')
     api.add_resource(TagAPI,
                      '/tags/')
+    api.add_resource(TagTablesAPI,
+                     '/tags/<tag>/tables')
     api.add_resource(UserDetailAPI,
                      '/user/<path:user_id>')
     api.add_resource(UserFollowAPI,
@@ -98,4 +113,21 @@ def create_app(*, config_module_class: str) -> Flask:
                      '/user/<path:user_id>/read/<resource_type>/<path:table_uri>')
     app.register_blueprint(api_bp)
 
+    if app.config.get(config.NEO4J_SCHEMA_BOOTSTRAP):
+        _bootstrap_neo4j_schema(app)
+
     return app
+
+
+def _bootstrap_neo4j_schema(app: Flask) -> None:
+    # Imported here, as the proxy client is imported only once it is configured
+    from metadata_service.proxy.neo4j_proxy import Neo4jProxy, bootstrap_schema
+
+    if issubclass(import_string(app.config[config.PROXY_CLIENT]), Neo4jProxy):
+        # Bootstraps Neo4j schema at start up, so that the service fails to start in strict mode. The proxy client
+        # isn't created here, as its background threads wouldn't survive the fork of pre-fork servers' workers.
+        bootstrap_schema(host=app.config[config.PROXY_HOST],
+                         port=app.config[config.PROXY_PORT],
+                         user=app.config[config.PROXY_USER],
+                         password=app.config[config.PROXY_PASSWORD],
+                         strict=app.config[config.NEO4J_SCHEMA_STRICT])
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from flask import request
+from werkzeug.http import unquote_etag
+
+
+def get_if_match_etag() -> Optional[str]:
+    """
+    ETag of the If-Match request header, or None if there is no header or it matches any ETag with *.
+    Only a single ETag is supported.
+    """
+    etag, _ = unquote_etag(request.headers.get('If-Match'))
+    return None if etag == '*' else etag
@@ -0,0 +1,33 @@
+import json
+from http import HTTPStatus
+from typing import Any, Iterator
+
+from flask import Response, request
+from flask_restful import Resource
+
+from metadata_service.proxy.change_log import get_change_log
+
+
+class ChangeAPI(Resource):
+    """
+    ChangeAPI streams change log records with seq greater than since query parameter, as newline delimited JSON.
+    Indexers can pass the seq of the last record they have processed to get only the newer changes.
+    """
+
+    def get(self) -> Any:
+        change_log = get_change_log()
+        if change_log is None:
+            return {'message': 'Change log is not enabled'}, HTTPStatus.NOT_FOUND
+
+        try:
+            since = int(request.args.get('since', 0))
+        except ValueError:
+            return {'message': 'since must be an integer'}, HTTPStatus.BAD_REQUEST
+        if since < 0:
+            return {'message': 'since must not be negative'}, HTTPStatus.BAD_REQUEST
+
+        def generate() -> Iterator[str]:
+            for record in change_log.read(since=since):
+                yield json.dumps(record, separators=(',', ':')) + '\n'
+
+        return Response(generate(), mimetype='application/x-ndjson')
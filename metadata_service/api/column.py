@@ -2,9 +2,12 @@ from http import HTTPStatus
 from typing import Iterable, Union
 
 from flask_restful import Resource, reqparse
+from werkzeug.http import quote_etag
 
-from metadata_service.exception import NotFoundException
+from metadata_service.api import get_if_match_etag
+from metadata_service.exception import NotFoundException, PreconditionFailedException
 from metadata_service.proxy import get_proxy_client
+from metadata_service.util import get_description_etag
 
 
 class ColumnDescriptionAPI(Resource):
@@ -24,28 +27,34 @@ class ColumnDescriptionAPI(Resource):
             column_name: str,
             description_val: str) -> Iterable[Union[dict, tuple, int, None]]:
         """
-        Updates column description
+        Updates column description. With If-Match header, the update is applied only if the current description
+        has that ETag.
         """
         try:
             self.client.put_column_description(table_uri=table_uri,
                                                column_name=column_name,
-                                               description=description_val)
+                                               description=description_val,
+                                               etag=get_if_match_etag())
 
-            return None, HTTPStatus.OK
+            return None, HTTPStatus.OK, {'ETag': quote_etag(get_description_etag(description_val))}
 
         except NotFoundException:
             msg = 'table_uri {} with column {} does not exist'.format(table_uri, column_name)
             return {'message': msg}, HTTPStatus.NOT_FOUND
 
+        except PreconditionFailedException:
+            msg = 'description of table_uri {} with column {} has changed'.format(table_uri, column_name)
+            return {'message': msg}, HTTPStatus.PRECONDITION_FAILED
+
     def get(self, table_uri: str, column_name: str) -> Union[tuple, int, None]:
         """
-        Gets column descriptions in Neo4j
+        Gets column descriptions in Neo4j, with its ETag in ETag header
         """
         try:
             description = self.client.get_column_description(table_uri=table_uri,
                                                              column_name=column_name)
 
-            return {'description': description}, HTTPStatus.OK
+            return {'description': description}, HTTPStatus.OK, {'ETag': quote_etag(get_description_etag(description))}
 
         except NotFoundException:
             msg = 'table_uri {} with column {} does not exist'.format(table_uri, column_name)
@@ -1,10 +1,16 @@
+import json
+from collections import OrderedDict
 from http import HTTPStatus
-from typing import Iterable, Mapping, Union, Any
+from typing import Iterable, Iterator, List, Mapping, Optional, Tuple, Union, Any  # noqa: F401
 
+from flask import request
 from flask_restful import Resource, fields, reqparse, marshal
+from werkzeug.http import quote_etag
 
-from metadata_service.exception import NotFoundException
+from metadata_service.api import get_if_match_etag
+from metadata_service.exception import NotFoundException, NotSupportedException, PreconditionFailedException
 from metadata_service.proxy import get_proxy_client
+from metadata_service.util import get_description_etag
 
 
 user_fields = {
@@ -77,13 +83,22 @@ table_detail_fields = {
     'table_writer': fields.Nested(table_writer_fields),  # Optional
     'last_updated_timestamp': fields.Integer,  # Optional
     'source': fields.Nested(source_fields),  # Optional
-    'is_view': fields.Boolean  # Optional
+    'is_view': fields.Boolean,  # Optional
+    'column_count': fields.Integer
+}
+
+table_columns_fields = {
+    'columns': fields.List(fields.Nested(column_fields)),
+    'offset': fields.Integer,
+    'limit': fields.Integer
 }
 
 
 class TableDetailAPI(Resource):
     """
     TableDetail API
+    Passing include_columns=false query parameter leaves columns empty and only returns column_count, which is useful
+    for very wide tables whose columns are paged through TableColumnsAPI.
     """
 
     def __init__(self) -> None:
@@ -91,13 +106,82 @@ class TableDetailAPI(Resource):
 
     def get(self, table_uri: str) -> Iterable[Union[Mapping, int, None]]:
         try:
-            table = self.client.get_table(table_uri=table_uri)
+            if request.args.get('include_columns', 'true').lower() == 'false':
+                table = self.client.get_table(table_uri=table_uri, include_columns=False)
+            else:
+                table = self.client.get_table(table_uri=table_uri)
             return marshal(table, table_detail_fields), HTTPStatus.OK
 
         except NotFoundException:
             return {'message': 'table_uri {} does not exist'.format(table_uri)}, HTTPStatus.NOT_FOUND
 
 
+class TableColumnsAPI(Resource):
+    """
+    TableColumns API to page through columns of a table ordered by sort order, with offset and limit query parameters
+    """
+    DEFAULT_LIMIT = 100
+    MAX_LIMIT = 1000
+
+    def __init__(self) -> None:
+        self.client = get_proxy_client()
+
+    def get(self, table_uri: str) -> Iterable[Union[Mapping, int, None]]:
+        try:
+            offset = int(request.args.get('offset', 0))
+            limit = int(request.args.get('limit', TableColumnsAPI.DEFAULT_LIMIT))
+        except ValueError:
+            return {'message': 'offset and limit need to be integers'}, HTTPStatus.BAD_REQUEST
+
+        if offset < 0 or not 0 < limit <= TableColumnsAPI.MAX_LIMIT:
+            return {'message': 'offset needs to be non-negative and limit needs to be between 1 and {}'
+                    .format(TableColumnsAPI.MAX_LIMIT)}, HTTPStatus.BAD_REQUEST
+
+        try:
+            columns = self.client.get_columns(table_uri=table_uri, offset=offset, limit=limit)
+            return marshal({'columns': columns, 'offset': offset, 'limit': limit}, table_columns_fields), \
+                HTTPStatus.OK
+
+        except NotFoundException:
+            return {'message': 'table_uri {} does not exist'.format(table_uri)}, HTTPStatus.NOT_FOUND
+
+
+class TableBulkAPI(Resource):
+    """
+    TableBulk API to fetch detail of many tables in one call.
+    Table uris are passed as repeated uri query parameters on GET, or as table_uris list in the JSON body on POST.
+    """
+    MAX_TABLE_URIS = 1000
+
+    def __init__(self) -> None:
+        self.client = get_proxy_client()
+
+    def get(self) -> Iterable[Union[Mapping, int, None]]:
+        return self._get_tables(request.args.getlist('uri'))
+
+    def post(self) -> Iterable[Union[Mapping, int, None]]:
+        body = request.get_json(silent=True) or {}
+        table_uris = body.get('table_uris') if isinstance(body, dict) else None
+        if not isinstance(table_uris, list) or not all(isinstance(uri, str) and uri for uri in table_uris):
+            return {'message': 'table_uris list of strings is required'}, HTTPStatus.BAD_REQUEST
+        return self._get_tables(table_uris)
+
+    def _get_tables(self, table_uris: List[str]) -> Iterable[Union[Mapping, int, None]]:
+        if not table_uris:
+            return {'message': 'At least one table uri is required'}, HTTPStatus.BAD_REQUEST
+        if len(table_uris) > TableBulkAPI.MAX_TABLE_URIS:
+            return {'message': 'At most {} table uris are allowed'.format(TableBulkAPI.MAX_TABLE_URIS)}, \
+                HTTPStatus.BAD_REQUEST
+
+        # Removes duplicates while keeping the requested order
+        table_uris = list(OrderedDict.fromkeys(table_uris))
+        tables = self.client.get_tables(table_uris=table_uris)
+
+        return {'tables': [marshal(tables[table_uri], table_detail_fields)
+                           for table_uri in table_uris if table_uri in tables],
+                'not_found': [table_uri for table_uri in table_uris if table_uri not in tables]}, HTTPStatus.OK
+
+
 class TableOwnerAPI(Resource):
     """
     TableOwner API to add / delete owner info
@@ -143,11 +227,11 @@ class TableDescriptionAPI(Resource):
 
     def get(self, table_uri: str) -> Iterable[Any]:
         """
-        Returns description in Neo4j endpoint
+        Returns description in Neo4j endpoint, with its ETag in ETag header
         """
         try:
             description = self.client.get_table_description(table_uri=table_uri)
-            return {'description': description}, HTTPStatus.OK
+            return {'description': description}, HTTPStatus.OK, {'ETag': quote_etag(get_description_etag(description))}
 
         except NotFoundException:
             return {'message': 'table_uri {} does not exist'.format(table_uri)}, HTTPStatus.NOT_FOUND
@@ -157,18 +241,97 @@ class TableDescriptionAPI(Resource):
 
     def put(self, table_uri: str, description_val: str) -> Iterable[Any]:
         """
-        Updates table description
+        Updates table description. With If-Match header, the update is applied only if the current description
+        has that ETag.
         :param table_uri:
         :param description_val:
         :return:
         """
         try:
-            self.client.put_table_description(table_uri=table_uri, description=description_val)
-            return None, HTTPStatus.OK
+            self.client.put_table_description(table_uri=table_uri, description=description_val,
+                                              etag=get_if_match_etag())
+            return None, HTTPStatus.OK, {'ETag': quote_etag(get_description_etag(description_val))}
 
         except NotFoundException:
             return {'message': 'table_uri {} does not exist'.format(table_uri)}, HTTPStatus.NOT_FOUND
 
+        except PreconditionFailedException:
+            return {'message': 'description of table_uri {} has changed'.format(table_uri)}, \
+                HTTPStatus.PRECONDITION_FAILED
+
+
+class DescriptionBulkAPI(Resource):
+    """
+    DescriptionBulkAPI to upsert many table and column descriptions at once.
+    Items are passed as descriptions list of {table_uri, column_name (optional), description} in the JSON body.
+    """
+    def __init__(self) -> None:
+        self.client = get_proxy_client()
+
+    def put(self) -> Iterable[Any]:
+        body = request.get_json(silent=True) or {}
+        descriptions = body.get('descriptions')
+        if not descriptions or not isinstance(descriptions, list):
+            return {'message': 'descriptions list is required'}, HTTPStatus.BAD_REQUEST
+
+        for item in descriptions:
+            if not isinstance(item, dict) or not isinstance(item.get('table_uri'), str) \
+                    or not isinstance(item.get('description'), str) \
+                    or not isinstance(item.get('column_name') or '', str):
+                return {'message': 'Each description needs table_uri and description strings, '
+                                   'and optional column_name string'}, HTTPStatus.BAD_REQUEST
+
+        applied = self.client.put_descriptions_bulk(descriptions=descriptions)
+
+        return {'results': [{'table_uri': item['table_uri'],
+                             'column_name': item.get('column_name'),
+                             'status': 'updated' if is_applied else 'not_found'}
+                            for item, is_applied in zip(descriptions, applied)]}, HTTPStatus.OK
+
+
+class TableUsageBulkAPI(Resource):
+    """
+    TableUsageBulkAPI to set how many times users read tables, e.g. from query logs.
+    Usages are passed as newline delimited JSON of {user_email, table_uri, read_count} in the body, and are applied
+    in chunks while the body is read. On an invalid line, the usages before it are applied, and the 400 response has
+    the number of usages received and applied so far.
+    """
+    def __init__(self) -> None:
+        self.client = get_proxy_client()
+
+    def put(self) -> Iterable[Any]:
+        received = 0
+        error = None  # type: Optional[str]
+
+        def parse_usages() -> Iterator[Tuple[str, str, int]]:
+            # Stops at the first invalid line, so that the proxy applies the usages before it and returns their number
+            nonlocal received, error
+            for line_number, line in enumerate(request.stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    usage = json.loads(line)
+                except ValueError:
+                    error = 'Line {} is not valid JSON'.format(line_number)
+                    return
+                if not isinstance(usage, dict) or not isinstance(usage.get('user_email'), str) \
+                        or not isinstance(usage.get('table_uri'), str) \
+                        or type(usage.get('read_count')) is not int or usage['read_count'] < 0:
+                    error = 'Line {} needs user_email and table_uri strings, ' \
+                            'and non-negative read_count integer'.format(line_number)
+                    return
+                received += 1
+                yield usage['user_email'], usage['table_uri'], usage['read_count']
+
+        try:
+            applied = self.client.put_table_usages_bulk(usages=parse_usages())
+        except NotSupportedException as e:
+            return {'message': str(e)}, HTTPStatus.NOT_IMPLEMENTED
+
+        if error is not None:
+            return {'message': error, 'received': received, 'applied': applied}, HTTPStatus.BAD_REQUEST
+        return {'received': received, 'applied': applied}, HTTPStatus.OK
+
 
 class TableTagAPI(Resource):
     """
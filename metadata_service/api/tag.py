@@ -1,6 +1,8 @@
+from collections import OrderedDict
 from http import HTTPStatus
 from typing import Iterable, Union, Mapping
 
+from flask import request
 from flask_restful import Resource, fields, marshal
 
 from metadata_service.proxy import get_proxy_client
@@ -27,3 +29,32 @@ class TagAPI(Resource):
         """
         tag_usages = self.client.get_tags()
         return marshal({'tag_usages': tag_usages}, tag_usage_fields), HTTPStatus.OK
+
+
+class TagTablesAPI(Resource):
+    """
+    TagTables API to add a tag to many tables at once. Table uris are passed as table_uris list in the JSON body.
+    """
+    def __init__(self) -> None:
+        self.client = get_proxy_client()
+        super(TagTablesAPI, self).__init__()
+
+    def put(self, tag: str) -> Iterable[Union[Mapping, int, None]]:
+        """
+        API to add a tag to existing tables. Tables that do not exist are skipped and returned as not_found.
+
+        :param tag:
+        :return:
+        """
+        body = request.get_json(silent=True) or {}
+        table_uris = body.get('table_uris') if isinstance(body, dict) else None
+        if not table_uris or not isinstance(table_uris, list) \
+                or not all(isinstance(uri, str) and uri for uri in table_uris):
+            return {'message': 'table_uris list of strings is required'}, HTTPStatus.BAD_REQUEST
+
+        # Removes duplicates while keeping the requested order
+        table_uris = list(OrderedDict.fromkeys(table_uris))
+        not_found = self.client.add_tags_bulk(table_uris=table_uris, tag=tag)
+
+        return {'message': 'The tag {} is added to {} tables'.format(tag, len(table_uris) - len(not_found)),
+                'not_found': not_found}, HTTPStatus.OK
@@ -0,0 +1,51 @@
+"""
+Checks that Neo4j has the uniqueness constraints on key that Neo4jProxy lookups rely on, and creates the missing ones.
+
+Usage:
+    python3 -m metadata_service.bootstrap_neo4j_schema [--check-only] [--strict]
+
+Neo4j is the one the service is configured with, through METADATA_SVC_CONFIG_MODULE_CLASS. With --strict, exits with
+status 1 if any constraint is still missing.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional  # noqa: F401
+
+from flask import Flask
+from werkzeug.utils import import_string
+
+from metadata_service import config
+from metadata_service.proxy.neo4j_proxy import Neo4jProxy, bootstrap_schema
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Checks and creates the Neo4j constraints of the metadata service')
+    parser.add_argument('--check-only', action='store_true', help='Only check, without creating missing constraints')
+    parser.add_argument('--strict', action='store_true', help='Exit with status 1 if any constraint is missing')
+    args = parser.parse_args(argv)
+
+    # Only the config of the service is needed. create_app isn't used, as it would bootstrap with
+    # NEO4J_SCHEMA_BOOTSTRAP, creating the missing constraints, or failing in strict mode, before they are checked here
+    app = Flask(__name__)
+    app.config.from_object(os.getenv('METADATA_SVC_CONFIG_MODULE_CLASS') or 'metadata_service.config.LocalConfig')
+
+    if not issubclass(import_string(app.config[config.PROXY_CLIENT]), Neo4jProxy):
+        print('Proxy client {} is not Neo4j'.format(app.config[config.PROXY_CLIENT]), file=sys.stderr)
+        return 2
+
+    missing = bootstrap_schema(host=app.config[config.PROXY_HOST],
+                               port=app.config[config.PROXY_PORT],
+                               user=app.config[config.PROXY_USER],
+                               password=app.config[config.PROXY_PASSWORD],
+                               create_missing=not args.check_only)
+
+    if missing:
+        print('Missing uniqueness constraint on key of {}'.format(', '.join(missing)), file=sys.stderr)
+        return 1 if args.strict else 0
+    print('All uniqueness constraints are in place')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,6 +15,42 @@ PROXY_CLIENTS = {
 
 IS_STATSD_ON = 'IS_STATSD_ON'
 
+TABLE_CACHE_MAX_SIZE = 'TABLE_CACHE_MAX_SIZE'
+TABLE_CACHE_TTL_SEC = 'TABLE_CACHE_TTL_SEC'
+
+PROXY_CACHE_TYPE = 'PROXY_CACHE_TYPE'
+PROXY_CACHE_DATA_DIR = 'PROXY_CACHE_DATA_DIR'
+PROXY_CACHE_LOCK_DIR = 'PROXY_CACHE_LOCK_DIR'
+PROXY_CACHE_MAX_STALE_SEC = 'PROXY_CACHE_MAX_STALE_SEC'
+PROXY_TAGS_CACHE_EXPIRY_SEC = 'PROXY_TAGS_CACHE_EXPIRY_SEC'
+PROXY_SINGLE_FLIGHT = 'PROXY_SINGLE_FLIGHT'
+
+CHANGE_LOG_PATH = 'CHANGE_LOG_PATH'
+
+# Neo4j proxy configuration keys
+NEO4J_CONCURRENT_TABLE_QUERY = 'NEO4J_CONCURRENT_TABLE_QUERY'
+NEO4J_TABLE_QUERY_MAX_WORKERS = 'NEO4J_TABLE_QUERY_MAX_WORKERS'
+NEO4J_SINGLE_TABLE_DETAIL_QUERY = 'NEO4J_SINGLE_TABLE_DETAIL_QUERY'
+NEO4J_BULK_TABLE_BATCH_SIZE = 'NEO4J_BULK_TABLE_BATCH_SIZE'
+NEO4J_BULK_WRITE_BATCH_SIZE = 'NEO4J_BULK_WRITE_BATCH_SIZE'
+NEO4J_RELATION_WRITE_BEHIND = 'NEO4J_RELATION_WRITE_BEHIND'
+NEO4J_RELATION_FLUSH_INTERVAL_SEC = 'NEO4J_RELATION_FLUSH_INTERVAL_SEC'
+NEO4J_RELATION_QUEUE_MAX_SIZE = 'NEO4J_RELATION_QUEUE_MAX_SIZE'
+NEO4J_POPULAR_TABLES_REFRESH_INTERVAL_SEC = 'NEO4J_POPULAR_TABLES_REFRESH_INTERVAL_SEC'
+NEO4J_POPULAR_TABLES_PRECOMPUTE_SIZE = 'NEO4J_POPULAR_TABLES_PRECOMPUTE_SIZE'
+NEO4J_SESSION_ACQUISITION_TIMEOUT_SEC = 'NEO4J_SESSION_ACQUISITION_TIMEOUT_SEC'
+NEO4J_SCHEMA_BOOTSTRAP = 'NEO4J_SCHEMA_BOOTSTRAP'
+NEO4J_SCHEMA_STRICT = 'NEO4J_SCHEMA_STRICT'
+
+# Atlas proxy configuration keys
+ATLAS_ENTITY_CACHE_MAX_SIZE = 'ATLAS_ENTITY_CACHE_MAX_SIZE'
+ATLAS_ENTITY_CACHE_TTL_SEC = 'ATLAS_ENTITY_CACHE_TTL_SEC'
+ATLAS_TAG_COUNT_MAX_WORKERS = 'ATLAS_TAG_COUNT_MAX_WORKERS'
+ATLAS_CLASSIFICATION_DEFS_CACHE_EXPIRY_SEC = 'ATLAS_CLASSIFICATION_DEFS_CACHE_EXPIRY_SEC'
+ATLAS_POPULAR_TABLES_DSL_PAGE_SIZE = 'ATLAS_POPULAR_TABLES_DSL_PAGE_SIZE'
+ATLAS_ENTITY_BULK_CHUNK_SIZE = 'ATLAS_ENTITY_BULK_CHUNK_SIZE'
+ATLAS_ENTITY_BULK_MAX_WORKERS = 'ATLAS_ENTITY_BULK_MAX_WORKERS'
+
 
 class Config:
     LOG_FORMAT = '%(asctime)s.%(msecs)03d [%(levelname)s] %(module)s.%(funcName)s:%(lineno)d (%(process)d:'\
@@ -27,6 +63,66 @@ class Config:
 
     IS_STATSD_ON = False
 
+    # Read-through cache of the proxy's get_table, keyed by table uri and invalidated by the proxy's own updates on
+    # the table. The cache is per process, so an update made through another process becomes visible to this one
+    # after TABLE_CACHE_TTL_SEC at most. Max size of 0 disables the cache.
+    TABLE_CACHE_MAX_SIZE = 0
+    TABLE_CACHE_TTL_SEC = 60
+
+    # Beaker cache type of proxy level caches such as popular tables and tags. 'memory' keeps a copy per process,
+    # where 'dbm' or 'file' stores entries under PROXY_CACHE_DATA_DIR, shared by all the processes on the host, and
+    # only one process recomputes an expired entry, holding a file lock under PROXY_CACHE_LOCK_DIR
+    # (defaults to a directory under PROXY_CACHE_DATA_DIR).
+    PROXY_CACHE_TYPE = os.environ.get('PROXY_CACHE_TYPE', 'memory')
+    PROXY_CACHE_DATA_DIR = os.environ.get('PROXY_CACHE_DATA_DIR')
+    PROXY_CACHE_LOCK_DIR = os.environ.get('PROXY_CACHE_LOCK_DIR')
+    # Seconds an expired popular tables or tags entry is still served while it's recomputed in the background.
+    # Callers block on the computation only after that. 0 disables stale-while-revalidate.
+    PROXY_CACHE_MAX_STALE_SEC = 0
+    # Seconds to cache get_tags, invalidated by the proxy's own tag updates. 0 disables the cache.
+    PROXY_TAGS_CACHE_EXPIRY_SEC = 0
+
+    # Concurrent identical reads of the proxy (get_table, get_user_detail, get_tags and get_popular_tables) share one
+    # in-flight backend call and its result.
+    PROXY_SINGLE_FLIGHT = False
+
+    # File that the proxy appends a change record to on every metadata update, served by /changes. None disables it.
+    # Processes sharing the file need to be on the same host.
+    CHANGE_LOG_PATH = os.environ.get('CHANGE_LOG_PATH')
+
+    # Runs the column, usage and table level queries of Neo4jProxy.get_table at the same time, each on its own
+    # pooled session. The worker pool is shared by all requests and bounded by NEO4J_TABLE_QUERY_MAX_WORKERS.
+    NEO4J_CONCURRENT_TABLE_QUERY = False
+    NEO4J_TABLE_QUERY_MAX_WORKERS = 10
+    # Fetches everything Neo4jProxy.get_table needs with one Cypher statement instead of three.
+    # Takes precedence over NEO4J_CONCURRENT_TABLE_QUERY.
+    NEO4J_SINGLE_TABLE_DETAIL_QUERY = False
+    # Number of tables fetched by each UNWIND query of Neo4jProxy.get_tables
+    NEO4J_BULK_TABLE_BATCH_SIZE = 50
+    # Number of items written by each UNWIND transaction of Neo4jProxy bulk updates such as add_tags_bulk
+    NEO4J_BULK_WRITE_BATCH_SIZE = 500
+    # Queues follow and read relation updates of Neo4jProxy and writes them from a background thread every
+    # NEO4J_RELATION_FLUSH_INTERVAL_SEC seconds, in batches of NEO4J_BULK_WRITE_BATCH_SIZE. Updates become visible after
+    # the flush. Once NEO4J_RELATION_QUEUE_MAX_SIZE updates are pending, new ones are written synchronously.
+    NEO4J_RELATION_WRITE_BEHIND = False
+    NEO4J_RELATION_FLUSH_INTERVAL_SEC = 1
+    NEO4J_RELATION_QUEUE_MAX_SIZE = 10000
+    # Recomputes popular table ranking every NEO4J_POPULAR_TABLES_REFRESH_INTERVAL_SEC seconds and serves
+    # get_popular_tables from it, top NEO4J_POPULAR_TABLES_PRECOMPUTE_SIZE tables at most. The ranking is kept in a
+    # proxy level cache, which a background thread of each process reads every interval, so that with shared
+    # PROXY_CACHE_TYPE only one process on the host recomputes it. Requests before the first read wait for it.
+    # 0 disables the refresher, where the ranking is computed on request and cached for about 11 hours.
+    NEO4J_POPULAR_TABLES_REFRESH_INTERVAL_SEC = 0
+    NEO4J_POPULAR_TABLES_PRECOMPUTE_SIZE = 500
+    # Seconds a Neo4jProxy call waits for one of its num_conns sessions before it fails
+    NEO4J_SESSION_ACQUISITION_TIMEOUT_SEC = 60
+    # Checks at start up that every label Neo4jProxy looks up by key has a uniqueness constraint on key, and creates
+    # the missing ones. Without the constraint and its index, the lookups become label scans. A constraint that is
+    # still missing, e.g. because of duplicate keys, is logged as a warning, or fails the start up with
+    # NEO4J_SCHEMA_STRICT. The same check is available as python3 -m metadata_service.bootstrap_neo4j_schema.
+    NEO4J_SCHEMA_BOOTSTRAP = False
+    NEO4J_SCHEMA_STRICT = False
+
     # Used to differentiate tables with other entities in Atlas. For more details:
     # https://github.com/lyft/amundsenmetadatalibrary/blob/master/docs/proxy/atlas_proxy.md
     ATLAS_TABLE_ENTITY = 'Table'
@@ -39,6 +135,24 @@ class Config:
     # Atlas uses qualifiedName as indexed attribute. but also supports 'name' attribute.
     ATLAS_NAME_ATTRIBUTE = 'qualifiedName'
 
+    # Max number of table entities, full or lean, that AtlasProxy keeps in memory for reads, and
+    # seconds each entry lives. 0 disables the cache. Entries are invalidated on the proxy's own updates, while updates
+    # made directly in Atlas become visible after ATLAS_ENTITY_CACHE_TTL_SEC. Table GUIDs are kept the same way.
+    ATLAS_ENTITY_CACHE_MAX_SIZE = 0
+    ATLAS_ENTITY_CACHE_TTL_SEC = 60
+    # AtlasProxy.get_tags counts the tables of each classification with a DSL count query, running up to
+    # ATLAS_TAG_COUNT_MAX_WORKERS queries at the same time. The counts are cached as PROXY_TAGS_CACHE_EXPIRY_SEC and
+    # PROXY_CACHE_MAX_STALE_SEC configure, and the classification names for ATLAS_CLASSIFICATION_DEFS_CACHE_EXPIRY_SEC.
+    # 0 disables the classification names cache.
+    ATLAS_TAG_COUNT_MAX_WORKERS = 5
+    ATLAS_CLASSIFICATION_DEFS_CACHE_EXPIRY_SEC = 300
+    # AtlasProxy.get_popular_tables pages through the popularity ranking with DSL queries of
+    # ATLAS_POPULAR_TABLES_DSL_PAGE_SIZE GUIDs, and fetches the entities with entity_bulk requests of
+    # ATLAS_ENTITY_BULK_CHUNK_SIZE GUIDs each, running up to ATLAS_ENTITY_BULK_MAX_WORKERS requests at the same time.
+    ATLAS_POPULAR_TABLES_DSL_PAGE_SIZE = 1000
+    ATLAS_ENTITY_BULK_CHUNK_SIZE = 100
+    ATLAS_ENTITY_BULK_MAX_WORKERS = 5
+
 
 class LocalConfig(Config):
     DEBUG = False
@@ -146,6 +146,7 @@ class Table:
                  last_updated_timestamp: Optional[int],
                  source: Optional[Source] = None,
                  is_view: Optional[bool] = None,
+                 column_count: Optional[int] = None,
                  ) -> None:
 
         self.database = database
@@ -155,21 +156,23 @@ class Table:
         self.tags = tags
         self.table_readers = table_readers
         self.description = description
-        self.columns = columns
+        self.columns = list(columns)
         self.owners = owners
         self.watermarks = watermarks
         self.table_writer = table_writer
         self.last_updated_timestamp = last_updated_timestamp
         self.source = source
         self.is_view = is_view or False
+        # Number of columns of the table, which can be given when the columns are not loaded
+        self.column_count = column_count if column_count is not None else len(self.columns)
 
     def __repr__(self) -> str:
         return """Table(database={!r}, cluster={!r}, schema={!r}, name={!r}, tags={!r}, table_readers={!r},
                         description={!r}, columns={!r}, owners={!r}, watermarks={!r}, table_writer={!r},
-                        last_updated_timestamp={!r}, source={!r}, is_view={!r})"""\
+                        last_updated_timestamp={!r}, source={!r}, is_view={!r}, column_count={!r})"""\
             .format(self.database, self.cluster,
                     self.schema, self.name, self.tags,
                     self.table_readers, self.description,
                     self.columns, self.owners, self.watermarks,
                     self.table_writer, self.last_updated_timestamp,
-                    self.source, self.is_view)
+                    self.source, self.is_view, self.column_count)
@@ -2,3 +2,13 @@
 class NotFoundException(Exception):
     def __init__(self, message: str) -> None:
         super().__init__(message)
+
+
+class PreconditionFailedException(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class NotSupportedException(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
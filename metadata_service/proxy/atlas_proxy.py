@@ -1,19 +1,28 @@
 import logging
 import re
-from typing import Union, List, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Union, List, Dict, Any, Iterable, Tuple, Optional
+from weakref import WeakKeyDictionary
 
 from atlasclient.client import Atlas
 from atlasclient.exceptions import BadRequest
-from atlasclient.models import EntityUniqueAttribute
+from atlasclient.models import EntityGuid, EntityUniqueAttribute
 from flask import current_app as app
 
+from metadata_service import config
 from metadata_service.entity.popular_table import PopularTable
 from metadata_service.entity.table_detail import Table, User, Tag, Column, Statistics
 from metadata_service.entity.tag_detail import TagDetail
 from metadata_service.entity.user_detail import User as UserEntity
-from metadata_service.exception import NotFoundException
+from metadata_service.exception import NotFoundException, NotSupportedException, PreconditionFailedException
 from metadata_service.proxy import BaseProxy
-from metadata_service.util import UserResourceRel
+from metadata_service.proxy.cache_utilities import LRUTTLCache, cache_by_table_uri, create_proxy_cache, \
+    create_table_cache, invalidate_by_table_uri, invalidate_by_table_uris, invalidate_entity_by_table_uri, \
+    invalidate_entity_by_table_uris, single_flight
+from metadata_service.proxy.change_log import get_change_log, log_change_by_table_uri, log_change_by_table_uris, \
+    log_changes
+from metadata_service.util import UserResourceRel, get_description_etag
 
 LOGGER = logging.getLogger(__name__)
 
@@ -29,6 +38,8 @@ class AtlasProxy(BaseProxy):
     QN_KEY = 'qualifiedName'
     ATTRS_KEY = 'attributes'
     REL_ATTRS_KEY = 'relationshipAttributes'
+    # Query parameters that leave referred entities and relationship attributes out of the fetched entity
+    LEAN_FETCH_PARAMS = {'minExtInfo': 'true', 'ignoreRelationships': 'true'}
 
     # Table Qualified Name Regex
     TABLE_QN_REGEX = pattern = re.compile(r"""
@@ -44,6 +55,36 @@ class AtlasProxy(BaseProxy):
         Initiate the Apache Atlas client with the provided credentials
         """
         self._driver = Atlas(host=host, port=port, username=user, password=password)
+        self._table_cache = create_table_cache()
+        self._change_log = get_change_log()
+
+        self._tags_cache = create_proxy_cache(namespace='{}.tags'.format(__name__),
+                                              expire_sec=app.config[config.PROXY_TAGS_CACHE_EXPIRY_SEC])
+        self._classification_names_cache = create_proxy_cache(
+            namespace='{}.classification_names'.format(__name__),
+            expire_sec=app.config[config.ATLAS_CLASSIFICATION_DEFS_CACHE_EXPIRY_SEC])
+        self._tag_count_executor = ThreadPoolExecutor(max_workers=app.config[config.ATLAS_TAG_COUNT_MAX_WORKERS],
+                                                      thread_name_prefix='atlas_tag_count')
+        self._popular_tables_dsl_page_size = app.config[config.ATLAS_POPULAR_TABLES_DSL_PAGE_SIZE]  # type: int
+        self._entity_bulk_chunk_size = app.config[config.ATLAS_ENTITY_BULK_CHUNK_SIZE]  # type: int
+        self._entity_bulk_executor = ThreadPoolExecutor(max_workers=app.config[config.ATLAS_ENTITY_BULK_MAX_WORKERS],
+                                                        thread_name_prefix='atlas_entity_bulk')
+
+        # Column details by column name of each loaded table entity, which lives as long as the entity
+        self._column_indexes = WeakKeyDictionary()  # type: WeakKeyDictionary
+        self._column_indexes_lock = Lock()
+
+        # Table entities with their referred entities keyed by table uri, and GUIDs of tables keyed by table uri and
+        # of columns keyed by (table uri, column name)
+        self._entity_cache = None  # type: Optional[LRUTTLCache]
+        self._guid_cache = None  # type: Optional[LRUTTLCache]
+        entity_cache_max_size = app.config[config.ATLAS_ENTITY_CACHE_MAX_SIZE]
+        if entity_cache_max_size:
+            entity_cache_ttl_sec = app.config[config.ATLAS_ENTITY_CACHE_TTL_SEC]
+            self._entity_cache = LRUTTLCache(name='atlas_entity', max_size=entity_cache_max_size,
+                                             ttl_sec=entity_cache_ttl_sec)
+            self._guid_cache = LRUTTLCache(name='atlas_guid', max_size=entity_cache_max_size,
+                                           ttl_sec=entity_cache_ttl_sec)
 
     def _get_ids_from_basic_search(self, *, params: Dict) -> List[str]:
         """
@@ -96,7 +137,10 @@ class AtlasProxy(BaseProxy):
         result = pattern.match(table_uri)
         return result.groupdict() if result else dict()
 
-    def _get_table_entity(self, *, table_uri: str) -> Tuple[EntityUniqueAttribute, Dict]:
+    def _get_table_entity(self, *,
+                          table_uri: str,
+                          use_cache: bool = True,
+                          lean: bool = False) -> Tuple[EntityUniqueAttribute, Dict]:
         """
         Fetch information from table_uri and then find the appropriate entity
         The reason, we're not returning the entity_unique_attribute().entity
@@ -104,19 +148,57 @@ class AtlasProxy(BaseProxy):
         that can be used for update purposes,
         while entity_unique_attribute().entity only returns the dictionary
         :param table_uri:
+        :param use_cache: Whether the entity can be served from and put into the entity cache. Cached entities are
+        shared, so callers that modify the entity to update it need to pass False.
+        :param lean: Fetch only the table's own attributes and classifications, without referred entities such as
+        columns and without relationship attributes. A cached full entity serves lean callers as well.
         :return:
         """
+        entity_cache = self._entity_cache if use_cache else None
+        if entity_cache is not None:
+            found, value = entity_cache.get(table_uri)
+            if found:
+                entity, table_info, is_lean = value
+                if lean or not is_lean:
+                    return entity, table_info
+            generation = entity_cache.generation()
+
         table_info = self._extract_info_from_uri(table_uri=table_uri)
+        params = self.LEAN_FETCH_PARAMS if lean else {}
 
         try:
-            return self._driver.entity_unique_attribute(
+            # The unique attribute has to be the first keyword argument, as atlasclient prefixes only that with attr:
+            entity = self._driver.entity_unique_attribute(
                 table_info['entity'],
-                qualifiedName=table_info.get('name')), table_info
+                qualifiedName=table_info.get('name'),
+                **params)
+            # atlasclient models are lazy, so that the table is fetched, and found or not, on the first access
+            guid = entity.entity['guid']
         except Exception as ex:
             LOGGER.exception(f'Table not found. {str(ex)}')
             raise NotFoundException('Table URI( {table_uri} ) does not exist'
                                     .format(table_uri=table_uri))
 
+        if self._guid_cache is not None:
+            self._guid_cache.put(table_uri, guid)
+        if entity_cache is not None:
+            entity_cache.put(table_uri, (entity, table_info, lean), generation)
+        return entity, table_info
+
+    def _get_table_guid(self, *, table_uri: str) -> str:
+        """
+        GUID of the table, which doesn't change on updates, so that it's served from the GUID cache until it expires
+        :param table_uri:
+        :return:
+        """
+        if self._guid_cache is not None:
+            found, guid = self._guid_cache.get(table_uri)
+            if found:
+                return guid
+
+        entity, _ = self._get_table_entity(table_uri=table_uri, lean=True)
+        return entity.entity['guid']
+
     def _get_column(self, *, table_uri: str, column_name: str) -> Dict:
         """
         Fetch the column information from referredEntities of the table entity
@@ -124,19 +206,73 @@ class AtlasProxy(BaseProxy):
         :param column_name:
         :return: A dictionary containing the column details
         """
-        try:
-            table_entity, _ = self._get_table_entity(table_uri=table_uri)
-            columns = table_entity.entity[self.REL_ATTRS_KEY].get('columns')
-            for column in columns or list():
-                col_details = table_entity.referredEntities[column['guid']]
-                if column_name == col_details[self.ATTRS_KEY][self.NAME_ATTRIBUTE]:
-                    return col_details
-
+        table_entity, _ = self._get_table_entity(table_uri=table_uri)
+        column_index = self._get_column_index(table_uri=table_uri, table_entity=table_entity)
+        if column_name not in column_index:
             raise NotFoundException(f'Column not found: {column_name}')
+        return column_index[column_name]
+
+    def _get_column_index(self, *, table_uri: str, table_entity: EntityUniqueAttribute) -> Dict[str, Dict]:
+        """
+        Column details of the table entity by column name, which is built once per loaded entity, so that cached
+        entities don't need to scan their columns on every lookup. Column GUIDs are put into the GUID cache as well.
+        :param table_uri:
+        :param table_entity:
+        :return: A dictionary of column name to the column details from referredEntities
+        """
+        with self._column_indexes_lock:
+            column_index = self._column_indexes.get(table_entity)
+        if column_index is not None:
+            return column_index
 
+        column_index = dict()
+        try:
+            for column in table_entity.entity[self.REL_ATTRS_KEY].get('columns') or list():
+                col_details = table_entity.referredEntities[column['guid']]
+                column_index[col_details[self.ATTRS_KEY][self.NAME_ATTRIBUTE]] = col_details
         except KeyError as ex:
             LOGGER.exception(f'Column not found: {str(ex)}')
-            raise NotFoundException(f'Column not found: {column_name}')
+            raise NotFoundException(f'Columns of table URI( {table_uri} ) are missing')
+
+        if self._guid_cache is not None:
+            for column_name, col_details in column_index.items():
+                self._guid_cache.put((table_uri, column_name), col_details['guid'])
+        with self._column_indexes_lock:
+            self._column_indexes[table_entity] = column_index
+        return column_index
+
+    def _get_column_entity(self, *, table_uri: str, column_name: str) -> EntityGuid:
+        """
+        Fetch the column entity by its GUID, which is looked up in the table entity unless it's in the GUID cache
+        :param table_uri:
+        :param column_name:
+        :return:
+        """
+        if self._guid_cache is not None:
+            found, col_guid = self._guid_cache.get((table_uri, column_name))
+            if found:
+                # The column might have been deleted, or recreated with a new GUID. atlasclient models are lazy, so
+                # that the entity is accessed here to fetch it.
+                try:
+                    entity = self._driver.entity_guid(col_guid)
+                    if self._is_column_entity(entity=entity.entity, guid=col_guid, column_name=column_name):
+                        return entity
+                except Exception:
+                    LOGGER.exception('Failed to fetch column {} of {} by its cached GUID'
+                                     .format(column_name, table_uri))
+                LOGGER.info('Cached GUID of column {} of {} is stale'.format(column_name, table_uri))
+                self._guid_cache.invalidate((table_uri, column_name))
+
+        col_guid = self._get_column(table_uri=table_uri, column_name=column_name)['guid']
+        return self._driver.entity_guid(col_guid)
+
+    def _is_column_entity(self, *, entity: Dict, guid: str, column_name: str) -> bool:
+        """
+        Whether the fetched entity is still the active column of the given GUID and name
+        """
+        return entity.get('guid') == guid \
+            and entity.get('status', 'ACTIVE') == 'ACTIVE' \
+            and entity.get(self.ATTRS_KEY, {}).get(self.NAME_ATTRIBUTE) == column_name
 
     def _serialize_columns(self, *, entity: EntityUniqueAttribute) -> \
             Union[List[Column], List]:
@@ -178,10 +314,12 @@ class AtlasProxy(BaseProxy):
     def get_user_detail(self, *, user_id: str) -> Union[UserEntity, None]:
         pass
 
-    def get_table(self, *, table_uri: str) -> Table:
+    @cache_by_table_uri
+    def get_table(self, *, table_uri: str, include_columns: bool = True) -> Table:
         """
         Gathers all the information needed for the Table Detail Page.
         :param table_uri:
+        :param include_columns: When False, columns are not serialized and only the number of columns is set
         :return: A Table object with all the information available
         or gathered from different entities.
         """
@@ -201,7 +339,12 @@ class AtlasProxy(BaseProxy):
                     )
                 )
 
-            columns = self._serialize_columns(entity=entity)
+            if include_columns:
+                columns = self._serialize_columns(entity=entity)
+                column_count = None
+            else:
+                columns = []
+                column_count = len(table_details[self.REL_ATTRS_KEY].get('columns') or list())
 
             table = Table(database=table_info['entity'],
                           cluster=table_info['cluster'],
@@ -211,6 +354,7 @@ class AtlasProxy(BaseProxy):
                           description=attrs.get('description'),
                           owners=[User(email=attrs.get('owner'))],
                           columns=columns,
+                          column_count=column_count,
                           last_updated_timestamp=table_details.get('updateTime'))
 
             return table
@@ -221,9 +365,41 @@ class AtlasProxy(BaseProxy):
                              'are missing in : ( {table_uri} )'
                              .format(table_uri=table_uri))
 
+    def get_columns(self, *, table_uri: str, offset: int, limit: int) -> List[Column]:
+        """
+        Retrieves a page of columns of the table ordered by position. Atlas returns all the columns of the table
+        entity as referredEntities, so the page is sliced after serialization.
+        :param table_uri:
+        :param offset: Number of columns to skip
+        :param limit: Max number of columns to return
+        :return: List of Column
+        """
+        entity, _ = self._get_table_entity(table_uri=table_uri)
+        columns = sorted(self._serialize_columns(entity=entity),
+                         key=lambda column: column.sort_order if column.sort_order is not None else -1)
+        return columns[offset:offset + limit]
+
+    def get_tables(self, *, table_uris: List[str]) -> Dict[str, Table]:
+        """
+        Gathers the information of many tables for the Table Detail Page. Atlas doesn't support fetching many
+        entities by unique attributes at once, so each table is fetched with get_table (and its cache).
+        :param table_uris:
+        :return: Dictionary of table uri to Table. Table uris that do not exist are not included.
+        """
+        tables = {}
+        for table_uri in table_uris:
+            try:
+                tables[table_uri] = self.get_table(table_uri=table_uri)
+            except NotFoundException:
+                LOGGER.info('Table not found: %s', table_uri)
+        return tables
+
     def delete_owner(self, *, table_uri: str, owner: str) -> None:
         pass
 
+    @invalidate_by_table_uri
+    @invalidate_entity_by_table_uri
+    @log_change_by_table_uri
     def add_owner(self, *, table_uri: str, owner: str) -> None:
         """
         It simply replaces the owner field in atlas with the new string.
@@ -233,7 +409,7 @@ class AtlasProxy(BaseProxy):
         :param owner: Email address of the owner
         :return: None, as it simply adds the owner.
         """
-        entity, _ = self._get_table_entity(table_uri=table_uri)
+        entity, _ = self._get_table_entity(table_uri=table_uri, use_cache=False, lean=True)
         entity.entity[self.ATTRS_KEY]['owner'] = owner
         entity.update()
 
@@ -243,22 +419,65 @@ class AtlasProxy(BaseProxy):
         :param table_uri:
         :return: The description of the table as a string
         """
-        entity, _ = self._get_table_entity(table_uri=table_uri)
+        entity, _ = self._get_table_entity(table_uri=table_uri, lean=True)
         return entity.entity[self.ATTRS_KEY].get('description')
 
+    @invalidate_by_table_uri
+    @invalidate_entity_by_table_uri
     def put_table_description(self, *,
                               table_uri: str,
-                              description: str) -> None:
+                              description: str,
+                              etag: Optional[str] = None) -> None:
         """
-        Update the description of the given table.
+        Update the description of the given table, unless it is unchanged.
         :param table_uri:
         :param description: Description string
+        :param etag: If given, the update fails with PreconditionFailedException unless the current description has
+        this ETag
         :return: None
         """
-        entity, _ = self._get_table_entity(table_uri=table_uri)
+        entity, _ = self._get_table_entity(table_uri=table_uri, use_cache=False, lean=True)
+        if not self._is_description_changed(entity=entity.entity, description=description, etag=etag):
+            return
+
         entity.entity[self.ATTRS_KEY]['description'] = description
         entity.update()
-
+        log_changes(self._change_log, [(table_uri, 'put_table_description')])
+
+    def _is_description_changed(self, *, entity: Dict, description: str, etag: Optional[str]) -> bool:
+        """
+        Checks the new description against the current one of the entity before it is written.
+        :raises PreconditionFailedException: If etag is given and it is not the ETag of the current description
+        """
+        current_description = entity[self.ATTRS_KEY].get('description')
+        if etag is not None and get_description_etag(current_description) != etag:
+            raise PreconditionFailedException('Description of entity {} has changed'.format(entity.get('guid')))
+        return current_description != description
+
+    def put_descriptions_bulk(self, *, descriptions: List[Dict[str, str]]) -> List[bool]:
+        """
+        Updates many table and column descriptions. Atlas updates attributes entity by entity, so each item is
+        applied with put_table_description or put_column_description.
+        :param descriptions: List of dictionary with table_uri, description and optional column_name
+        :return: Whether each item is applied, in the same order as descriptions
+        """
+        results = []
+        for item in descriptions:
+            try:
+                if item.get('column_name'):
+                    self.put_column_description(table_uri=item['table_uri'],
+                                                column_name=item['column_name'],
+                                                description=item['description'])
+                else:
+                    self.put_table_description(table_uri=item['table_uri'], description=item['description'])
+                results.append(True)
+            except NotFoundException:
+                results.append(False)
+        return results
+
+    @invalidate_by_table_uri
+    @invalidate_entity_by_table_uri
+    @log_change_by_table_uri
     def add_tag(self, *, table_uri: str, tag: str) -> None:
         """
         Assign the tag/classification to the give table
@@ -267,11 +486,40 @@ class AtlasProxy(BaseProxy):
         :param tag: Tag/Classification Name
         :return: None
         """
-        entity, _ = self._get_table_entity(table_uri=table_uri)
         entity_bulk_tag = {"classification": {"typeName": tag},
-                           "entityGuids": [entity.entity['guid']]}
+                           "entityGuids": [self._get_table_guid(table_uri=table_uri)]}
         self._driver.entity_bulk_classification.create(data=entity_bulk_tag)
+        self._invalidate_tags_cache()
 
+    @invalidate_by_table_uris
+    @invalidate_entity_by_table_uris
+    @log_change_by_table_uris
+    def add_tags_bulk(self, *, table_uris: List[str], tag: str) -> List[str]:
+        """
+        Assign the tag/classification to many tables with a single bulk classification call
+        API Ref: /resource_EntityREST.html#resource_EntityREST_addClassification_POST
+        :param table_uris:
+        :param tag: Tag/Classification Name
+        :return: Table uris that do not exist
+        """
+        guids = []
+        not_found = []
+        for table_uri in table_uris:
+            try:
+                guids.append(self._get_table_guid(table_uri=table_uri))
+            except NotFoundException:
+                not_found.append(table_uri)
+
+        if guids:
+            entity_bulk_tag = {"classification": {"typeName": tag},
+                               "entityGuids": guids}
+            self._driver.entity_bulk_classification.create(data=entity_bulk_tag)
+            self._invalidate_tags_cache()
+        return not_found
+
+    @invalidate_by_table_uri
+    @invalidate_entity_by_table_uri
+    @log_change_by_table_uri
     def delete_tag(self, *, table_uri: str, tag: str) -> None:
         """
         Delete the assigned classfication/tag from the given table
@@ -281,32 +529,38 @@ class AtlasProxy(BaseProxy):
         :return:
         """
         try:
-            entity, _ = self._get_table_entity(table_uri=table_uri)
-            guid_entity = self._driver.entity_guid(entity.entity['guid'])
+            guid_entity = self._driver.entity_guid(self._get_table_guid(table_uri=table_uri))
             guid_entity.classifications(tag).delete()
         except Exception as ex:
             # FixMe (Verdan): Too broad exception. Please make it specific
             LOGGER.exception('For some reason this deletes the classification '
                              'but also always return exception. {}'.format(str(ex)))
 
+        self._invalidate_tags_cache()
+
+    @invalidate_by_table_uri
+    @invalidate_entity_by_table_uri
     def put_column_description(self, *,
                                table_uri: str,
                                column_name: str,
-                               description: str) -> None:
+                               description: str,
+                               etag: Optional[str] = None) -> None:
         """
         :param table_uri:
         :param column_name: Name of the column to update the description
         :param description: The description string
-        :return: None, as it simply updates the description of a column
+        :param etag: If given, the update fails with PreconditionFailedException unless the current description has
+        this ETag
+        :return: None, as it simply updates the description of a column, unless it is unchanged
         """
-        column_detail = self._get_column(
-            table_uri=table_uri,
-            column_name=column_name)
-        col_guid = column_detail['guid']
+        # The column is fetched by itself, as the table entity might be served from the cache
+        entity = self._get_column_entity(table_uri=table_uri, column_name=column_name)
+        if not self._is_description_changed(entity=entity.entity, description=description, etag=etag):
+            return
 
-        entity = self._driver.entity_guid(col_guid)
         entity.entity[self.ATTRS_KEY]['description'] = description
         entity.update(attribute='description')
+        log_changes(self._change_log, [(table_uri, 'put_column_description')])
 
     def get_column_description(self, *,
                                table_uri: str,
@@ -330,24 +584,21 @@ class AtlasProxy(BaseProxy):
         popular_tables = list()
         try:
             # Fetch the metadata entities based on popularity score
-            query_metadata_ids = {'query': f'FROM Table SELECT metadata.__guid '
-                                           f'ORDERBY popularityScore desc '
-                                           f'LIMIT {num_entries}'}
-            metadata_ids = self._get_flat_values_from_dsl(dsl_param=query_metadata_ids)
-            metadata_collection = self._driver.entity_bulk(guid=metadata_ids)
+            metadata_ids = self._get_popular_metadata_ids(num_entries)
+            metadata_by_guid = self._get_metadata_entities(metadata_ids)
         except KeyError as ex:
             LOGGER.exception(f'DSL Search query failed: {ex}')
             raise BadRequest('Unable to fetch popular tables. '
                              'Please check your configurations.')
 
-        if not metadata_collection:
+        if not metadata_by_guid:
             raise NotFoundException('Unable to fetch popular tables. '
                                     'Please check your configurations.')
 
-        for _collection in metadata_collection:
-            metadata_entities = _collection.entities_with_relationships(attributes=["parentEntity"])
-
-            for metadata in metadata_entities:
+        for metadata_id in metadata_ids:
+            metadata = metadata_by_guid.get(metadata_id)
+            # The entity might have been deleted after the DSL query
+            if metadata is not None:
                 table = metadata.relationshipAttributes.get("parentEntity")
                 table_attrs = table.get(self.ATTRS_KEY)
 
@@ -368,25 +619,103 @@ class AtlasProxy(BaseProxy):
 
         return popular_tables
 
+    def _get_popular_metadata_ids(self, num_entries: int) -> List[str]:
+        """
+        Pages through the metadata GUIDs of the tables in popularity order, config.ATLAS_POPULAR_TABLES_DSL_PAGE_SIZE
+        at a time, so that large num_entries don't end up in a single DSL query
+        :param num_entries: Number of GUIDs to fetch
+        :return: GUIDs of the metadata entities, the most popular first
+        """
+        metadata_ids: List = list()
+        while len(metadata_ids) < num_entries:
+            limit = min(self._popular_tables_dsl_page_size, num_entries - len(metadata_ids))
+            query_metadata_ids = {'query': f'FROM Table SELECT metadata.__guid '
+                                           f'ORDERBY popularityScore desc '
+                                           f'LIMIT {limit} OFFSET {len(metadata_ids)}'}
+            page = self._get_flat_values_from_dsl(dsl_param=query_metadata_ids)
+            metadata_ids.extend(page)
+            if len(page) < limit:
+                break
+        return metadata_ids
+
+    def _get_metadata_entities(self, metadata_ids: List[str]) -> Dict[str, Any]:
+        """
+        Fetches the metadata entities, along with their parent tables, with entity_bulk requests of
+        config.ATLAS_ENTITY_BULK_CHUNK_SIZE GUIDs each, which run on the entity bulk executor
+        :param metadata_ids:
+        :return: Metadata entities by GUID, as entity_bulk doesn't keep the order of the GUIDs
+        """
+        chunks = [metadata_ids[i:i + self._entity_bulk_chunk_size]
+                  for i in range(0, len(metadata_ids), self._entity_bulk_chunk_size)]
+
+        metadata_by_guid = dict()
+        for metadata_collection in self._entity_bulk_executor.map(self._fetch_metadata_entities, chunks):
+            for metadata in metadata_collection:
+                metadata_by_guid[metadata.guid] = metadata
+        return metadata_by_guid
+
+    def _fetch_metadata_entities(self, metadata_ids: List[str]) -> List[Any]:
+        metadata_entities = list()
+        for _collection in self._driver.entity_bulk(guid=metadata_ids) or list():
+            metadata_entities.extend(_collection.entities_with_relationships(attributes=["parentEntity"]))
+        return metadata_entities
+
     def get_latest_updated_ts(self) -> int:
         pass
 
+    @single_flight
     def get_tags(self) -> List:
         """
-        Fetch all the classification entity definitions from atlas  as this
-        will be used to generate the autocomplete on the table detail page
+        Fetch all the classification entity definitions from atlas, along with the number of tables of each, as this
+        will be used to generate the autocomplete on the table detail page.
+        The result is cached for config.PROXY_TAGS_CACHE_EXPIRY_SEC if it's set.
         :return: A list of TagDetail Objects
         """
-        tags = []
-        for type_def in self._driver.typedefs:
+        if self._tags_cache is None:
+            return self._get_tags()
+
+        return self._tags_cache.get(key='tags', createfunc=self._get_tags)
+
+    def _invalidate_tags_cache(self) -> None:
+        if self._tags_cache is not None:
+            self._tags_cache.remove_value(key='tags')
+
+    def _get_tags(self) -> List[TagDetail]:
+        """
+        Counts the tables of each classification on the tag count executor, as DSL has no grouping by classification
+        :return:
+        """
+        classification_names = self._get_classification_names()
+        tag_counts = self._tag_count_executor.map(self._get_tag_count, classification_names)
+        return [TagDetail(tag_name=name, tag_count=tag_count)
+                for name, tag_count in zip(classification_names, tag_counts)]
+
+    def _get_classification_names(self) -> List[str]:
+        if self._classification_names_cache is None:
+            return self._exec_classification_names_query()
+
+        return self._classification_names_cache.get(key='classification_names',
+                                                    createfunc=self._exec_classification_names_query)
+
+    def _exec_classification_names_query(self) -> List[str]:
+        """
+        Fetch only the classification definitions rather than all the type definitions
+        :return:
+        """
+        names = []
+        for type_def in self._driver.typedefs(type='classification'):
             for classification in type_def.classificationDefs:
-                tags.append(
-                    TagDetail(
-                        tag_name=classification.name,
-                        tag_count=0  # FixMe (Verdan): Implement the tag count
-                    )
-                )
-        return tags
+                names.append(classification.name)
+        return names
+
+    def _get_tag_count(self, tag: str) -> int:
+        """
+        :param tag: Name of the classification
+        :return: Number of tables with the classification
+        """
+        query_tag_count = {'query': f'{self.TABLE_ENTITY} isa {tag} select count()'}
+        tag_count = self._get_flat_values_from_dsl(dsl_param=query_tag_count)
+        return int(tag_count[0]) if tag_count else 0
 
     def get_table_by_user_relation(self, *, user_email: str,
                                    relation_type: UserResourceRel) -> Dict[str, Any]:
@@ -406,3 +735,11 @@ class AtlasProxy(BaseProxy):
                                       user_email: str,
                                       relation_type: UserResourceRel) -> None:
         pass
+
+    def put_table_usages_bulk(self, *, usages: Iterable[Tuple[str, str, int]]) -> int:
+        """
+        Atlas proxy doesn't keep track of table readers, which are what usages update
+        :param usages:
+        :return:
+        """
+        raise NotSupportedException('Table usage is not supported by Atlas proxy')
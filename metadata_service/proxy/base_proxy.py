@@ -1,10 +1,10 @@
 from abc import ABCMeta, abstractmethod
 
-from typing import Union, List, Dict, Any
+from typing import Union, List, Dict, Any, Iterable, Optional, Tuple
 
 from metadata_service.entity.popular_table import PopularTable
 from metadata_service.entity.user_detail import User as UserEntity
-from metadata_service.entity.table_detail import Table
+from metadata_service.entity.table_detail import Column, Table
 from metadata_service.util import UserResourceRel
 
 
@@ -18,7 +18,15 @@ class BaseProxy(metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def get_table(self, *, table_uri: str) -> Table:
+    def get_table(self, *, table_uri: str, include_columns: bool = True) -> Table:
+        pass
+
+    @abstractmethod
+    def get_columns(self, *, table_uri: str, offset: int, limit: int) -> List[Column]:
+        pass
+
+    @abstractmethod
+    def get_tables(self, *, table_uris: List[str]) -> Dict[str, Table]:
         pass
 
     @abstractmethod
@@ -37,13 +45,22 @@ class BaseProxy(metaclass=ABCMeta):
     @abstractmethod
     def put_table_description(self, *,
                               table_uri: str,
-                              description: str) -> None:
+                              description: str,
+                              etag: Optional[str] = None) -> None:
+        pass
+
+    @abstractmethod
+    def put_descriptions_bulk(self, *, descriptions: List[Dict[str, str]]) -> List[bool]:
         pass
 
     @abstractmethod
     def add_tag(self, *, table_uri: str, tag: str) -> None:
         pass
 
+    @abstractmethod
+    def add_tags_bulk(self, *, table_uris: List[str], tag: str) -> List[str]:
+        pass
+
     @abstractmethod
     def delete_tag(self, *, table_uri: str, tag: str) -> None:
         pass
@@ -52,7 +69,8 @@ class BaseProxy(metaclass=ABCMeta):
     def put_column_description(self, *,
                                table_uri: str,
                                column_name: str,
-                               description: str) -> None:
+                               description: str,
+                               etag: Optional[str] = None) -> None:
         pass
 
     @abstractmethod
@@ -95,3 +113,7 @@ class BaseProxy(metaclass=ABCMeta):
                                       user_email: str,
                                       relation_type: UserResourceRel) -> None:
         pass
+
+    @abstractmethod
+    def put_table_usages_bulk(self, *, usages: Iterable[Tuple[str, str, int]]) -> int:
+        pass
@@ -0,0 +1,502 @@
+import logging
+import time
+from collections import OrderedDict
+from functools import wraps
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple  # noqa: F401
+
+from beaker.cache import Cache
+from flask import current_app
+
+from metadata_service import config
+from metadata_service.proxy.statsd_utilities import _get_statsd_client
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LRUTTLCache:
+    """
+    Thread safe in-memory cache bounded by number of entries. When it's full, least recently used entry is evicted,
+    and each entry expires ttl_sec seconds after it was put.
+
+    Hit, miss and eviction counts are emitted through statsd as <name>.hit, <name>.miss and <name>.eviction
+    with metadata_service.proxy.cache_utilities prefix. Note that config.IS_STATSD_ON needs to be True to emit metrics.
+    """
+
+    def __init__(self, *,
+                 name: str,
+                 max_size: int,
+                 ttl_sec: float) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = Lock()
+        # Incremented on every invalidation so that a value read from the backend before the invalidation won't be
+        # put into the cache after it.
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        :param key:
+        :return: Tuple of (whether the key is found, value)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                found, value = True, entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                found, value = False, None
+
+        self._incr('hit' if found else 'miss')
+        return found, value
+
+    def generation(self) -> int:
+        """
+        :return: current generation to be passed to put() after the value is read from the backend
+        """
+        return self._generation
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Puts the value into the cache, unless there was an invalidation after the given generation.
+        :param key:
+        :param value:
+        :param generation: generation() taken before the value is read from the backend
+        :return:
+        """
+        evicted = 0
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            self._entries[key] = (time.monotonic() + self.ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+
+        if evicted:
+            self._incr('eviction', evicted)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _incr(self, stat: str, count: int = 1) -> None:
+        statsd_client = _get_statsd_client(prefix=__name__)
+        if statsd_client:
+            statsd_client.incr('{}.{}'.format(self.name, stat), count)
+
+
+def create_table_cache() -> Optional[LRUTTLCache]:
+    """
+    Creates proxy's table cache based on the config. config.TABLE_CACHE_MAX_SIZE of 0 disables the cache.
+    :return: LRUTTLCache or None if disabled
+    """
+    max_size = current_app.config[config.TABLE_CACHE_MAX_SIZE]
+    if not max_size:
+        return None
+
+    return LRUTTLCache(name='table', max_size=max_size, ttl_sec=current_app.config[config.TABLE_CACHE_TTL_SEC])
+
+
+class ProxyCache:
+    """
+    Proxy level cache on top of beaker cache, with optional stale-while-revalidate.
+
+    An entry older than expire_sec is recomputed by createfunc on get(). With max_stale_sec, the expired entry keeps
+    being served for up to max_stale_sec more seconds while a background thread recomputes it, so that callers don't
+    wait for the computation. The background thread holds beaker's creation lock of the key, the same one get() holds
+    to create a missing entry, so that the entry is recomputed one at a time across the processes sharing the cache.
+    Callers only block when there's no entry or the entry is older than expire_sec + max_stale_sec.
+
+    Served stale entries are counted as <name>.stale and failed background refreshes as <name>.revalidate.fail with
+    metadata_service.proxy.cache_utilities statsd prefix.
+    """
+
+    def __init__(self, *,
+                 name: str,
+                 cache: Cache,
+                 expire_sec: int,
+                 max_stale_sec: int) -> None:
+        self.name = name
+        self.expire_sec = expire_sec
+        self.max_stale_sec = max_stale_sec
+        self._cache = cache
+        self._revalidating_keys = set()  # type: Set[str]
+        self._lock = Lock()
+
+    def get(self, *, key: str, createfunc: Callable[[], Any]) -> Any:
+        # Entries are stored with their creation time, taken once the value is computed as beaker does. Wall clock is
+        # used as entries can be shared across processes.
+        created_at, value = self._cache.get(key=key, createfunc=lambda: (lambda v: (time.time(), v))(createfunc()))
+
+        # Without max_stale_sec, beaker expires the entry itself and the next get() recomputes it
+        if self.max_stale_sec and time.time() - created_at >= self.expire_sec:
+            statsd_client = _get_statsd_client(prefix=__name__)
+            if statsd_client:
+                statsd_client.incr('{}.stale'.format(self.name))
+            self._revalidate(key=key, createfunc=createfunc)
+
+        return value
+
+    def _revalidate(self, *, key: str, createfunc: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._revalidating_keys:
+                return
+            self._revalidating_keys.add(key)
+
+        app = current_app._get_current_object()  # type: ignore
+
+        def run() -> None:
+            with app.app_context():
+                try:
+                    self._recompute_if_stale(key=key, createfunc=createfunc)
+                except Exception:
+                    LOGGER.exception('Failed to revalidate {} of {}'.format(key, self.name))
+                    statsd_client = _get_statsd_client(prefix=__name__)
+                    if statsd_client:
+                        statsd_client.incr('{}.revalidate.fail'.format(self.name))
+                finally:
+                    with self._lock:
+                        self._revalidating_keys.discard(key)
+
+        Thread(target=run, name='{}_revalidate'.format(self.name), daemon=True).start()
+
+    def _recompute_if_stale(self, *, key: str, createfunc: Callable[[], Any]) -> None:
+        # Beaker locks the key encoded the same way
+        creation_lock = self._cache.namespace.get_creation_lock(key.encode('ascii', 'backslashreplace'))
+        if not creation_lock.acquire(wait=False):
+            # Another process is recomputing it
+            return
+
+        try:
+            # The entry could have been recomputed by another process before the lock is acquired
+            try:
+                created_at, _ = self._cache.get(key=key)
+                if time.time() - created_at < self.expire_sec:
+                    return
+            except KeyError:
+                pass
+
+            value = createfunc()
+            self._cache.put(key, (time.time(), value))
+        finally:
+            creation_lock.release()
+
+    def remove_value(self, *, key: str) -> None:
+        self._cache.remove_value(key=key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def create_proxy_cache(*, namespace: str, expire_sec: int) -> Optional[ProxyCache]:
+    """
+    Creates cache for proxy level caches, such as popular tables, based on config.PROXY_CACHE_TYPE.
+    With dbm or file type, entries are stored under config.PROXY_CACHE_DATA_DIR and shared by all the processes on
+    the host. Beaker's file lock under config.PROXY_CACHE_LOCK_DIR lets only one process recompute an expired entry
+    while the others wait for it. With memory type, each process has its own copy.
+    Expired entries are served while being recomputed for up to config.PROXY_CACHE_MAX_STALE_SEC. See ProxyCache.
+    :param namespace: Unique namespace of the cache
+    :param expire_sec: Seconds to keep each entry. 0 disables the cache
+    :return: ProxyCache or None if disabled
+    """
+    if not expire_sec:
+        return None
+
+    max_stale_sec = current_app.config[config.PROXY_CACHE_MAX_STALE_SEC]
+    options = {'type': current_app.config[config.PROXY_CACHE_TYPE],
+               'expire': expire_sec + max_stale_sec}  # type: Dict[str, Any]
+    if current_app.config[config.PROXY_CACHE_DATA_DIR]:
+        options['data_dir'] = current_app.config[config.PROXY_CACHE_DATA_DIR]
+    if current_app.config[config.PROXY_CACHE_LOCK_DIR]:
+        options['lock_dir'] = current_app.config[config.PROXY_CACHE_LOCK_DIR]
+
+    return ProxyCache(name=namespace.rsplit('.', 1)[-1],
+                      cache=Cache(namespace, **options),
+                      expire_sec=expire_sec,
+                      max_stale_sec=max_stale_sec)
+
+
+def cache_by_table_uri(f: Callable) -> Any:
+    """
+    A method decorator that serves the result from the proxy's table cache, keyed by table_uri keyword argument.
+    Calls with keyword arguments other than table_uri, such as include_columns, bypass the cache.
+    Decorated method's instance needs to have _table_cache attribute, where None disables the cache.
+    :param f:
+    :return:
+    """
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        table_cache = self._table_cache  # type: Optional[LRUTTLCache]
+        if table_cache is None or len(kwargs) > 1:
+            return f(self, *args, **kwargs)
+
+        table_uri = kwargs['table_uri']
+        found, value = table_cache.get(table_uri)
+        if found:
+            return value
+
+        generation = table_cache.generation()
+        value = f(self, *args, **kwargs)
+        table_cache.put(table_uri, value, generation)
+        return value
+
+    return wrapper
+
+
+def cache_by_table_uris(f: Callable) -> Any:
+    """
+    A method decorator for bulk version of cache_by_table_uri. Table uris found in the proxy's table cache are served
+    from it, and the decorated method is called with the rest of table_uris keyword argument.
+    Decorated method needs to return a dictionary of table uri to table.
+    :param f:
+    :return:
+    """
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        table_cache = self._table_cache  # type: Optional[LRUTTLCache]
+        if table_cache is None:
+            return f(self, *args, **kwargs)
+
+        results = {}
+        table_uris_to_fetch = []
+        for table_uri in kwargs['table_uris']:
+            found, value = table_cache.get(table_uri)
+            if found:
+                results[table_uri] = value
+            else:
+                table_uris_to_fetch.append(table_uri)
+
+        if table_uris_to_fetch:
+            generation = table_cache.generation()
+            kwargs['table_uris'] = table_uris_to_fetch
+            fetched = f(self, *args, **kwargs)
+            for table_uri, value in fetched.items():
+                table_cache.put(table_uri, value, generation)
+            results.update(fetched)
+
+        return results
+
+    return wrapper
+
+
+def invalidate_by_table_uri(f: Callable) -> Any:
+    """
+    A method decorator that invalidates the proxy's table cache entry of table_uri keyword argument once the method
+    is called, regardless of success, as the update could have been partially applied.
+    Decorated method's instance needs to have _table_cache attribute, where None disables the cache.
+    :param f:
+    :return:
+    """
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return f(self, *args, **kwargs)
+        finally:
+            if self._table_cache is not None:
+                if LOGGER.isEnabledFor(logging.DEBUG):
+                    LOGGER.debug('Invalidating table cache of {}'.format(kwargs['table_uri']))
+                self._table_cache.invalidate(kwargs['table_uri'])
+
+    return wrapper
+
+
+def invalidate_by_table_uris(f: Callable) -> Any:
+    """
+    A method decorator for bulk version of invalidate_by_table_uri, which invalidates the proxy's table cache entries
+    of table_uris keyword argument once the method is called.
+    :param f:
+    :return:
+    """
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return f(self, *args, **kwargs)
+        finally:
+            if self._table_cache is not None:
+                for table_uri in kwargs['table_uris']:
+                    self._table_cache.invalidate(table_uri)
+
+    return wrapper
+
+
+def invalidate_entity_by_table_uri(f: Callable) -> Any:
+    """
+    A method decorator that invalidates the proxy's backend entity cache entry of table_uri keyword argument once the
+    method is called, regardless of success, the same way as invalidate_by_table_uri.
+    Decorated method's instance needs to have _entity_cache attribute, where None disables the cache.
+    :param f:
+    :return:
+    """
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return f(self, *args, **kwargs)
+        finally:
+            if self._entity_cache is not None:
+                self._entity_cache.invalidate(kwargs['table_uri'])
+
+    return wrapper
+
+
+def invalidate_entity_by_table_uris(f: Callable) -> Any:
+    """
+    A method decorator for bulk version of invalidate_entity_by_table_uri, which invalidates the proxy's backend entity
+    cache entries of table_uris keyword argument once the method is called.
+    :param f:
+    :return:
+    """
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return f(self, *args, **kwargs)
+        finally:
+            if self._entity_cache is not None:
+                for table_uri in kwargs['table_uris']:
+                    self._entity_cache.invalidate(table_uri)
+
+    return wrapper
+
+
+class PeriodicRefresher:
+    """
+    Keeps a value precomputed by a daemon thread that calls refresh_fn every interval_sec seconds, so that readers
+    never block on the computation. The new value is swapped in atomically once computed, and the previous value is
+    kept when the computation fails. get() returns None until the first computation is done.
+
+    Refresh duration is emitted as <name>.refresh timer, failures as <name>.refresh.fail counter and the age of the
+    served value as <name>.age_sec gauge, with metadata_service.proxy.cache_utilities prefix.
+    """
+
+    def __init__(self, *,
+                 name: str,
+                 refresh_fn: Callable[[], Any],
+                 interval_sec: float) -> None:
+        self.name = name
+        self.interval_sec = interval_sec
+        self._refresh_fn = refresh_fn
+        # Tuple of (refreshed monotonic time, value), replaced as a whole so that readers don't need a lock
+        self._entry = None  # type: Optional[Tuple[float, Any]]
+        self._stop_event = Event()
+        self._thread = None  # type: Optional[Thread]
+
+    def start(self) -> None:
+        """
+        Starts the refresher thread, which computes the value right away and then every interval_sec seconds.
+        The thread runs within the current Flask app context as refresh_fn and statsd need it.
+        """
+        app = current_app._get_current_object()  # type: ignore
+
+        def run() -> None:
+            with app.app_context():
+                while not self._stop_event.is_set():
+                    self.refresh()
+                    self._stop_event.wait(self.interval_sec)
+
+        self._thread = Thread(target=run, name='{}_refresher'.format(self.name), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def refresh(self) -> None:
+        statsd_client = _get_statsd_client(prefix=__name__)
+        start = time.monotonic()
+        try:
+            value = self._refresh_fn()
+        except Exception:
+            LOGGER.exception('Failed to refresh {}'.format(self.name))
+            if statsd_client:
+                statsd_client.incr('{}.refresh.fail'.format(self.name))
+            return
+
+        now = time.monotonic()
+        self._entry = (now, value)
+        LOGGER.info('Refreshed {} in {:.3f} seconds'.format(self.name, now - start))
+        if statsd_client:
+            statsd_client.timing('{}.refresh'.format(self.name), (now - start) * 1000)
+
+    def get(self) -> Any:
+        """
+        :return: Latest computed value or None if it's not computed yet
+        """
+        entry = self._entry
+        if entry is None:
+            return None
+
+        statsd_client = _get_statsd_client(prefix=__name__)
+        if statsd_client:
+            statsd_client.gauge('{}.age_sec'.format(self.name), time.monotonic() - entry[0])
+        return entry[1]
+
+
+class _InFlightCall:
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result = None  # type: Any
+        self.exception = None  # type: Optional[Exception]
+
+
+def single_flight(f: Callable) -> Any:
+    """
+    A method decorator that coalesces concurrent calls with identical arguments on the same instance into one
+    in-flight call. The first caller runs the method and the others wait for it and share its result or exception.
+    Arguments need to be hashable.
+
+    Number of coalesced callers is emitted as <method name>.coalesced with the decorated method's module as statsd
+    prefix. Note that a caller joining a call that started before its own update can get the result before the update.
+    Coalescing is only done when config.PROXY_SINGLE_FLIGHT is True.
+    :param f:
+    :return:
+    """
+    in_flight_calls = {}  # type: Dict[Hashable, _InFlightCall]
+    lock = Lock()
+
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        if not current_app.config[config.PROXY_SINGLE_FLIGHT]:
+            return f(self, *args, **kwargs)
+
+        key = (id(self), args, tuple(sorted(kwargs.items())))
+        with lock:
+            call = in_flight_calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = in_flight_calls[key] = _InFlightCall()
+
+        if not is_leader:
+            statsd_client = _get_statsd_client(prefix=f.__module__)
+            if statsd_client:
+                statsd_client.incr('{}.coalesced'.format(f.__name__))
+            call.done.wait()  # type: ignore
+            if call.exception is not None:  # type: ignore
+                raise call.exception  # type: ignore
+            return call.result  # type: ignore
+
+        try:
+            call.result = f(self, *args, **kwargs)  # type: ignore
+            return call.result  # type: ignore
+        except Exception as e:
+            call.exception = e  # type: ignore
+            raise e
+        finally:
+            with lock:
+                del in_flight_calls[key]
+            call.done.set()  # type: ignore
+
+    return wrapper
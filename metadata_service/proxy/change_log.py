@@ -0,0 +1,217 @@
+import fcntl
+import json
+import logging
+import os
+import time
+from functools import wraps
+from threading import Lock
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Tuple  # noqa: F401
+
+from flask import current_app
+
+from metadata_service import config
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ChangeLog:
+    """
+    Append-only log of metadata changes, stored as one JSON record per line in a local file, so that indexers can
+    reindex only the tables that changed. Each record holds seq, ts (epoch seconds), uri and change, which is the name
+    of the proxy method that made the change, e.g. {"seq":3,"ts":1570000000,"uri":"hive://gold.s/t","change":"add_tag"}.
+
+    seq increases by one per record. Appends hold an exclusive lock on the file, so processes sharing the file
+    assign unique sequence numbers. Records are never removed by the service.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = Lock()
+
+    def append(self, changes: Iterable[Tuple[str, str]]) -> None:
+        """
+        :param changes: Tuples of (uri, change)
+        """
+        changes = list(changes)
+        if not changes:
+            return
+
+        with self._lock, open(self.path, 'ab+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                seq = self._read_last_seq(f)
+                ts = int(time.time())
+                lines = []
+                for uri, change in changes:
+                    seq += 1
+                    lines.append(json.dumps({'seq': seq, 'ts': ts, 'uri': uri, 'change': change},
+                                            separators=(',', ':')))
+                f.write(('\n'.join(lines) + '\n').encode('utf-8'))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def read(self, *, since: int) -> Iterator[Dict[str, Any]]:
+        """
+        :param since: Sequence number of the last record the caller has seen, 0 to read from the beginning
+        :return: Records with seq greater than since, in order
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+
+        with f:
+            f.seek(self._find_offset(f, since))
+            for line in f:
+                # Stop at the last line if it's still being written
+                if not line.endswith(b'\n'):
+                    return
+                record = self._parse_record(line)
+                if record is None:
+                    LOGGER.warning('Skipping corrupt record of change log {}: {!r}'.format(self.path, line))
+                elif record['seq'] > since:
+                    yield record
+
+    @staticmethod
+    def _parse_record(line: bytes) -> Optional[Dict[str, Any]]:
+        """
+        :return: Record of the line, or None if the line is corrupt
+        """
+        try:
+            record = json.loads(line)
+            int(record['seq'])
+            return record
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def _read_last_seq(cls, f: BinaryIO) -> int:
+        """
+        Reads seq of the last record. A torn last line, left by a write that failed part way, e.g. on crash or full
+        disk, is truncated so that the next record starts on its own line, and corrupt records are skipped.
+        """
+        end = f.seek(0, os.SEEK_END)
+        chunk_size = min(end, 4096)
+        while end > 0:
+            f.seek(end - chunk_size)
+            chunk = f.read(chunk_size)
+            if not chunk.endswith(b'\n'):
+                newline = chunk.rfind(b'\n')
+                if newline < 0 and chunk_size < end:
+                    chunk_size = min(end, chunk_size * 2)
+                    continue
+                end -= chunk_size - newline - 1
+                LOGGER.warning('Truncating torn last line of change log {} at offset {}'.format(f.name, end))
+                f.truncate(end)
+                chunk_size = min(end, 4096)
+                continue
+
+            # Ignore the trailing newline of the last record
+            start = chunk.rfind(b'\n', 0, len(chunk) - 1)
+            if start < 0 and chunk_size < end:
+                chunk_size = min(end, chunk_size * 2)
+                continue
+            line = chunk[start + 1:]
+            record = cls._parse_record(line)
+            if record is not None:
+                return record['seq']
+            LOGGER.warning('Skipping corrupt record of change log {}: {!r}'.format(f.name, line))
+            end -= len(line)
+            chunk_size = min(end, 4096)
+        return 0
+
+    @classmethod
+    def _find_offset(cls, f: BinaryIO, since: int) -> int:
+        """
+        Binary searches the file for the offset of the first record with seq greater than since, as records are
+        appended in seq order.
+        """
+        # lo is always the start of a line, and all the records before it have seq less than or equal to since
+        lo, hi = 0, f.seek(0, os.SEEK_END)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            if mid > 0:
+                # Skip to the start of the next line
+                f.readline()
+            start = f.tell()
+            line = f.readline()
+            record = cls._parse_record(line) if line.endswith(b'\n') else None
+            # Corrupt records are read past by read(), which also filters by seq
+            if record is None or record['seq'] > since:
+                hi = mid
+            else:
+                lo = start + len(line)
+        return lo
+
+
+_change_logs = {}  # type: Dict[str, ChangeLog]
+_change_logs_lock = Lock()
+
+
+def get_change_log() -> Optional[ChangeLog]:
+    """
+    Provides singleton change log of config.CHANGE_LOG_PATH
+    :return: None if config.CHANGE_LOG_PATH is not set
+    """
+    path = current_app.config[config.CHANGE_LOG_PATH]
+    if not path:
+        return None
+
+    with _change_logs_lock:
+        if path not in _change_logs:
+            _change_logs[path] = ChangeLog(path)
+        return _change_logs[path]
+
+
+def log_changes(change_log: Optional[ChangeLog], changes: Iterable[Tuple[str, str]]) -> None:
+    """
+    Appends the changes to the change log, unless it's disabled. As the changes are already applied, a failure to
+    append them is logged instead of failing the update.
+    :param change_log: Proxy's change log, where None disables it
+    :param changes: Tuples of (uri, change)
+    """
+    if change_log is None:
+        return
+
+    try:
+        change_log.append(changes)
+    except Exception:
+        LOGGER.exception('Failed to append changes to change log {}'.format(change_log.path))
+
+
+def log_change_by_table_uri(f: Callable) -> Any:
+    """
+    A method decorator that appends a change record of table_uri keyword argument to the proxy's change log once the
+    method returns, so that failed updates are not logged. The change is the name of the method.
+    Decorated method's instance needs to have _change_log attribute, where None disables the change log.
+    :param f:
+    :return:
+    """
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        result = f(self, *args, **kwargs)
+        log_changes(self._change_log, [(kwargs['table_uri'], f.__name__)])
+        return result
+
+    return wrapper
+
+
+def log_change_by_table_uris(f: Callable) -> Any:
+    """
+    A method decorator for bulk version of log_change_by_table_uri, which appends change records of table_uris keyword
+    argument to the proxy's change log once the method returns. The method returns the table uris that are not
+    updated, e.g. the ones that do not exist, which are not logged.
+    :param f:
+    :return:
+    """
+    @wraps(f)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        result = f(self, *args, **kwargs)
+        not_updated = set(result)
+        log_changes(self._change_log, [(table_uri, f.__name__) for table_uri in kwargs['table_uris']
+                                       if table_uri not in not_updated])
+        return result
+
+    return wrapper
@@ -1,31 +1,154 @@
 import logging
+import re
 import textwrap
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor  # noqa: F401
+from contextlib import contextmanager
+from itertools import islice
 from random import randint
-from typing import Dict, Any, no_type_check, List, Tuple, Union, Optional  # noqa: F401
+from threading import BoundedSemaphore, Lock, local
+from typing import Callable, Dict, Any, Iterable, Iterator, no_type_check, List, Set, Tuple, Union, \
+    Optional  # noqa: F401
 
 import time
-from beaker.cache import CacheManager
-from beaker.util import parse_cache_config_options
+from flask import current_app
 from neo4j.v1 import BoltStatementResult
-from neo4j.v1 import GraphDatabase, Driver  # noqa: F401
+from neo4j.v1 import GraphDatabase, Driver, Session, Transaction  # noqa: F401
 
+from metadata_service import config
 from metadata_service.entity.popular_table import PopularTable
 from metadata_service.entity.table_detail import Application, Column, Reader, Source, \
     Statistics, Table, Tag, User, Watermark
 from metadata_service.entity.tag_detail import TagDetail
 from metadata_service.entity.user_detail import User as UserEntity
-from metadata_service.exception import NotFoundException
+from metadata_service.exception import NotFoundException, PreconditionFailedException
 from metadata_service.proxy.base_proxy import BaseProxy
-from metadata_service.proxy.statsd_utilities import timer_with_counter
-from metadata_service.util import UserResourceRel
-
-_CACHE = CacheManager(**parse_cache_config_options({'cache.type': 'memory'}))
+from metadata_service.proxy.cache_utilities import PeriodicRefresher, cache_by_table_uri, cache_by_table_uris, \
+    create_proxy_cache, create_table_cache, invalidate_by_table_uri, invalidate_by_table_uris, single_flight
+from metadata_service.proxy.change_log import get_change_log, log_change_by_table_uri, log_change_by_table_uris, \
+    log_changes
+from metadata_service.proxy.statsd_utilities import _get_statsd_client, timer_with_counter
+from metadata_service.proxy.write_behind import WriteBehindQueue
+from metadata_service.util import UserResourceRel, get_description_etag
 
 # Expire cache every 11 hours + jitter
 _GET_POPULAR_TABLE_CACHE_EXPIRY_SEC = 11 * 60 * 60 + randint(0, 3600)
 
 LOGGER = logging.getLogger(__name__)
 
+# Relationship types can't be passed as parameters, so statements that differ only by the relationship type or
+# the label are built here once for each of the fixed set of variants, with values always passed as $-parameters.
+# This way the text of every statement the proxy sends is one of a few constant strings and Neo4j reuses the cached
+# query plan instead of planning it again on every call.
+_USER_RELATIONS = {
+    UserResourceRel.follow: ('FOLLOW', 'FOLLOWED_BY'),
+    UserResourceRel.own: ('OWNER_OF', 'OWNER'),
+    UserResourceRel.read: ('READ', 'READ_BY'),
+}  # type: Dict[Any, Tuple[str, str]]
+
+_GET_TABLES_BY_USER_RELATION_QUERY = {
+    relation_type: textwrap.dedent("""
+MATCH (user:User {{key: $query_key}})-[:{relation}]->(tbl:Table)-[:TABLE_OF]->
+(schema:Schema)-[:SCHEMA_OF]->(clstr:Cluster)-[:CLUSTER_OF]->(db:Database)
+WITH db, clstr, schema, tbl
+OPTIONAL MATCH (tbl)-[:DESCRIPTION]->(tbl_dscrpt:Description)
+RETURN db, clstr, schema, tbl, tbl_dscrpt""").format(relation=relation)
+    for relation_type, (relation, _) in _USER_RELATIONS.items()
+}  # type: Dict[Any, str]
+
+_UPSERT_USER_RELATION_QUERY = {
+    relation_type: textwrap.dedent("""
+    MATCH (n1:User {{key: $user_email}}), (n2:Table {{key: $tbl_key}})
+    MERGE (n1)-[r1:{relation}]->(n2)-[r2:{reverse_relation}]->(n1)
+    RETURN n1.key, n2.key
+    """).format(relation=relation, reverse_relation=reverse_relation)
+    for relation_type, (relation, reverse_relation) in _USER_RELATIONS.items()
+}  # type: Dict[Any, str]
+
+_DELETE_USER_RELATION_QUERY = {
+    relation_type: textwrap.dedent("""
+    MATCH (n1:User {{key: $user_email}})-[r1:{relation}]->
+    (n2:Table {{key: $tbl_key}})-[r2:{reverse_relation}]->(n1) DELETE r1,r2
+    """).format(relation=relation, reverse_relation=reverse_relation)
+    for relation_type, (relation, reverse_relation) in _USER_RELATIONS.items()
+}  # type: Dict[Any, str]
+
+_UPSERT_USER_RELATION_BULK_QUERY = {
+    relation_type: textwrap.dedent("""
+    UNWIND $relations as rel
+    MERGE (n1:User {{key: rel.user_email}})
+    on CREATE SET n1={{email: rel.user_email, key: rel.user_email}}
+    WITH n1, rel
+    MATCH (n2:Table {{key: rel.tbl_key}})
+    MERGE (n1)-[r1:{relation}]->(n2)-[r2:{reverse_relation}]->(n1)
+    """).format(relation=relation, reverse_relation=reverse_relation)
+    for relation_type, (relation, reverse_relation) in _USER_RELATIONS.items()
+}  # type: Dict[Any, str]
+
+_DELETE_USER_RELATION_BULK_QUERY = {
+    relation_type: textwrap.dedent("""
+    UNWIND $relations as rel
+    MATCH (n1:User {{key: rel.user_email}})-[r1:{relation}]->
+    (n2:Table {{key: rel.tbl_key}})-[r2:{reverse_relation}]->(n1) DELETE r1,r2
+    """).format(relation=relation, reverse_relation=reverse_relation)
+    for relation_type, (relation, reverse_relation) in _USER_RELATIONS.items()
+}  # type: Dict[Any, str]
+
+_UPSERT_DESCRIPTION_BULK_QUERY = {
+    label: textwrap.dedent("""
+    UNWIND $items as item
+    MATCH (n2:{label} {{key: item.key}})
+    MERGE (n1:Description {{key: item.desc_key}})
+    on CREATE SET n1={{description: item.description, key: item.desc_key}}
+    on MATCH SET n1={{description: item.description, key: item.desc_key}}
+    MERGE (n1)-[r1:DESCRIPTION_OF]->(n2)-[r2:DESCRIPTION]->(n1)
+    RETURN item.key as key
+    """).format(label=label)
+    for label in ('Table', 'Column')
+}  # type: Dict[str, str]
+
+# Labels that the proxy looks up by key, which need a uniqueness constraint on key. See bootstrap_schema.
+_KEY_CONSTRAINT_LABELS = ('Table', 'Column', 'User', 'Tag', 'Description', 'Updatedtimestamp')
+
+_CREATE_KEY_CONSTRAINT_QUERY = {
+    label: 'CREATE CONSTRAINT ON (n:{label}) ASSERT n.key IS UNIQUE'.format(label=label)
+    for label in _KEY_CONSTRAINT_LABELS
+}  # type: Dict[str, str]
+
+# Matches descriptions of db.constraints(), e.g. CONSTRAINT ON ( table:Table ) ASSERT table.key IS UNIQUE
+_UNIQUE_CONSTRAINT_REGEX = re.compile(r'CONSTRAINT ON \( *\w+:`?(?P<label>\w+)`? *\) '
+                                      r'ASSERT \(?\w+\.`?(?P<property>\w+)`?\)? IS UNIQUE')
+
+# Writes the description only if it differs from the current one, so that unchanged descriptions take no write lock
+_UPSERT_DESCRIPTION_QUERY = {
+    label: textwrap.dedent("""
+    MATCH (n2:{label} {{key: $key}})
+    OPTIONAL MATCH (n2)-[:DESCRIPTION]->(d:Description)
+    WITH n2, collect(d.description) = [$description] AS unchanged
+    FOREACH (_ IN CASE WHEN unchanged THEN [] ELSE [1] END |
+        MERGE (n1:Description {{key: $desc_key}})
+        on CREATE SET n1={{description: $description, key: $desc_key}}
+        on MATCH SET n1={{description: $description, key: $desc_key}}
+        MERGE (n1)-[r1:DESCRIPTION_OF]->(n2)-[r2:DESCRIPTION]->(n1))
+    RETURN n2.key, unchanged
+    """).format(label=label)
+    for label in ('Table', 'Column')
+}  # type: Dict[str, str]
+
+# Takes the write lock of the node before reading its description, so that the description can't change until the
+# transaction ends. Setting and removing a dummy property is how Cypher takes the lock without changing the node.
+_LOCK_AND_GET_DESCRIPTION_QUERY = {
+    label: textwrap.dedent("""
+    MATCH (n2:{label} {{key: $key}})
+    SET n2._lock = true
+    REMOVE n2._lock
+    WITH n2
+    OPTIONAL MATCH (n2)-[:DESCRIPTION]->(d:Description)
+    RETURN d.description AS description
+    """).format(label=label)
+    for label in ('Table', 'Column')
+}  # type: Dict[str, str]
+
 
 class Neo4jProxy(BaseProxy):
     """
@@ -55,25 +178,123 @@ class Neo4jProxy(BaseProxy):
                                             max_connection_lifetime=max_connection_lifetime_sec,
                                             auth=(user, password))  # type: Driver
 
+        # Bounds open sessions by the size of the driver's connection pool so that waiting for one and the number of
+        # open ones are measurable. These are sessions of this proxy, not connections of the driver's pool.
+        self._session_semaphore = BoundedSemaphore(num_conns)
+        self._session_acquisition_timeout_sec = \
+            current_app.config[config.NEO4J_SESSION_ACQUISITION_TIMEOUT_SEC]  # type: float
+        self._sessions_in_use_lock = Lock()
+        self._sessions_in_use = 0
+        # Whether the current thread has a session open
+        self._session_local = local()
+
+        self._table_query_executor = None  # type: Optional[ThreadPoolExecutor]
+        if current_app.config[config.NEO4J_CONCURRENT_TABLE_QUERY]:
+            self._table_query_executor = \
+                ThreadPoolExecutor(max_workers=current_app.config[config.NEO4J_TABLE_QUERY_MAX_WORKERS],
+                                   thread_name_prefix='neo4j_table_query')
+
+        self._single_table_detail_query = current_app.config[config.NEO4J_SINGLE_TABLE_DETAIL_QUERY]  # type: bool
+        self._bulk_table_batch_size = current_app.config[config.NEO4J_BULK_TABLE_BATCH_SIZE]  # type: int
+        self._bulk_write_batch_size = current_app.config[config.NEO4J_BULK_WRITE_BATCH_SIZE]  # type: int
+
+        self._table_cache = create_table_cache()
+        self._change_log = get_change_log()
+        self._popular_tables_cache = create_proxy_cache(namespace='{}.popular_tables'.format(__name__),
+                                                        expire_sec=_GET_POPULAR_TABLE_CACHE_EXPIRY_SEC)
+        self._tags_cache = create_proxy_cache(namespace='{}.tags'.format(__name__),
+                                              expire_sec=current_app.config[config.PROXY_TAGS_CACHE_EXPIRY_SEC])
+
+        self._popular_tables_refresher = None  # type: Optional[PeriodicRefresher]
+        popular_tables_refresh_interval_sec = current_app.config[config.NEO4J_POPULAR_TABLES_REFRESH_INTERVAL_SEC]
+        if popular_tables_refresh_interval_sec:
+            self._popular_tables_precompute_size = \
+                current_app.config[config.NEO4J_POPULAR_TABLES_PRECOMPUTE_SIZE]  # type: int
+            # The ranking is kept in the proxy cache, so that with shared cache type only one process on the host
+            # recomputes it every interval, and each process's refresher copies it from there
+            self._popular_tables_ranking_cache = create_proxy_cache(
+                namespace='{}.popular_tables_ranking'.format(__name__),
+                expire_sec=popular_tables_refresh_interval_sec)
+            self._popular_tables_refresher = PeriodicRefresher(
+                name='popular_tables',
+                refresh_fn=self._get_popular_tables_ranking,
+                interval_sec=popular_tables_refresh_interval_sec)
+            self._popular_tables_refresher.start()
+
+        self._relation_write_behind_queue = None  # type: Optional[WriteBehindQueue]
+        if current_app.config[config.NEO4J_RELATION_WRITE_BEHIND]:
+            self._relation_write_behind_queue = WriteBehindQueue(
+                name='table_relation_by_user',
+                flush_fn=self._flush_table_relations_by_user,
+                interval_sec=current_app.config[config.NEO4J_RELATION_FLUSH_INTERVAL_SEC],
+                max_size=current_app.config[config.NEO4J_RELATION_QUEUE_MAX_SIZE])
+            self._relation_write_behind_queue.start()
+
     @timer_with_counter
-    def get_table(self, *, table_uri: str) -> Table:
+    @cache_by_table_uri
+    @single_flight
+    def get_table(self, *, table_uri: str, include_columns: bool = True) -> Table:
         """
         :param table_uri: Table URI
+        :param include_columns: When False, only the number of columns is queried and columns are left empty.
+        Use get_columns to page through columns of wide tables.
         :return:  A Table object
         """
+        if include_columns and self._single_table_detail_query:
+            return self._exec_table_detail_query(table_uri)
+
+        exec_col_query = self._exec_col_query if include_columns else self._exec_col_count_query
 
-        cols, last_neo4j_record = self._exec_col_query(table_uri)
+        if self._table_query_executor:
+            return self._get_table_concurrently(table_uri, exec_col_query)
+
+        cols, tbl_context_record = exec_col_query(table_uri)
 
         readers = self._exec_usage_query(table_uri)
 
-        wmk_results, table_writer, timestamp_value, owners, tags, source = self._exec_table_query(table_uri)
+        table_level_results = self._exec_table_query(table_uri)
+
+        return self._build_table(cols, tbl_context_record, readers, table_level_results)
+
+    def _get_table_concurrently(self, table_uri: str, exec_col_query: Callable) -> Table:
+        """
+        Sends usage and table level queries to the bounded executor and runs column query on the calling thread, so
+        that the three queries are in flight at the same time, each on its own pooled session.
+        Column query result is awaited first so that NotFoundException takes precedence the same way it does
+        when the queries run one after another.
+        """
+        usage_future = self._submit_table_query(self._exec_usage_query, table_uri)
+        table_future = self._submit_table_query(self._exec_table_query, table_uri)
+
+        cols, tbl_context_record = exec_col_query(table_uri)
+        readers = usage_future.result()
+        table_level_results = table_future.result()
+
+        return self._build_table(cols, tbl_context_record, readers, table_level_results)
+
+    def _submit_table_query(self, fn: Any, table_uri: str) -> Future:
+        """
+        Submits the query method to the executor within the current Flask app context, which is needed by statsd
+        utilities in the worker thread.
+        """
+        app = current_app._get_current_object()  # type: ignore
+
+        def run_in_app_context() -> Any:
+            with app.app_context():
+                return fn(table_uri)
+
+        return self._table_query_executor.submit(run_in_app_context)  # type: ignore
 
-        table = Table(database=last_neo4j_record['db']['name'],
-                      cluster=last_neo4j_record['clstr']['name'],
-                      schema=last_neo4j_record['schema']['name'],
-                      name=last_neo4j_record['tbl']['name'],
+    def _build_table(self, cols: List[Column], tbl_context_record: Any, readers: List[Reader],
+                     table_level_results: Tuple) -> Table:
+        wmk_results, table_writer, timestamp_value, owners, tags, source = table_level_results
+
+        table = Table(database=tbl_context_record['database_name'],
+                      cluster=tbl_context_record['cluster_name'],
+                      schema=tbl_context_record['schema_name'],
+                      name=tbl_context_record['table_name'],
                       tags=tags,
-                      description=self._safe_get(last_neo4j_record, 'tbl_dscrpt', 'description'),
+                      description=tbl_context_record['table_description'],
                       columns=cols,
                       owners=owners,
                       table_readers=readers,
@@ -81,51 +302,134 @@ class Neo4jProxy(BaseProxy):
                       table_writer=table_writer,
                       last_updated_timestamp=timestamp_value,
                       source=source,
-                      is_view=self._safe_get(last_neo4j_record, 'tbl', 'is_view'))
+                      is_view=tbl_context_record['is_view'],
+                      column_count=tbl_context_record.get('column_count'))
 
         return table
 
     @timer_with_counter
     def _exec_col_query(self, table_uri: str) -> Tuple:
-        # Return Value: (Columns, Last Processed Record)
+        """
+        Queries table context and its columns in one record. Table context is returned once, and columns are
+        collected as projected maps of the properties being used, instead of repeating database, cluster, schema and
+        table nodes on every column row.
+        """
+        # Return Value: (Columns, Table Context Record)
 
-        column_level_query = textwrap.dedent("""
+        column_level_query = textwrap.dedent("""\
         MATCH (db:Database)<-[:CLUSTER_OF]-(clstr:Cluster)<-[:SCHEMA_OF]-(schema:Schema)
         <-[:TABLE_OF]-(tbl:Table {key: $tbl_key})-[:COLUMN]->(col:Column)
+        OPTIONAL MATCH (col)-[:DESCRIPTION]->(col_dscrpt:Description)
+        OPTIONAL MATCH (col)-[:STAT]->(stat:Stat)
+        WITH db, clstr, schema, tbl, col, col_dscrpt,
+        collect(distinct stat {.stat_name, .stat_val, .start_epoch, .end_epoch}) as col_stats
+        ORDER BY col.sort_order
+        WITH db, clstr, schema, tbl,
+        collect(col {.name, .type, .sort_order, description: col_dscrpt.description, stats: col_stats}) as cols
         OPTIONAL MATCH (tbl)-[:DESCRIPTION]->(tbl_dscrpt:Description)
-        OPTIONAL MATCH (col:Column)-[:DESCRIPTION]->(col_dscrpt:Description)
-        OPTIONAL MATCH (col:Column)-[:STAT]->(stat:Stat)
-        RETURN db, clstr, schema, tbl, tbl_dscrpt, col, col_dscrpt, collect(distinct stat) as col_stats
-        ORDER BY col.sort_order;""")
-
-        tbl_col_neo4j_records = self._execute_cypher_query(
-            statement=column_level_query, param_dict={'tbl_key': table_uri})
-        cols = []
-        for tbl_col_neo4j_record in tbl_col_neo4j_records:
-            # Getting last record from this for loop as Neo4j's result's random access is O(n) operation.
-            col_stats = []
-            for stat in tbl_col_neo4j_record['col_stats']:
-                col_stat = Statistics(
-                    stat_type=stat['stat_name'],
-                    stat_val=stat['stat_val'],
-                    start_epoch=int(float(stat['start_epoch'])),
-                    end_epoch=int(float(stat['end_epoch']))
-                )
-                col_stats.append(col_stat)
-
-            last_neo4j_record = tbl_col_neo4j_record
-            col = Column(name=tbl_col_neo4j_record['col']['name'],
-                         description=self._safe_get(tbl_col_neo4j_record, 'col_dscrpt', 'description'),
-                         col_type=tbl_col_neo4j_record['col']['type'],
-                         sort_order=int(tbl_col_neo4j_record['col']['sort_order']),
-                         stats=col_stats)
-
-            cols.append(col)
-
-        if not cols:
+        RETURN db.name as database_name, clstr.name as cluster_name, schema.name as schema_name,
+        tbl.name as table_name, tbl.is_view as is_view, tbl_dscrpt.description as table_description, cols
+        """)
+
+        tbl_context_record = self._execute_cypher_query(
+            statement=column_level_query, param_dict={'tbl_key': table_uri}).single()
+
+        if not tbl_context_record:
             raise NotFoundException('Table URI( {table_uri} ) does not exist'.format(table_uri=table_uri))
 
-        return (cols, last_neo4j_record)
+        cols = [self._build_column(col_record) for col_record in tbl_context_record['cols']]
+
+        return (cols, tbl_context_record)
+
+    @timer_with_counter
+    def _exec_col_count_query(self, table_uri: str) -> Tuple:
+        """
+        Queries table context with the number of columns, instead of the columns.
+        """
+        # Return Value: (Empty Columns, Table Context Record)
+
+        column_count_query = textwrap.dedent("""\
+        MATCH (db:Database)<-[:CLUSTER_OF]-(clstr:Cluster)<-[:SCHEMA_OF]-(schema:Schema)
+        <-[:TABLE_OF]-(tbl:Table {key: $tbl_key})
+        WITH db, clstr, schema, tbl, size((tbl)-[:COLUMN]->(:Column)) as column_count
+        WHERE column_count > 0
+        OPTIONAL MATCH (tbl)-[:DESCRIPTION]->(tbl_dscrpt:Description)
+        RETURN db.name as database_name, clstr.name as cluster_name, schema.name as schema_name,
+        tbl.name as table_name, tbl.is_view as is_view, tbl_dscrpt.description as table_description, column_count
+        """)
+
+        tbl_context_record = self._execute_cypher_query(
+            statement=column_count_query, param_dict={'tbl_key': table_uri}).single()
+
+        # Same as column query, a table without columns is treated as non-existent
+        if not tbl_context_record:
+            raise NotFoundException('Table URI( {table_uri} ) does not exist'.format(table_uri=table_uri))
+
+        return ([], tbl_context_record)
+
+    @timer_with_counter
+    def get_columns(self, *, table_uri: str, offset: int, limit: int) -> List[Column]:
+        """
+        Retrieves a page of columns of the table ordered by sort order.
+
+        :param table_uri: Table URI
+        :param offset: Number of columns to skip
+        :param limit: Max number of columns to return
+        :return: List of Column, which is empty when the page is past the last column. Raises NotFoundException when
+        the table does not exist.
+        """
+
+        column_page_query = textwrap.dedent("""\
+        MATCH (tbl:Table {key: $tbl_key})-[:COLUMN]->(col:Column)
+        WITH col
+        ORDER BY col.sort_order SKIP $offset LIMIT $limit
+        OPTIONAL MATCH (col)-[:DESCRIPTION]->(col_dscrpt:Description)
+        OPTIONAL MATCH (col)-[:STAT]->(stat:Stat)
+        WITH col, col_dscrpt, collect(distinct stat {.stat_name, .stat_val, .start_epoch, .end_epoch}) as col_stats
+        RETURN col {.name, .type, .sort_order, description: col_dscrpt.description, stats: col_stats} as col_record
+        ORDER BY col.sort_order
+        """)
+
+        records = self._execute_cypher_query(statement=column_page_query,
+                                             param_dict={'tbl_key': table_uri, 'offset': offset, 'limit': limit})
+        cols = [self._build_column(record['col_record']) for record in records]
+
+        # An empty page doesn't tell whether the table exists, so that it's checked separately
+        if not cols and not self._table_exists(table_uri):
+            raise NotFoundException('Table URI( {table_uri} ) does not exist'.format(table_uri=table_uri))
+
+        return cols
+
+    def _table_exists(self, table_uri: str) -> bool:
+        table_exists_query = textwrap.dedent("""\
+        MATCH (tbl:Table {key: $tbl_key})
+        RETURN tbl.key as tbl_key
+        """)
+
+        record = self._execute_cypher_query(statement=table_exists_query,
+                                            param_dict={'tbl_key': table_uri}).single()
+        return record is not None
+
+    @staticmethod
+    def _build_column(col_record: Any) -> Column:
+        """
+        Transforms a projected column map having name, type, sort_order, description and stats into Column
+        """
+        col_stats = []
+        for stat in col_record['stats']:
+            col_stat = Statistics(
+                stat_type=stat['stat_name'],
+                stat_val=stat['stat_val'],
+                start_epoch=int(float(stat['start_epoch'])),
+                end_epoch=int(float(stat['end_epoch']))
+            )
+            col_stats.append(col_stat)
+
+        return Column(name=col_record['name'],
+                      description=col_record['description'],
+                      col_type=col_record['type'],
+                      sort_order=int(col_record['sort_order']),
+                      stats=col_stats)
 
     @timer_with_counter
     def _exec_usage_query(self, table_uri: str) -> List[Reader]:
@@ -139,10 +443,14 @@ class Neo4jProxy(BaseProxy):
 
         usage_neo4j_records = self._execute_cypher_query(statement=usage_query,
                                                          param_dict={'tbl_key': table_uri})
+        return self._build_readers(usage_neo4j_records)
+
+    @staticmethod
+    def _build_readers(usage_records: Iterable[Any]) -> List[Reader]:
         readers = []  # type: List[Reader]
-        for usage_neo4j_record in usage_neo4j_records:
-            reader = Reader(user=User(email=usage_neo4j_record['email']),
-                            read_count=usage_neo4j_record['read_count'])
+        for usage_record in usage_records:
+            reader = Reader(user=User(email=usage_record['email']),
+                            read_count=usage_record['read_count'])
             readers.append(reader)
 
         return readers
@@ -175,8 +483,13 @@ class Neo4jProxy(BaseProxy):
         table_records = self._execute_cypher_query(statement=table_level_query,
                                                    param_dict={'tbl_key': table_uri})
 
-        table_records = table_records.single()
+        return self._build_table_level_results(table_records.single())
 
+    def _build_table_level_results(self, table_records: Any) -> Tuple:
+        """
+        Transforms a record having wmk_records, application, last_updated_timestamp, owner_records, tag_records and src
+        into (Watermark Results, Table Writer, Last Updated Timestamp, owner records, tag records, Source)
+        """
         wmk_results = []
         table_writer = None
 
@@ -223,6 +536,148 @@ class Neo4jProxy(BaseProxy):
 
         return wmk_results, table_writer, timestamp_value, owner_record, tags, src
 
+    @timer_with_counter
+    def _exec_table_detail_query(self, table_uri: str) -> Table:
+        """
+        Queries columns, readers and table level information of a table with one Cypher statement, as an
+        alternative to running _exec_col_query, _exec_usage_query and _exec_table_query.
+        Columns and readers are aggregated with collect() and the rest of the relations with pattern comprehension,
+        so that the statement returns a single record and runs on Neo4j versions without CALL subqueries.
+        Pattern comprehension returns a node once per path, so that the nodes are de-duplicated with reduce() as
+        collect(distinct) does in _exec_table_query.
+        """
+
+        table_detail_query = textwrap.dedent("""\
+        MATCH (db:Database)<-[:CLUSTER_OF]-(clstr:Cluster)<-[:SCHEMA_OF]-(schema:Schema)
+        <-[:TABLE_OF]-(tbl:Table {key: $tbl_key})-[:COLUMN]->(col:Column)
+        OPTIONAL MATCH (col)-[:DESCRIPTION]->(col_dscrpt:Description)
+        OPTIONAL MATCH (col)-[:STAT]->(stat:Stat)
+        WITH db, clstr, schema, tbl, col, col_dscrpt,
+        collect(distinct stat {.stat_name, .stat_val, .start_epoch, .end_epoch}) as col_stats
+        ORDER BY col.sort_order
+        WITH db, clstr, schema, tbl,
+        collect(col {.name, .type, .sort_order, description: col_dscrpt.description, stats: col_stats}) as cols
+        OPTIONAL MATCH (tbl)-[:DESCRIPTION]->(tbl_dscrpt:Description)
+        OPTIONAL MATCH (user:User)-[read:READ]->(tbl)
+        WITH db, clstr, schema, tbl, tbl_dscrpt, cols, user, read
+        ORDER BY read.read_count DESC
+        WITH db, clstr, schema, tbl, tbl_dscrpt, cols,
+        collect(CASE WHEN user IS NOT NULL THEN {email: user.email, read_count: read.read_count} END)[0..5]
+        as usage_records
+        OPTIONAL MATCH (application:Application)-[:GENERATES]->(tbl)
+        OPTIONAL MATCH (tbl)-[:LAST_UPDATED_AT]->(t:Timestamp)
+        OPTIONAL MATCH (tbl)-[:SOURCE]->(src:Source)
+        RETURN db.name as database_name, clstr.name as cluster_name, schema.name as schema_name,
+        tbl.name as table_name, tbl.is_view as is_view, tbl_dscrpt.description as table_description,
+        cols, usage_records,
+        reduce(wmks = [], wmk IN [(wmk:Watermark)-[:BELONG_TO_TABLE]->(tbl) | wmk] |
+        CASE WHEN wmk IN wmks THEN wmks ELSE wmks + wmk END) as wmk_records,
+        application,
+        t.last_updated_timestamp as last_updated_timestamp,
+        reduce(owners = [], owner IN [(owner:User)-[:OWNER_OF]->(tbl) | owner] |
+        CASE WHEN owner IN owners THEN owners ELSE owners + owner END) as owner_records,
+        reduce(tags = [], tag IN [(tbl)-[:TAGGED_BY]->(tag:Tag) | tag] |
+        CASE WHEN tag IN tags THEN tags ELSE tags + tag END) as tag_records,
+        src
+        """)
+
+        table_detail_record = self._execute_cypher_query(statement=table_detail_query,
+                                                         param_dict={'tbl_key': table_uri}).single()
+
+        if not table_detail_record:
+            raise NotFoundException('Table URI( {table_uri} ) does not exist'.format(table_uri=table_uri))
+
+        cols = [self._build_column(col_record) for col_record in table_detail_record['cols']]
+        readers = self._build_readers(table_detail_record['usage_records'])
+
+        return self._build_table(cols, table_detail_record, readers,
+                                 self._build_table_level_results(table_detail_record))
+
+    @timer_with_counter
+    @cache_by_table_uris
+    def get_tables(self, *, table_uris: List[str]) -> Dict[str, Table]:
+        """
+        Retrieves many tables with UNWIND version of column, usage and table level queries, where each query is sent
+        once per chunk of config.NEO4J_BULK_TABLE_BATCH_SIZE table uris.
+
+        :param table_uris: Table URIs
+        :return: Dictionary of table uri to Table. Table uris that do not exist are not included.
+        """
+        tables = {}  # type: Dict[str, Table]
+        for i in range(0, len(table_uris), self._bulk_table_batch_size):
+            tables.update(self._exec_bulk_table_queries(table_uris[i:i + self._bulk_table_batch_size]))
+        return tables
+
+    @timer_with_counter
+    def _exec_bulk_table_queries(self, table_uris: List[str]) -> Dict[str, Table]:
+        bulk_column_level_query = textwrap.dedent("""\
+        UNWIND $tbl_keys as tbl_key
+        MATCH (db:Database)<-[:CLUSTER_OF]-(clstr:Cluster)<-[:SCHEMA_OF]-(schema:Schema)
+        <-[:TABLE_OF]-(tbl:Table {key: tbl_key})-[:COLUMN]->(col:Column)
+        OPTIONAL MATCH (col)-[:DESCRIPTION]->(col_dscrpt:Description)
+        OPTIONAL MATCH (col)-[:STAT]->(stat:Stat)
+        WITH tbl_key, db, clstr, schema, tbl, col, col_dscrpt,
+        collect(distinct stat {.stat_name, .stat_val, .start_epoch, .end_epoch}) as col_stats
+        ORDER BY col.sort_order
+        WITH tbl_key, db, clstr, schema, tbl,
+        collect(col {.name, .type, .sort_order, description: col_dscrpt.description, stats: col_stats}) as cols
+        OPTIONAL MATCH (tbl)-[:DESCRIPTION]->(tbl_dscrpt:Description)
+        RETURN tbl_key, db.name as database_name, clstr.name as cluster_name, schema.name as schema_name,
+        tbl.name as table_name, tbl.is_view as is_view, tbl_dscrpt.description as table_description, cols
+        """)
+
+        bulk_usage_query = textwrap.dedent("""\
+        UNWIND $tbl_keys as tbl_key
+        MATCH (user:User)-[read:READ]->(table:Table {key: tbl_key})
+        WITH tbl_key, user, read
+        ORDER BY read.read_count DESC
+        RETURN tbl_key, collect({email: user.email, read_count: read.read_count})[0..5] as usage_records
+        """)
+
+        bulk_table_level_query = textwrap.dedent("""\
+        UNWIND $tbl_keys as tbl_key
+        MATCH (tbl:Table {key: tbl_key})
+        OPTIONAL MATCH (wmk:Watermark)-[:BELONG_TO_TABLE]->(tbl)
+        OPTIONAL MATCH (application:Application)-[:GENERATES]->(tbl)
+        OPTIONAL MATCH (tbl)-[:LAST_UPDATED_AT]->(t:Timestamp)
+        OPTIONAL MATCH (owner:User)-[:OWNER_OF]->(tbl)
+        OPTIONAL MATCH (tbl)-[:TAGGED_BY]->(tag:Tag)
+        OPTIONAL MATCH (tbl)-[:SOURCE]->(src:Source)
+        RETURN tbl_key,
+        collect(distinct wmk) as wmk_records,
+        application,
+        t.last_updated_timestamp as last_updated_timestamp,
+        collect(distinct owner) as owner_records,
+        collect(distinct tag) as tag_records,
+        src
+        """)
+
+        param_dict = {'tbl_keys': table_uris}
+
+        tbl_context_records = {}  # type: Dict[str, Any]
+        for record in self._execute_cypher_query(statement=bulk_column_level_query, param_dict=param_dict):
+            tbl_context_records.setdefault(record['tbl_key'], record)
+
+        if not tbl_context_records:
+            return {}
+
+        usage_records = {}  # type: Dict[str, Any]
+        for record in self._execute_cypher_query(statement=bulk_usage_query, param_dict=param_dict):
+            usage_records.setdefault(record['tbl_key'], record['usage_records'])
+
+        table_records = {}  # type: Dict[str, Any]
+        for record in self._execute_cypher_query(statement=bulk_table_level_query, param_dict=param_dict):
+            # Same as single() on the table level query of a table, first record is used
+            table_records.setdefault(record['tbl_key'], record)
+
+        tables = {}
+        for table_uri, tbl_context_record in tbl_context_records.items():
+            cols = [self._build_column(col_record) for col_record in tbl_context_record['cols']]
+            readers = self._build_readers(usage_records.get(table_uri, []))
+            tables[table_uri] = self._build_table(cols, tbl_context_record, readers,
+                                                  self._build_table_level_results(table_records[table_uri]))
+        return tables
+
     @no_type_check
     def _safe_get(self, dct, *keys):
         """
@@ -237,6 +692,69 @@ class Neo4jProxy(BaseProxy):
                 return None
         return dct
 
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """
+        Opens a session, which is always closed on exit. At most num_conns sessions are open at once, and callers wait
+        up to config.NEO4J_SESSION_ACQUISITION_TIMEOUT_SEC seconds for one. A thread can only have one session open,
+        e.g. no query is run with another session inside _transaction(), as threads holding a session while waiting for
+        another one could wait for each other once all num_conns are open.
+
+        Wait for a session is emitted as sessions.acquire_wait timer and the number of open sessions as sessions.open
+        gauge. They count sessions, not the connections of the driver's pool.
+        :raises RuntimeError: If the current thread already has a session open, or no session is available in time
+        """
+        if getattr(self._session_local, 'is_open', False):
+            raise RuntimeError('Neo4j session is already open in this thread')
+
+        statsd_client = _get_statsd_client(prefix=__name__)
+
+        start = time.monotonic()
+        if not self._session_semaphore.acquire(timeout=self._session_acquisition_timeout_sec):
+            raise RuntimeError('Failed to acquire Neo4j session within {} seconds'
+                               .format(self._session_acquisition_timeout_sec))
+        self._session_local.is_open = True
+        try:
+            with self._sessions_in_use_lock:
+                self._sessions_in_use += 1
+                in_use = self._sessions_in_use
+            if statsd_client:
+                statsd_client.timing('sessions.acquire_wait', (time.monotonic() - start) * 1000)
+                statsd_client.gauge('sessions.open', in_use)
+
+            session = self._driver.session()
+            try:
+                yield session
+            finally:
+                session.close()
+        finally:
+            self._session_local.is_open = False
+            with self._sessions_in_use_lock:
+                self._sessions_in_use -= 1
+                in_use = self._sessions_in_use
+            self._session_semaphore.release()
+            if statsd_client:
+                statsd_client.gauge('sessions.open', in_use)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Transaction]:
+        """
+        Unit of work of write methods. The transaction is committed when the block exits normally and rolled back
+        when it raises, and its session is always closed.
+        """
+        with self._session() as session:
+            tx = session.begin_transaction()
+            try:
+                yield tx
+                tx.commit()
+            except Exception:
+                if not tx.closed():
+                    tx.rollback()
+                raise
+            finally:
+                if not tx.closed():
+                    tx.close()
+
     @timer_with_counter
     def _execute_cypher_query(self, *,
                               statement: str,
@@ -246,7 +764,7 @@ class Neo4jProxy(BaseProxy):
                                                                                              params=param_dict))
         start = time.time()
         try:
-            with self._driver.session() as session:
+            with self._session() as session:
                 return session.run(statement, **param_dict)
 
         finally:
@@ -279,63 +797,119 @@ class Neo4jProxy(BaseProxy):
         return table_description
 
     @timer_with_counter
+    @invalidate_by_table_uri
     def put_table_description(self, *,
                               table_uri: str,
-                              description: str) -> None:
+                              description: str,
+                              etag: Optional[str] = None) -> None:
         """
         Update table description with one from user
         :param table_uri: Table uri (key in Neo4j)
         :param description: new value for table description
+        :param etag: If given, the update fails with PreconditionFailedException unless the current description has
+        this ETag
+        """
+        if self._put_description(label='Table', key=table_uri, description=description, etag=etag):
+            log_changes(self._change_log, [(table_uri, 'put_table_description')])
+
+    def _put_description(self, *,
+                         label: str,
+                         key: str,
+                         description: str,
+                         etag: Optional[str]) -> bool:
+        """
+        Upserts description of the Table or Column node with one statement, which skips the write when the
+        description is unchanged. With etag, the node is locked first, and then its current description is read and
+        compared in the same transaction, so that concurrent updates with the same etag are applied one at a time and
+        only the first one passes.
+        :param label: Table or Column
+        :param key: Key of the table or column node
+        :param description:
+        :param etag: ETag of the current description, from get_description_etag
+        :return: Whether the description is changed
         """
         # start neo4j transaction
-        desc_key = table_uri + '/_description'
-
-        upsert_desc_query = textwrap.dedent("""
-            MERGE (u:Description {key: $desc_key})
-            on CREATE SET u={description: $description, key: $desc_key}
-            on MATCH SET u={description: $description, key: $desc_key}
-            """)
-
-        upsert_desc_tab_relation_query = textwrap.dedent("""
-            MATCH (n1:Description {key: $desc_key}), (n2:Table {key: $tbl_key})
-            MERGE (n1)-[r1:DESCRIPTION_OF]->(n2)-[r2:DESCRIPTION]->(n1)
-            RETURN n1.key, n2.key
-            """)
+        desc_key = key + '/_description'
 
         start = time.time()
 
         try:
-            tx = self._driver.session().begin_transaction()
-
-            tx.run(upsert_desc_query, {'description': description,
-                                       'desc_key': desc_key})
-
-            result = tx.run(upsert_desc_tab_relation_query, {'desc_key': desc_key,
-                                                             'tbl_key': table_uri})
-
-            if not result.single():
-                raise RuntimeError('Failed to update the table {tbl} description'.format(tbl=table_uri))
-
-            # end neo4j transaction
-            tx.commit()
+            with self._transaction() as tx:
+                if etag is not None:
+                    record = tx.run(_LOCK_AND_GET_DESCRIPTION_QUERY[label], {'key': key}).single()
+                    if record and get_description_etag(record['description']) != etag:
+                        raise PreconditionFailedException('Description of {} has changed'.format(key))
+
+                record = tx.run(_UPSERT_DESCRIPTION_QUERY[label], {'description': description,
+                                                                   'desc_key': desc_key,
+                                                                   'key': key}).single()
+
+                if not record:
+                    raise RuntimeError('Failed to update the {} {} description'.format(label.lower(), key))
+                if record['unchanged']:
+                    LOGGER.debug('Description of {} is unchanged'.format(key))
+                return not record['unchanged']
 
         except Exception as e:
 
             LOGGER.exception('Failed to execute update process')
 
-            if not tx.closed():
-                tx.rollback()
-
             # propagate exception back to api
             raise e
 
         finally:
 
-            tx.close()
-
             if LOGGER.isEnabledFor(logging.DEBUG):
                 LOGGER.debug('Update process elapsed for {} seconds'.format(time.time() - start))
 
+    @timer_with_counter
+    def put_descriptions_bulk(self, *, descriptions: List[Dict[str, str]]) -> List[bool]:
+        """
+        Upserts many table and column descriptions. Each chunk of config.NEO4J_BULK_WRITE_BATCH_SIZE items is applied
+        in one transaction, with one UNWIND statement for table descriptions and one for column descriptions.
+        Items whose table or column does not exist are skipped.
+
+        :param descriptions: List of dictionary with table_uri, description and optional column_name
+        :return: Whether each item is applied, in the same order as descriptions
+        """
+        upsert_table_desc_bulk_query = _UPSERT_DESCRIPTION_BULK_QUERY['Table']
+        upsert_column_desc_bulk_query = _UPSERT_DESCRIPTION_BULK_QUERY['Column']
+
+        keys = []
+        for item in descriptions:
+            column_name = item.get('column_name')
+            keys.append(item['table_uri'] + '/' + column_name if column_name else item['table_uri'])
+
+        updated_keys = set()  # type: Set[str]
+        try:
+            for i in range(0, len(descriptions), self._bulk_write_batch_size):
+                table_items = []  # type: List[Dict[str, str]]
+                column_items = []  # type: List[Dict[str, str]]
+                for item, key in zip(descriptions[i:i + self._bulk_write_batch_size],
+                                     keys[i:i + self._bulk_write_batch_size]):
+                    items = column_items if item.get('column_name') else table_items
+                    items.append({'key': key, 'desc_key': key + '/_description', 'description': item['description']})
+
+                try:
+                    with self._transaction() as tx:
+                        for query, items in ((upsert_table_desc_bulk_query, table_items),
+                                             (upsert_column_desc_bulk_query, column_items)):
+                            if items:
+                                updated_keys.update(record['key'] for record in tx.run(query, {'items': items}))
+                except Exception as e:
+                    LOGGER.exception('Failed to execute bulk update process')
+                    # propagate exception back to api
+                    raise e
+        finally:
+            if self._table_cache is not None:
+                for item in descriptions:
+                    self._table_cache.invalidate(item['table_uri'])
+            # Items of the chunks committed before a failure are applied
+            log_changes(self._change_log, [(item['table_uri'], 'put_descriptions_bulk')
+                                           for item, key in zip(descriptions, keys) if key in updated_keys])
+
+        return [key in updated_keys for key in keys]
+
     @timer_with_counter
     def get_column_description(self, *,
                                table_uri: str,
@@ -362,75 +936,34 @@ class Neo4jProxy(BaseProxy):
         return column_description
 
     @timer_with_counter
+    @invalidate_by_table_uri
     def put_column_description(self, *,
                                table_uri: str,
                                column_name: str,
-                               description: str) -> None:
+                               description: str,
+                               etag: Optional[str] = None) -> None:
         """
         Update column description with input from user
         :param table_uri:
         :param column_name:
         :param description:
+        :param etag: If given, the update fails with PreconditionFailedException unless the current description has
+        this ETag
         :return:
         """
 
         column_uri = table_uri + '/' + column_name  # type: str
-        desc_key = column_uri + '/_description'
-
-        upsert_desc_query = textwrap.dedent("""
-            MERGE (u:Description {key: $desc_key})
-            on CREATE SET u={description: $description, key: $desc_key}
-            on MATCH SET u={description: $description, key: $desc_key}
-            """)
-
-        upsert_desc_col_relation_query = textwrap.dedent("""
-            MATCH (n1:Description {key: $desc_key}), (n2:Column {key: $column_key})
-            MERGE (n1)-[r1:DESCRIPTION_OF]->(n2)-[r2:DESCRIPTION]->(n1)
-            RETURN n1.key, n2.key
-            """)
-
-        start = time.time()
-
-        try:
-            tx = self._driver.session().begin_transaction()
-
-            tx.run(upsert_desc_query, {'description': description,
-                                       'desc_key': desc_key})
-
-            result = tx.run(upsert_desc_col_relation_query, {'desc_key': desc_key,
-                                                             'column_key': column_uri})
-
-            if not result.single():
-                raise RuntimeError('Failed to update the table {tbl} '
-                                   'column {col} description'.format(tbl=table_uri,
-                                                                     col=column_uri))
-
-            # end neo4j transaction
-            tx.commit()
-
-        except Exception as e:
-
-            LOGGER.exception('Failed to execute update process')
-
-            if not tx.closed():
-                tx.rollback()
-
-            # propagate error to api
-            raise e
-
-        finally:
-
-            tx.close()
-
-            if LOGGER.isEnabledFor(logging.DEBUG):
-                LOGGER.debug('Update process elapsed for {} seconds'.format(time.time() - start))
+        if self._put_description(label='Column', key=column_uri, description=description, etag=etag):
+            log_changes(self._change_log, [(table_uri, 'put_column_description')])
 
     @timer_with_counter
+    @invalidate_by_table_uri
+    @log_change_by_table_uri
     def add_owner(self, *,
                   table_uri: str,
                   owner: str) -> None:
         """
-        Update table owner informations.
+        Update table owner informations with one statement, if the table exists.
         1. Do a create if not exists query of the owner(user) node.
         2. Do a upsert of the owner/owned_by relation.
 
@@ -438,38 +971,26 @@ class Neo4jProxy(BaseProxy):
         :param owner:
         :return:
         """
-        create_owner_query = textwrap.dedent("""
-        MERGE (u:User {key: $user_email})
-        on CREATE SET u={email: $user_email, key: $user_email}
-        """)
-
-        upsert_owner_relation_query = textwrap.dedent("""
-        MATCH (n1:User {key: $user_email}), (n2:Table {key: $tbl_key})
+        upsert_owner_query = textwrap.dedent("""
+        MATCH (n2:Table {key: $tbl_key})
+        MERGE (n1:User {key: $user_email})
+        on CREATE SET n1={email: $user_email, key: $user_email}
         MERGE (n1)-[r1:OWNER_OF]->(n2)-[r2:OWNER]->(n1)
         RETURN n1.key, n2.key
         """)
 
-        try:
-            tx = self._driver.session().begin_transaction()
-            # upsert the node
-            tx.run(create_owner_query, {'user_email': owner})
-            result = tx.run(upsert_owner_relation_query, {'user_email': owner,
-                                                          'tbl_key': table_uri})
+        with self._transaction() as tx:
+            result = tx.run(upsert_owner_query, {'user_email': owner,
+                                                 'tbl_key': table_uri})
 
             if not result.single():
                 raise RuntimeError('Failed to create relation between '
                                    'owner {owner} and table {tbl}'.format(owner=owner,
                                                                           tbl=table_uri))
-        except Exception as e:
-            if not tx.closed():
-                tx.rollback()
-            # propagate the exception back to api
-            raise e
-        finally:
-            tx.commit()
-            tx.close()
 
     @timer_with_counter
+    @invalidate_by_table_uri
+    @log_change_by_table_uri
     def delete_owner(self, *,
                      table_uri: str,
                      owner: str) -> None:
@@ -484,25 +1005,18 @@ class Neo4jProxy(BaseProxy):
         MATCH (n1:User{key: $user_email})-[r1:OWNER_OF]->(n2:Table {key: $tbl_key})-[r2:OWNER]->(n1) DELETE r1,r2
         """)
 
-        try:
-            tx = self._driver.session().begin_transaction()
+        with self._transaction() as tx:
             tx.run(delete_query, {'user_email': owner,
                                   'tbl_key': table_uri})
-        except Exception as e:
-            # propagate the exception back to api
-            if not tx.closed():
-                tx.rollback()
-            raise e
-        finally:
-            tx.commit()
-            tx.close()
 
     @timer_with_counter
+    @invalidate_by_table_uri
+    @log_change_by_table_uri
     def add_tag(self, *,
                 table_uri: str,
                 tag: str) -> None:
         """
-        Add new tag
+        Add new tag with one statement, which returns no record if the table doesn't exist.
         1. Create the node with type Tag if the node doesn't exist.
         2. Create the relation between tag and table if the relation doesn't exist.
 
@@ -512,46 +1026,72 @@ class Neo4jProxy(BaseProxy):
         """
         LOGGER.info('New tag {} for table_uri {}'.format(tag, table_uri))
 
-        table_validation_query = 'MATCH (t:Table {key: $tbl_key}) return t'
-
         upsert_tag_query = textwrap.dedent("""
-        MERGE (u:Tag {key: $tag})
-        on CREATE SET u={tag_type: $tag_type, key: $tag}
-        on MATCH SET u={tag_type: $tag_type, key: $tag}
-        """)
-
-        upsert_tag_relation_query = textwrap.dedent("""
-        MATCH (n1:Tag {key: $tag}), (n2:Table {key: $tbl_key})
+        MATCH (n2:Table {key: $tbl_key})
+        MERGE (n1:Tag {key: $tag})
+        on CREATE SET n1={tag_type: $tag_type, key: $tag}
+        on MATCH SET n1={tag_type: $tag_type, key: $tag}
         MERGE (n1)-[r1:TAG]->(n2)-[r2:TAGGED_BY]->(n1)
         RETURN n1.key, n2.key
         """)
 
-        try:
-            tx = self._driver.session().begin_transaction()
-            tbl_result = tx.run(table_validation_query, {'tbl_key': table_uri})
-            if not tbl_result.single():
-                raise NotFoundException('table_uri {} does not exist'.format(table_uri))
-
+        with self._transaction() as tx:
             # upsert the node. Currently the type for all the tags is default. We could change it later per UI.
-            tx.run(upsert_tag_query, {'tag': tag,
-                                      'tag_type': 'default'})
-            result = tx.run(upsert_tag_relation_query, {'tag': tag,
-                                                        'tbl_key': table_uri})
+            result = tx.run(upsert_tag_query, {'tag': tag,
+                                               'tag_type': 'default',
+                                               'tbl_key': table_uri})
             if not result.single():
-                raise RuntimeError('Failed to create relation between '
-                                   'tag {tag} and table {tbl}'.format(tag=tag,
-                                                                      tbl=table_uri))
-            tx.commit()
-        except Exception as e:
-            if not tx.closed():
-                tx.rollback()
-            # propagate the exception back to api
-            raise e
+                raise NotFoundException('table_uri {} does not exist'.format(table_uri))
+
+        self._invalidate_tags_cache()
+
+    @timer_with_counter
+    @invalidate_by_table_uris
+    @log_change_by_table_uris
+    def add_tags_bulk(self, *,
+                      table_uris: List[str],
+                      tag: str) -> List[str]:
+        """
+        Adds the tag to many tables. Tag and its relations are upserted with one UNWIND statement and transaction per
+        chunk of config.NEO4J_BULK_WRITE_BATCH_SIZE table uris, where tables that do not exist are skipped.
+
+        :param table_uris:
+        :param tag:
+        :return: Table uris that do not exist
+        """
+        LOGGER.info('New tag {} for {} table uris'.format(tag, len(table_uris)))
+
+        upsert_tag_bulk_query = textwrap.dedent("""
+        UNWIND $tbl_keys as tbl_key
+        MATCH (tbl:Table {key: tbl_key})
+        WITH collect(tbl) as tbls
+        WHERE size(tbls) > 0
+        MERGE (u:Tag {key: $tag})
+        on CREATE SET u={tag_type: $tag_type, key: $tag}
+        on MATCH SET u={tag_type: $tag_type, key: $tag}
+        WITH u, tbls
+        UNWIND tbls as tbl
+        MERGE (u)-[r1:TAG]->(tbl)-[r2:TAGGED_BY]->(u)
+        RETURN tbl.key as tbl_key
+        """)
+
+        tagged = set()  # type: Set[str]
+        try:
+            for i in range(0, len(table_uris), self._bulk_write_batch_size):
+                with self._transaction() as tx:
+                    # Currently the type for all the tags is default, same as add_tag
+                    result = tx.run(upsert_tag_bulk_query, {'tbl_keys': table_uris[i:i + self._bulk_write_batch_size],
+                                                            'tag': tag,
+                                                            'tag_type': 'default'})
+                    tagged.update(record['tbl_key'] for record in result)
         finally:
-            if not tx.closed():
-                tx.close()
+            self._invalidate_tags_cache()
+
+        return [table_uri for table_uri in table_uris if table_uri not in tagged]
 
     @timer_with_counter
+    @invalidate_by_table_uri
+    @log_change_by_table_uri
     def delete_tag(self, *, table_uri: str,
                    tag: str) -> None:
         """
@@ -569,26 +1109,31 @@ class Neo4jProxy(BaseProxy):
         MATCH (n1:Tag{key: $tag})-[r1:TAG]->(n2:Table {key: $tbl_key})-[r2:TAGGED_BY]->(n1) DELETE r1,r2
         """)
 
-        try:
-            tx = self._driver.session().begin_transaction()
+        with self._transaction() as tx:
             tx.run(delete_query, {'tag': tag,
                                   'tbl_key': table_uri})
-        except Exception as e:
-            # propagate the exception back to api
-            if not tx.closed():
-                tx.rollback()
-            raise e
-        finally:
-            tx.commit()
-            tx.close()
+
+        self._invalidate_tags_cache()
 
     @timer_with_counter
+    @single_flight
     def get_tags(self) -> List:
         """
-        Get all existing tags from neo4j
+        Get all existing tags from neo4j. The result is cached for config.PROXY_TAGS_CACHE_EXPIRY_SEC if it's set.
 
         :return:
         """
+        if self._tags_cache is None:
+            return self._exec_tags_query()
+
+        return self._tags_cache.get(key='tags', createfunc=self._exec_tags_query)
+
+    def _invalidate_tags_cache(self) -> None:
+        if self._tags_cache is not None:
+            self._tags_cache.remove_value(key='tags')
+
+    @timer_with_counter
+    def _exec_tags_query(self) -> List[TagDetail]:
         LOGGER.info('Get all the tags')
         query = textwrap.dedent("""
         MATCH (t:Tag)
@@ -624,18 +1169,38 @@ class Neo4jProxy(BaseProxy):
             return None
 
     @timer_with_counter
-    @_CACHE.cache('_get_popular_tables_uris', _GET_POPULAR_TABLE_CACHE_EXPIRY_SEC)
     def _get_popular_tables_uris(self, num_entries: int) -> List[str]:
         """
         Retrieve popular table uris. Will provide tables with top x popularity score.
         Popularity score = number of distinct readers * log(total number of reads)
         The result of this method will be cached based on the key (num_entries), and the cache will be expired based on
-        _GET_POPULAR_TABLE_CACHE_EXPIRY_SEC
+        _GET_POPULAR_TABLE_CACHE_EXPIRY_SEC. With shared cache type (config.PROXY_CACHE_TYPE), only one process on the
+        host computes it.
 
         For score computation, it uses logarithm on total number of reads so that score won't be affected by small
         number of users reading a lot of times.
         :return: Iterable of table uri
         """
+        return self._popular_tables_cache.get(key=str(num_entries),  # type: ignore
+                                              createfunc=lambda: self._exec_popular_tables_uris_query(num_entries))
+
+    def _get_popular_tables_ranking(self) -> List[str]:
+        """
+        Retrieves top config.NEO4J_POPULAR_TABLES_PRECOMPUTE_SIZE popular table uris from the ranking cache, computing
+        them when they're missing or expired. With shared cache type (config.PROXY_CACHE_TYPE), only one process on the
+        host computes them while holding the cache's lock.
+        :return: Iterable of table uri
+        """
+        return self._popular_tables_ranking_cache.get(  # type: ignore
+            key=str(self._popular_tables_precompute_size),
+            createfunc=lambda: self._exec_popular_tables_uris_query(self._popular_tables_precompute_size))
+
+    @timer_with_counter
+    def _exec_popular_tables_uris_query(self, num_entries: int) -> List[str]:
+        """
+        Computes popular table uris with a full scan of READ_BY relationships. See _get_popular_tables_uris.
+        :return: Iterable of table uri
+        """
         query = textwrap.dedent("""
         MATCH (tbl:Table)-[r:READ_BY]->(u:User)
         WITH tbl.key as table_key, count(distinct u) as readers, sum(r.read_count) as total_reads
@@ -651,16 +1216,25 @@ class Neo4jProxy(BaseProxy):
         return [record['table_key'] for record in records]
 
     @timer_with_counter
+    @single_flight
     def get_popular_tables(self, *, num_entries: int) -> List[PopularTable]:
         """
         Retrieve popular tables. As popular table computation requires full scan of table and user relationship,
-        it will utilize cached method _get_popular_tables_uris.
+        it will utilize the ranking precomputed by the background refresher, or cached method _get_popular_tables_uris
+        if the refresher is disabled. Until the refresher has a ranking, it is read from the ranking cache, or computed
+        if no process has computed it yet.
 
         :param num_entries:
         :return: Iterable of PopularTable
         """
 
-        table_uris = self._get_popular_tables_uris(num_entries)
+        if self._popular_tables_refresher:
+            ranking = self._popular_tables_refresher.get()
+            if ranking is None:
+                ranking = self._get_popular_tables_ranking()
+            table_uris = ranking[:int(num_entries)]
+        else:
+            table_uris = self._get_popular_tables_uris(num_entries)
         if not table_uris:
             return []
 
@@ -687,6 +1261,7 @@ class Neo4jProxy(BaseProxy):
         return popular_tables
 
     @timer_with_counter
+    @single_flight
     def get_user_detail(self, *, user_id: str) -> Union[UserEntity, None]:
         """
         Retrieve user detail based on user_id(email).
@@ -728,17 +1303,14 @@ class Neo4jProxy(BaseProxy):
         return result
 
     @staticmethod
-    def _get_relation_by_type(relation_type: UserResourceRel) -> Tuple:
-
-        if relation_type == UserResourceRel.follow:
-            relation, reverse_relation = 'FOLLOW', 'FOLLOWED_BY'
-        elif relation_type == UserResourceRel.own:
-            relation, reverse_relation = 'OWNER_OF', 'OWNER'
-        elif relation_type == UserResourceRel.read:
-            relation, reverse_relation = 'READ', 'READ_BY'
-        else:
+    def _validate_relation_type(relation_type: UserResourceRel) -> None:
+        if relation_type not in _USER_RELATIONS:
             raise NotImplementedError('The relation type {} is not defined!'.format(relation_type))
-        return relation, reverse_relation
+
+    @staticmethod
+    def _get_relation_by_type(relation_type: UserResourceRel) -> Tuple:
+        Neo4jProxy._validate_relation_type(relation_type)
+        return _USER_RELATIONS[relation_type]
 
     @timer_with_counter
     def get_table_by_user_relation(self, *, user_email: str, relation_type: UserResourceRel) -> Dict[str, Any]:
@@ -751,13 +1323,7 @@ class Neo4jProxy(BaseProxy):
         :return:
         """
         relation, _ = self._get_relation_by_type(relation_type)
-
-        query = textwrap.dedent("""
-MATCH (user:User {{key: $query_key}})-[:{relation}]->(tbl:Table)-[:TABLE_OF]->
-(schema:Schema)-[:SCHEMA_OF]->(clstr:Cluster)-[:CLUSTER_OF]->(db:Database)
-WITH db, clstr, schema, tbl
-OPTIONAL MATCH (tbl)-[:DESCRIPTION]->(tbl_dscrpt:Description)
-RETURN db, clstr, schema, tbl, tbl_dscrpt""").format(relation=relation)
+        query = _GET_TABLES_BY_USER_RELATION_QUERY[relation_type]
 
         table_records = self._execute_cypher_query(statement=query, param_dict={'query_key': user_email})
 
@@ -809,6 +1375,7 @@ RETURN db, clstr, schema, tbl, tbl_dscrpt
         return {'table': results}
 
     @timer_with_counter
+    @invalidate_by_table_uri
     def add_table_relation_by_user(self, *,
                                    table_uri: str,
                                    user_email: str,
@@ -823,45 +1390,34 @@ RETURN db, clstr, schema, tbl, tbl_dscrpt
         :param relation_type:
         :return:
         """
-        relation, reverse_relation = self._get_relation_by_type(relation_type)
+        if self._queue_table_relation_by_user(table_uri=table_uri, user_email=user_email,
+                                              relation_type=relation_type, is_add=True):
+            return
+
+        self._validate_relation_type(relation_type)
 
         upsert_user_query = textwrap.dedent("""
         MERGE (u:User {key: $user_email})
         on CREATE SET u={email: $user_email, key: $user_email}
         """)
 
-        user_email = 'key: "{user_email}"'.format(user_email=user_email)
-        tbl_key = 'key: "{tbl_key}"'.format(tbl_key=table_uri)
-
-        upsert_user_relation_query = textwrap.dedent("""
-        MATCH (n1:User {{{user_email}}}), (n2:Table {{{tbl_key}}})
-        MERGE (n1)-[r1:{relation}]->(n2)-[r2:{reverse_relation}]->(n1)
-        RETURN n1.key, n2.key
-        """).format(user_email=user_email,
-                    tbl_key=tbl_key,
-                    relation=relation,
-                    reverse_relation=reverse_relation)
+        with self._synchronous_table_relation_by_user(table_uri=table_uri, user_email=user_email,
+                                                      relation_type=relation_type):
+            with self._transaction() as tx:
+                # upsert the node
+                tx.run(upsert_user_query, {'user_email': user_email})
+                result = tx.run(_UPSERT_USER_RELATION_QUERY[relation_type], {'user_email': user_email,
+                                                                             'tbl_key': table_uri})
 
-        try:
-            tx = self._driver.session().begin_transaction()
-            # upsert the node
-            tx.run(upsert_user_query, {'user_email': user_email})
-            result = tx.run(upsert_user_relation_query, {})
+                if not result.single():
+                    raise RuntimeError('Failed to create relation between '
+                                       'user {user} and table {tbl}'.format(user=user_email,
+                                                                            tbl=table_uri))
 
-            if not result.single():
-                raise RuntimeError('Failed to create relation between '
-                                   'user {user} and table {tbl}'.format(user=user_email,
-                                                                        tbl=table_uri))
-            tx.commit()
-        except Exception as e:
-            if not tx.closed():
-                tx.rollback()
-            # propagate the exception back to api
-            raise e
-        finally:
-            tx.close()
+            log_changes(self._change_log, [(table_uri, 'add_table_relation_by_user')])
 
     @timer_with_counter
+    @invalidate_by_table_uri
     def delete_table_relation_by_user(self, *,
                                       table_uri: str,
                                       user_email: str,
@@ -874,27 +1430,196 @@ RETURN db, clstr, schema, tbl, tbl_dscrpt
         :param relation_type:
         :return:
         """
-        relation, reverse_relation = self._get_relation_by_type(relation_type)
+        if self._queue_table_relation_by_user(table_uri=table_uri, user_email=user_email,
+                                              relation_type=relation_type, is_add=False):
+            return
 
-        user_email = 'key: "{user_email}"'.format(user_email=user_email)
-        tbl_key = 'key: "{tbl_key}"'.format(tbl_key=table_uri)
+        self._validate_relation_type(relation_type)
 
-        delete_query = textwrap.dedent("""
-        MATCH (n1:User {{{user_email}}})-[r1:{relation}]->
-        (n2:Table {{{tbl_key}}})-[r2:{reverse_relation}]->(n1) DELETE r1,r2
-        """).format(user_email=user_email,
-                    tbl_key=tbl_key,
-                    relation=relation,
-                    reverse_relation=reverse_relation)
+        with self._synchronous_table_relation_by_user(table_uri=table_uri, user_email=user_email,
+                                                      relation_type=relation_type):
+            with self._transaction() as tx:
+                tx.run(_DELETE_USER_RELATION_QUERY[relation_type], {'user_email': user_email,
+                                                                    'tbl_key': table_uri})
+
+            log_changes(self._change_log, [(table_uri, 'delete_table_relation_by_user')])
+
+    def _queue_table_relation_by_user(self, *,
+                                      table_uri: str,
+                                      user_email: str,
+                                      relation_type: UserResourceRel,
+                                      is_add: bool) -> bool:
+        """
+        Queues follow or read relation update when write-behind is on, which is logged to the change log once it is
+        flushed. Other relations are written synchronously.
+        :return: True if the update is queued
+        """
+        if self._relation_write_behind_queue is None or \
+                relation_type not in (UserResourceRel.follow, UserResourceRel.read):
+            return False
+
+        return self._relation_write_behind_queue.put((user_email, table_uri, relation_type), is_add)
+
+    @contextmanager
+    def _synchronous_table_relation_by_user(self, *,
+                                            table_uri: str,
+                                            user_email: str,
+                                            relation_type: UserResourceRel) -> Iterator[None]:
+        """
+        Context of follow or read relation update that is written synchronously while write-behind is on, e.g. as the
+        queue is full. It's serialized with the flush, so that a queued update of the same relation isn't written
+        after it.
+        """
+        if self._relation_write_behind_queue is None or \
+                relation_type not in (UserResourceRel.follow, UserResourceRel.read):
+            yield
+            return
+
+        with self._relation_write_behind_queue.synchronous_write((user_email, table_uri, relation_type)):
+            yield
+
+    @timer_with_counter
+    def _flush_table_relations_by_user(self, writes: List[Tuple[Tuple[str, str, UserResourceRel], bool]]) \
+            -> List[Tuple[Tuple[str, str, UserResourceRel], bool]]:
+        """
+        Writes queued relation updates, grouped by relation and add or delete, with one UNWIND statement and
+        transaction per chunk of config.NEO4J_BULK_WRITE_BATCH_SIZE. Each chunk is sorted by user so that
+        transactions lock User nodes in the same order. Once a chunk fails, the rest are not written.
+
+        :param writes: List of ((user email, table uri, relation type), whether to add or delete the relation)
+        :return: Writes of the failed chunk and the ones after it, to be queued again
+        """
+        writes_by_statement = OrderedDict()  # type: OrderedDict
+        for write in writes:
+            (user_email, table_uri, relation_type), is_add = write
+            self._validate_relation_type(relation_type)
+            statement = _UPSERT_USER_RELATION_BULK_QUERY[relation_type] if is_add \
+                else _DELETE_USER_RELATION_BULK_QUERY[relation_type]
+            writes_by_statement.setdefault(statement, []).append(write)
+
+        chunks = []  # type: List[Tuple[str, List[Tuple[Tuple[str, str, UserResourceRel], bool]]]]
+        for statement, statement_writes in writes_by_statement.items():
+            for i in range(0, len(statement_writes), self._bulk_write_batch_size):
+                chunks.append((statement, sorted(statement_writes[i:i + self._bulk_write_batch_size],
+                                                 key=lambda write: (write[0][0], write[0][1]))))
 
         try:
-            tx = self._driver.session().begin_transaction()
-            tx.run(delete_query, {})
-            tx.commit()
-        except Exception as e:
-            # propagate the exception back to api
-            if not tx.closed():
-                tx.rollback()
-            raise e
+            for i, (statement, chunk) in enumerate(chunks):
+                try:
+                    with self._transaction() as tx:
+                        tx.run(statement, {'relations': [{'user_email': user_email, 'tbl_key': table_uri}
+                                                         for (user_email, table_uri, _), _ in chunk]})
+                except Exception:
+                    LOGGER.exception('Failed to write {} relation updates'.format(len(chunk)))
+                    return [write for _, failed_chunk in chunks[i:] for write in failed_chunk]
+
+                log_changes(self._change_log, [(table_uri, 'add_table_relation_by_user' if is_add
+                                                else 'delete_table_relation_by_user')
+                                               for (_, table_uri, _), is_add in chunk])
+            return []
         finally:
-            tx.close()
+            if self._table_cache is not None:
+                for (_, table_uri, _), _ in writes:
+                    self._table_cache.invalidate(table_uri)
+
+    @timer_with_counter
+    def put_table_usages_bulk(self, *, usages: Iterable[Tuple[str, str, int]]) -> int:
+        """
+        Sets how many times users read tables, i.e. read_count of READ and READ_BY relations, creating the users and
+        relations as needed. Usages are consumed while they are iterated, in chunks of
+        config.NEO4J_BULK_WRITE_BATCH_SIZE with one UNWIND statement and transaction each, so that memory is bounded by
+        the chunk size regardless of the number of usages. Each chunk is sorted by user so that transactions lock User
+        nodes in the same order. Usages of tables that do not exist are skipped.
+
+        :param usages: Iterable of (user email, table uri, read count)
+        :return: Number of usages applied
+        """
+        upsert_usage_bulk_query = textwrap.dedent("""
+        UNWIND $usages as usage
+        MATCH (tbl:Table {key: usage.tbl_key})
+        MERGE (u:User {key: usage.user_email})
+        on CREATE SET u={email: usage.user_email, key: usage.user_email}
+        MERGE (u)-[r1:READ]->(tbl)-[r2:READ_BY]->(u)
+        SET r1.read_count = usage.read_count, r2.read_count = usage.read_count
+        RETURN count(usage) as count, collect(distinct tbl.key) as tbl_keys
+        """)
+
+        applied = 0
+        usages = iter(usages)
+        while True:
+            chunk = [{'user_email': user_email, 'tbl_key': table_uri, 'read_count': read_count}
+                     for user_email, table_uri, read_count in
+                     islice(usages, self._bulk_write_batch_size)]  # type: List[Dict[str, Any]]
+            if not chunk:
+                return applied
+
+            # Stable sort, so that the last usage of the same user and table wins
+            chunk.sort(key=lambda usage: (usage['user_email'], usage['tbl_key']))
+            table_uris = OrderedDict.fromkeys(usage['tbl_key'] for usage in chunk)
+            try:
+                with self._transaction() as tx:
+                    record = tx.run(upsert_usage_bulk_query, {'usages': chunk}).single()
+                    applied += record['count']
+            finally:
+                if self._table_cache is not None:
+                    for table_uri in table_uris:
+                        self._table_cache.invalidate(table_uri)
+
+            log_changes(self._change_log, [(table_uri, 'put_table_usages_bulk') for table_uri in record['tbl_keys']])
+
+
+def bootstrap_schema(*,
+                     host: str,
+                     port: int,
+                     user: str = 'neo4j',
+                     password: str = '',
+                     create_missing: bool = True,
+                     strict: bool = False) -> List[str]:
+    """
+    Checks that every label Neo4jProxy looks up by key has a uniqueness constraint on key, which also backs the
+    lookups with an index, and creates the missing constraints one by one. Creating one fails if the label has
+    duplicate keys.
+    It uses a driver of its own, which is closed on return, instead of Neo4jProxy, so that it can run at start up
+    without starting the proxy's background threads.
+
+    :param create_missing: Whether to create the missing constraints, or only check them
+    :param strict: Whether to raise RuntimeError if any constraint is still missing, instead of logging a warning
+    :return: Labels that are still missing the constraint
+    """
+    driver = GraphDatabase.driver(f'{host}:{port}', max_connection_pool_size=1, connection_timeout=10,
+                                  auth=(user, password))  # type: Driver
+    try:
+        missing = _get_labels_missing_key_constraint(driver)
+        if missing and create_missing:
+            for label in missing:
+                LOGGER.info('Creating uniqueness constraint on :{}(key)'.format(label))
+                try:
+                    with driver.session() as session:
+                        session.run(_CREATE_KEY_CONSTRAINT_QUERY[label]).consume()
+                except Exception:
+                    LOGGER.exception('Failed to create uniqueness constraint on :{}(key)'.format(label))
+            missing = _get_labels_missing_key_constraint(driver)
+    finally:
+        driver.close()
+
+    if missing:
+        message = 'Uniqueness constraint on key is missing for {}, where lookups by key are label scans' \
+            .format(', '.join(missing))
+        if strict:
+            raise RuntimeError(message)
+        LOGGER.warning(message)
+
+    return missing
+
+
+def _get_labels_missing_key_constraint(driver: Driver) -> List[str]:
+    with driver.session() as session:
+        records = list(session.run('CALL db.constraints()'))
+
+    constrained_labels = set()
+    for record in records:
+        match = _UNIQUE_CONSTRAINT_REGEX.match(record['description'])
+        if match and match.group('property') == 'key':
+            constrained_labels.add(match.group('label'))
+
+    return [label for label in _KEY_CONSTRAINT_LABELS if label not in constrained_labels]
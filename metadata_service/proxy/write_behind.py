@@ -0,0 +1,133 @@
+import atexit
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Tuple  # noqa: F401
+
+from flask import current_app
+
+from metadata_service.proxy.statsd_utilities import _get_statsd_client
+
+LOGGER = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """
+    In-process queue of pending writes that a daemon thread hands over to flush_fn every interval_sec seconds, so
+    that callers don't wait for the backend. Writes are keyed, and a write on a key that is still pending replaces
+    the pending one, e.g. follow and unfollow of the same table by the same user end up as a single unfollow.
+
+    put() returns False when the queue already has max_size pending keys, so that the caller can write synchronously
+    within synchronous_write(). Pending writes are flushed on interpreter exit. flush_fn returns the writes it failed
+    to apply, e.g. the chunks after a failed one, and those are queued again unless they were replaced in the
+    meantime. When flush_fn raises, all of its writes are queued again the same way.
+
+    Number of pending writes is emitted as <name>.queue_depth gauge, flush duration as <name>.flush timer and flush
+    failures as <name>.flush.fail counter, with metadata_service.proxy.write_behind statsd prefix.
+    """
+
+    def __init__(self, *,
+                 name: str,
+                 flush_fn: Callable[[List[Tuple[Hashable, Any]]], Optional[List[Tuple[Hashable, Any]]]],
+                 interval_sec: float,
+                 max_size: int) -> None:
+        self.name = name
+        self.interval_sec = interval_sec
+        self.max_size = max_size
+        self._flush_fn = flush_fn
+        self._pending = OrderedDict()  # type: OrderedDict
+        self._lock = Lock()
+        # Serializes flushes of the flusher thread and the exit handler, and synchronous writes
+        self._flush_lock = Lock()
+        self._stop_event = Event()
+        self._thread = None  # type: Optional[Thread]
+        self._app = None  # type: Any
+
+    def start(self) -> None:
+        """
+        Starts the flusher thread within the current Flask app context, which flush_fn and statsd need, and registers
+        the exit handler that flushes the rest.
+        """
+        self._app = current_app._get_current_object()  # type: ignore
+
+        def run() -> None:
+            with self._app.app_context():
+                while not self._stop_event.wait(self.interval_sec):
+                    self.flush()
+
+        self._thread = Thread(target=run, name='{}_flusher'.format(self.name), daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        """
+        Stops the flusher thread and flushes pending writes
+        """
+        self._stop_event.set()
+        if self._app is None:
+            self.flush()
+            return
+
+        with self._app.app_context():
+            self.flush()
+
+    def put(self, key: Hashable, value: Any) -> bool:
+        """
+        :param key: Key of the write, where a pending write with the same key is replaced
+        :param value: Write to hand over to flush_fn
+        :return: False if the queue is full and the write is not queued
+        """
+        with self._lock:
+            if key not in self._pending and len(self._pending) >= self.max_size:
+                return False
+            self._pending.pop(key, None)
+            self._pending[key] = value
+        return True
+
+    @contextmanager
+    def synchronous_write(self, key: Hashable) -> Iterator[None]:
+        """
+        Context of a write that the caller makes itself instead of queuing it, e.g. when put() returns False. It waits
+        for the in-flight flush and drops the pending write of the key, so that an older write of the key is not
+        written after it.
+        :param key: Key of the write
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._pending.pop(key, None)
+            yield
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                writes = list(self._pending.items())
+                self._pending.clear()
+
+            statsd_client = _get_statsd_client(prefix=__name__)
+            if statsd_client:
+                statsd_client.gauge('{}.queue_depth'.format(self.name), len(writes))
+            if not writes:
+                return
+
+            start = time.monotonic()
+            try:
+                failed_writes = list(self._flush_fn(writes) or [])
+            except Exception:
+                LOGGER.exception('Failed to flush {} writes of {}'.format(len(writes), self.name))
+                failed_writes = writes
+
+            if failed_writes:
+                if statsd_client:
+                    statsd_client.incr('{}.flush.fail'.format(self.name))
+                with self._lock:
+                    for key, value in failed_writes:
+                        self._pending.setdefault(key, value)
+                return
+
+            if statsd_client:
+                statsd_client.timing('{}.flush'.format(self.name), (time.monotonic() - start) * 1000)
@@ -1,4 +1,13 @@
+import hashlib
 from collections import namedtuple
+from typing import Optional
 
 
 UserResourceRel = namedtuple('UserResourceRel', 'follow, own, read')
+
+
+def get_description_etag(description: Optional[str]) -> str:
+    """
+    ETag of a table or column description, where no description has the same ETag as an empty one
+    """
+    return hashlib.md5((description or '').encode('utf-8')).hexdigest()
@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from http import HTTPStatus
+
+from metadata_service import create_app
+from metadata_service.proxy.change_log import get_change_log
+
+
+class ChangeAPITest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.app.config['CHANGE_LOG_PATH'] = os.path.join(self.temp_dir, 'changes.log')
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_changes(self) -> None:
+        get_change_log().append([('table_1', 'add_tag'), ('table_2', 'put_table_description')])
+
+        response = self.app.test_client().get('/changes?since=1')
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([(r['seq'], r['uri'], r['change']) for r in records],
+                         [(2, 'table_2', 'put_table_description')])
+
+    def test_get_changes_bad_request(self) -> None:
+        for query in ('since=foo', 'since=-1'):
+            response = self.app.test_client().get('/changes?' + query)
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_get_changes_disabled(self) -> None:
+        self.app.config['CHANGE_LOG_PATH'] = None
+
+        response = self.app.test_client().get('/changes')
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from http import HTTPStatus
+
+from mock import patch
+
+from metadata_service import create_app
+from metadata_service.exception import PreconditionFailedException
+from metadata_service.util import get_description_etag
+
+
+class DescriptionAPITest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_get_table_description_etag(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_proxy_client.return_value.get_table_description.return_value = 'foo'
+
+            response = self.app.test_client().get('/table/hive://gold.foo_schema/foo_table/description')
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertEqual(response.headers['ETag'], '"{}"'.format(get_description_etag('foo')))
+
+    def test_put_table_description_if_match(self) -> None:
+        etag = get_description_etag('foo')
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_put = mock_proxy_client.return_value.put_table_description
+
+            response = self.app.test_client().put('/table/hive://gold.foo_schema/foo_table/description/bar',
+                                                  headers={'If-Match': '"{}"'.format(etag)})
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertEqual(response.headers['ETag'], '"{}"'.format(get_description_etag('bar')))
+            mock_put.assert_called_once_with(table_uri='hive://gold.foo_schema/foo_table', description='bar',
+                                             etag=etag)
+
+    def test_put_table_description_without_if_match(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_put = mock_proxy_client.return_value.put_table_description
+
+            for headers in ({}, {'If-Match': '*'}):
+                mock_put.reset_mock()
+                response = self.app.test_client().put('/table/hive://gold.foo_schema/foo_table/description/bar',
+                                                      headers=headers)
+
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                mock_put.assert_called_once_with(table_uri='hive://gold.foo_schema/foo_table', description='bar',
+                                                 etag=None)
+
+    def test_put_table_description_precondition_failed(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_proxy_client.return_value.put_table_description.side_effect = PreconditionFailedException('changed')
+
+            response = self.app.test_client().put('/table/hive://gold.foo_schema/foo_table/description/bar',
+                                                  headers={'If-Match': '"stale"'})
+
+            self.assertEqual(response.status_code, HTTPStatus.PRECONDITION_FAILED)
+
+    def test_put_column_description_precondition_failed(self) -> None:
+        with patch('metadata_service.api.column.get_proxy_client') as mock_proxy_client:
+            mock_put = mock_proxy_client.return_value.put_column_description
+            mock_put.side_effect = PreconditionFailedException('changed')
+
+            response = self.app.test_client().put('/table/hive://gold.foo_schema/foo_table/column/col/description/bar',
+                                                  headers={'If-Match': '"stale"'})
+
+            self.assertEqual(response.status_code, HTTPStatus.PRECONDITION_FAILED)
+            mock_put.assert_called_once_with(table_uri='hive://gold.foo_schema/foo_table', column_name='col',
+                                             description='bar', etag='stale')
+
+
+if __name__ == '__main__':
+    unittest.main()
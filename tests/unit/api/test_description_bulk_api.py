@@ -0,0 +1,47 @@
+import unittest
+from http import HTTPStatus
+
+from mock import patch
+
+from metadata_service import create_app
+
+
+class DescriptionBulkAPITest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_put_descriptions(self) -> None:
+        descriptions = [{'table_uri': 'hive://gold.foo_schema/foo_table', 'description': 'foo'},
+                        {'table_uri': 'hive://gold.foo_schema/foo_table', 'column_name': 'bar', 'description': 'bar'}]
+
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_put_descriptions_bulk = mock_proxy_client.return_value.put_descriptions_bulk
+            mock_put_descriptions_bulk.return_value = [True, False]
+
+            response = self.app.test_client().put('/descriptions', json={'descriptions': descriptions})
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            mock_put_descriptions_bulk.assert_called_once_with(descriptions=descriptions)
+            self.assertEqual(response.json['results'],
+                             [{'table_uri': 'hive://gold.foo_schema/foo_table', 'column_name': None,
+                               'status': 'updated'},
+                              {'table_uri': 'hive://gold.foo_schema/foo_table', 'column_name': 'bar',
+                               'status': 'not_found'}])
+
+    def test_put_descriptions_bad_request(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            for body in ({}, {'descriptions': [{'table_uri': 'hive://gold.foo_schema/foo_table'}]},
+                         {'descriptions': ['foo']}):
+                response = self.app.test_client().put('/descriptions', json=body)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+            mock_proxy_client.return_value.put_descriptions_bulk.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,20 @@
 import unittest
 from http import HTTPStatus
 
+from flask import Flask
 from mock import patch
 from metadata_service.api.table import TableDescriptionAPI
 from metadata_service.api.column import ColumnDescriptionAPI
 
 
 class RedshiftCommentEditDisableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.request_context = Flask(__name__).test_request_context()
+        self.request_context.push()
+
+    def tearDown(self) -> None:
+        self.request_context.pop()
+
     def test_table_comment_edit(self) -> None:
         with patch('metadata_service.api.table.get_proxy_client'):
             tbl_dscrpt_api = TableDescriptionAPI()
@@ -0,0 +1,66 @@
+import unittest
+from http import HTTPStatus
+
+from mock import patch
+
+from metadata_service import create_app
+from metadata_service.entity.table_detail import Table
+
+
+class TableBulkAPITest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_get_tables(self) -> None:
+        table = Table(database='hive', cluster='gold', schema='foo_schema', name='foo_table',
+                      columns=[], last_updated_timestamp=None)
+
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_get_tables = mock_proxy_client.return_value.get_tables
+            mock_get_tables.return_value = {'hive://gold.foo_schema/foo_table': table}
+
+            response = self.app.test_client().get('/tables?uri=hive://gold.foo_schema/foo_table'
+                                                  '&uri=hive://gold.foo_schema/missing'
+                                                  '&uri=hive://gold.foo_schema/foo_table')
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            mock_get_tables.assert_called_once_with(table_uris=['hive://gold.foo_schema/foo_table',
+                                                                'hive://gold.foo_schema/missing'])
+            self.assertEqual([t['table_name'] for t in response.json['tables']], ['foo_table'])
+            self.assertEqual(response.json['not_found'], ['hive://gold.foo_schema/missing'])
+
+    def test_post_tables(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_get_tables = mock_proxy_client.return_value.get_tables
+            mock_get_tables.return_value = {}
+
+            response = self.app.test_client().post('/tables', json={'table_uris': ['hive://gold.foo_schema/bar']})
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            mock_get_tables.assert_called_once_with(table_uris=['hive://gold.foo_schema/bar'])
+            self.assertEqual(response.json, {'tables': [], 'not_found': ['hive://gold.foo_schema/bar']})
+
+    def test_no_table_uri(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client'):
+            response = self.app.test_client().post('/tables', json={})
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_invalid_table_uris(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            for table_uris in ('hive://gold.foo_schema/bar', [], [{'uri': 'hive://gold.foo_schema/bar'}], [['a']],
+                               [1], [''], ['hive://gold.foo_schema/bar_{}'.format(i) for i in range(1001)]):
+                response = self.app.test_client().post('/tables', json={'table_uris': table_uris})
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+            response = self.app.test_client().post('/tables', json=['hive://gold.foo_schema/bar'])
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+            mock_proxy_client.return_value.get_tables.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
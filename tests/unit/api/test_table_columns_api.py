@@ -0,0 +1,78 @@
+import unittest
+from http import HTTPStatus
+
+from mock import patch
+
+from metadata_service import create_app
+from metadata_service.entity.table_detail import Column, Table
+from metadata_service.exception import NotFoundException
+
+
+class TableColumnsAPITest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_get_columns(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_get_columns = mock_proxy_client.return_value.get_columns
+            mock_get_columns.return_value = [Column(name='bar_id_1', description='bar col description',
+                                                    col_type='varchar', sort_order=200, stats=[])]
+
+            response = self.app.test_client().get('/table/hive://gold.foo_schema/foo_table/columns'
+                                                  '?offset=200&limit=1')
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            mock_get_columns.assert_called_once_with(table_uri='hive://gold.foo_schema/foo_table', offset=200, limit=1)
+            self.assertEqual(response.json['offset'], 200)
+            self.assertEqual(response.json['limit'], 1)
+            self.assertEqual([(c['name'], c['type'], c['sort_order']) for c in response.json['columns']],
+                             [('bar_id_1', 'varchar', 200)])
+
+    def test_get_columns_default_page(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_get_columns = mock_proxy_client.return_value.get_columns
+            mock_get_columns.return_value = []
+
+            response = self.app.test_client().get('/table/hive://gold.foo_schema/foo_table/columns')
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            mock_get_columns.assert_called_once_with(table_uri='hive://gold.foo_schema/foo_table', offset=0, limit=100)
+
+    def test_get_columns_bad_request(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client'):
+            for query in ('offset=foo', 'offset=-1', 'limit=0', 'limit=1001'):
+                response = self.app.test_client().get('/table/hive://gold.foo_schema/foo_table/columns?' + query)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_get_columns_not_found(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_proxy_client.return_value.get_columns.side_effect = NotFoundException('missing')
+
+            response = self.app.test_client().get('/table/hive://gold.foo_schema/foo_table/columns')
+
+            self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_get_table_without_columns(self) -> None:
+        table = Table(database='hive', cluster='gold', schema='foo_schema', name='foo_table',
+                      columns=[], column_count=5000, last_updated_timestamp=None)
+
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_get_table = mock_proxy_client.return_value.get_table
+            mock_get_table.return_value = table
+
+            response = self.app.test_client().get('/table/hive://gold.foo_schema/foo_table?include_columns=false')
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            mock_get_table.assert_called_once_with(table_uri='hive://gold.foo_schema/foo_table',
+                                                   include_columns=False)
+            self.assertEqual(response.json['columns'], [])
+            self.assertEqual(response.json['column_count'], 5000)
+
+
+if __name__ == '__main__':
+    unittest.main()
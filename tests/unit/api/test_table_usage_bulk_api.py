@@ -0,0 +1,76 @@
+import unittest
+from http import HTTPStatus
+from typing import Any
+
+from mock import patch
+
+from metadata_service import create_app
+from metadata_service.exception import NotSupportedException
+
+
+class TableUsageBulkAPITest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_put_table_usages(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_put_usages = mock_proxy_client.return_value.put_table_usages_bulk
+            consumed = []
+
+            def put_table_usages_bulk(usages: Any) -> int:
+                consumed.extend(usages)
+                return 1
+
+            mock_put_usages.side_effect = put_table_usages_bulk
+
+            response = self.app.test_client().put(
+                '/table_usages',
+                data='{"user_email": "foo@bar.com", "table_uri": "hive://gold.schema/tbl_1", "read_count": 3}\n'
+                     '\n'
+                     '{"user_email": "foo@bar.com", "table_uri": "hive://gold.schema/tbl_2", "read_count": 0}\n',
+                content_type='application/x-ndjson')
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertEqual(response.json, {'received': 2, 'applied': 1})
+            self.assertEqual(consumed, [('foo@bar.com', 'hive://gold.schema/tbl_1', 3),
+                                        ('foo@bar.com', 'hive://gold.schema/tbl_2', 0)])
+
+    def test_put_table_usages_bad_request(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_proxy_client.return_value.put_table_usages_bulk.side_effect = lambda usages: len(list(usages))
+
+            for line in ('{"user_email": "foo@bar.com"',
+                         '{"user_email": "foo@bar.com", "table_uri": "tbl_1"}',
+                         '{"user_email": "foo@bar.com", "table_uri": "tbl_1", "read_count": -1}',
+                         '{"user_email": "foo@bar.com", "table_uri": "tbl_1", "read_count": "3"}'):
+                response = self.app.test_client().put(
+                    '/table_usages',
+                    data='{"user_email": "foo@bar.com", "table_uri": "tbl_0", "read_count": 3}\n' + line + '\n',
+                    content_type='application/x-ndjson')
+
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+                self.assertIn('Line 2', response.json['message'])
+                # The usage before the invalid line is applied
+                self.assertEqual(response.json['received'], 1)
+                self.assertEqual(response.json['applied'], 1)
+
+    def test_put_table_usages_not_supported(self) -> None:
+        with patch('metadata_service.api.table.get_proxy_client') as mock_proxy_client:
+            mock_proxy_client.return_value.put_table_usages_bulk.side_effect = \
+                NotSupportedException('Table usage is not supported')
+
+            response = self.app.test_client().put(
+                '/table_usages',
+                data='{"user_email": "foo@bar.com", "table_uri": "tbl_0", "read_count": 3}\n',
+                content_type='application/x-ndjson')
+
+            self.assertEqual(response.status_code, HTTPStatus.NOT_IMPLEMENTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from http import HTTPStatus
+
+from mock import patch
+
+from metadata_service import create_app
+
+
+class TagTablesAPITest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_put_tag_tables(self) -> None:
+        with patch('metadata_service.api.tag.get_proxy_client') as mock_proxy_client:
+            mock_add_tags_bulk = mock_proxy_client.return_value.add_tags_bulk
+            mock_add_tags_bulk.return_value = ['hive://gold.foo_schema/missing']
+
+            response = self.app.test_client().put('/tags/pii/tables',
+                                                  json={'table_uris': ['hive://gold.foo_schema/foo_table',
+                                                                       'hive://gold.foo_schema/missing',
+                                                                       'hive://gold.foo_schema/foo_table']})
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            mock_add_tags_bulk.assert_called_once_with(table_uris=['hive://gold.foo_schema/foo_table',
+                                                                   'hive://gold.foo_schema/missing'],
+                                                       tag='pii')
+            self.assertEqual(response.json['not_found'], ['hive://gold.foo_schema/missing'])
+
+    def test_put_tag_tables_without_table_uris(self) -> None:
+        with patch('metadata_service.api.tag.get_proxy_client') as mock_proxy_client:
+            for body in ({}, {'table_uris': 'hive://gold.foo_schema/bar'}, {'table_uris': [1]},
+                         {'table_uris': [{'uri': 'hive://gold.foo_schema/bar'}]}, {'table_uris': ['']}, ['a']):
+                response = self.app.test_client().put('/tags/pii/tables', json=body)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+            mock_proxy_client.return_value.add_tags_bulk.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,14 @@
 import unittest
 from atlasclient.exceptions import BadRequest
-from mock import patch, MagicMock
+from mock import patch, MagicMock, PropertyMock
 
 from metadata_service import create_app
 from metadata_service.entity.popular_table import PopularTable
 from metadata_service.entity.table_detail import (Table, User, Tag, Column, Statistics)
 from metadata_service.entity.tag_detail import TagDetail
-from metadata_service.exception import NotFoundException
+from metadata_service.exception import NotFoundException, NotSupportedException, PreconditionFailedException
+from metadata_service.proxy.cache_utilities import LRUTTLCache
+from metadata_service.util import get_description_etag
 from tests.unit.proxy.fixtures.atlas_test_data import Data
 
 
@@ -85,6 +87,50 @@ class TestAtlasProxy(unittest.TestCase, Data):
         })
         self.assertEqual(ent.__repr__(), unique_attr_response.__repr__())
 
+    def _create_proxy_with_entity_cache(self):
+        self.app.config['ATLAS_ENTITY_CACHE_MAX_SIZE'] = 10
+        with patch('metadata_service.proxy.atlas_proxy.Atlas'):
+            from metadata_service.proxy.atlas_proxy import AtlasProxy
+            proxy = AtlasProxy(host='DOES_NOT_MATTER', port=0000)
+        proxy._driver = MagicMock()
+        unique_attr_response = MagicMock()
+        unique_attr_response.entity = {'guid': 'DOESNT_MATTER', 'attributes': {'description': 'Dummy Description'}}
+        proxy._driver.entity_unique_attribute = MagicMock(return_value=unique_attr_response)
+        return proxy
+
+    def test_get_table_entity_cache(self):
+        proxy = self._create_proxy_with_entity_cache()
+        for _ in range(2):
+            self.assertEqual(proxy.get_table_description(table_uri=self.table_uri), 'Dummy Description')
+        self.assertEqual(proxy._driver.entity_unique_attribute.call_count, 1)
+
+        # Writes fetch the entity fresh and invalidate the cached one
+        proxy.put_table_description(table_uri=self.table_uri, description='New Description')
+        self.assertEqual(proxy._driver.entity_unique_attribute.call_count, 2)
+        proxy.get_table_description(table_uri=self.table_uri)
+        self.assertEqual(proxy._driver.entity_unique_attribute.call_count, 3)
+
+    def test_get_table_entity_lean(self):
+        proxy = self._create_proxy_with_entity_cache()
+        proxy.get_table_description(table_uri=self.table_uri)
+        proxy._driver.entity_unique_attribute.assert_called_with(
+            self.entity_type, qualifiedName=self.name, minExtInfo='true', ignoreRelationships='true')
+
+        # A lean entity doesn't serve callers that need the referred entities, but a full one serves both
+        proxy._get_table_entity(table_uri=self.table_uri)
+        proxy._driver.entity_unique_attribute.assert_called_with(self.entity_type, qualifiedName=self.name)
+        proxy.get_table_description(table_uri=self.table_uri)
+        self.assertEqual(proxy._driver.entity_unique_attribute.call_count, 2)
+
+    def test_get_table_guid_cache(self):
+        proxy = self._create_proxy_with_entity_cache()
+        proxy.add_tag(table_uri=self.table_uri, tag='TAG')
+        proxy.add_tag(table_uri=self.table_uri, tag='TAG')
+        self.assertEqual(proxy._driver.entity_unique_attribute.call_count, 1)
+        proxy._driver.entity_bulk_classification.create.assert_called_with(
+            data={'classification': {'typeName': 'TAG'}, 'entityGuids': ['DOESNT_MATTER']}
+        )
+
     def test_get_table(self):
         self._mock_get_table_entity()
         response = self.proxy.get_table(table_uri=self.table_uri)
@@ -120,11 +166,51 @@ class TestAtlasProxy(unittest.TestCase, Data):
                          last_updated_timestamp=self.entity1['updateTime'])
         self.assertEqual(str(expected), str(response))
 
+    def test_get_table_cache(self):
+        self.proxy._table_cache = LRUTTLCache(name='table', max_size=10, ttl_sec=60)
+        self._mock_get_table_entity()
+
+        table = self.proxy.get_table(table_uri=self.table_uri)
+        self.assertIs(self.proxy.get_table(table_uri=self.table_uri), table)
+        self.assertEqual(self.proxy._get_table_entity.call_count, 1)
+
+        self.proxy.put_table_description(table_uri=self.table_uri, description="DOESNT_MATTER")
+        self.proxy.get_table(table_uri=self.table_uri)
+        # One call from put_table_description and one from get_table after the invalidation
+        self.assertEqual(self.proxy._get_table_entity.call_count, 3)
+
+    def test_get_table_without_columns(self):
+        self.proxy._table_cache = LRUTTLCache(name='table', max_size=10, ttl_sec=60)
+        self._mock_get_table_entity()
+
+        table = self.proxy.get_table(table_uri=self.table_uri, include_columns=False)
+        self.assertEqual(table.columns, [])
+        self.assertEqual(table.column_count, len(self.entity1['relationshipAttributes']['columns']))
+        # Lean table is not cached, so that get_table with columns isn't served with it
+        self.assertEqual(len(self.proxy._table_cache), 0)
+
+    def test_get_columns(self):
+        self._mock_get_table_entity()
+        columns = self.proxy.get_columns(table_uri=self.table_uri, offset=0, limit=10)
+        self.assertEqual(str(columns), str(self.proxy.get_table(table_uri=self.table_uri).columns))
+
+        self.assertEqual(self.proxy.get_columns(table_uri=self.table_uri, offset=1, limit=10), [])
+
     def test_get_table_not_found(self):
         with self.assertRaises(NotFoundException):
             self.proxy._driver.entity_unique_attribute = MagicMock(side_effect=Exception('Boom!'))
             self.proxy.get_table(table_uri=self.table_uri)
 
+    def test_get_table_entity_not_found_on_fetch(self):
+        # atlasclient only fetches the entity when it's accessed
+        unique_attr_response = MagicMock()
+        type(unique_attr_response).entity = PropertyMock(side_effect=Exception('Boom!'))
+        self.proxy._driver.entity_unique_attribute = MagicMock(return_value=unique_attr_response)
+
+        with self.assertRaises(NotFoundException):
+            self.proxy._get_table_entity(table_uri=self.table_uri)
+        self.assertEqual(self.proxy.add_tags_bulk(table_uris=[self.table_uri], tag='TAG'), [self.table_uri])
+
     def test_get_table_missing_info(self):
         with self.assertRaises(BadRequest):
             local_entity = self.entity1.copy()
@@ -138,7 +224,7 @@ class TestAtlasProxy(unittest.TestCase, Data):
     def test_get_popular_tables(self):
         metadata1 = self.to_class(self.metadata1)
         metadata2 = self.to_class(self.metadata2)
-        self.proxy._get_flat_values_from_dsl = MagicMock(return_value=[])
+        self.proxy._get_flat_values_from_dsl = MagicMock(return_value=['-1', '-2'])
 
         metadata_collection = MagicMock()
         metadata_collection.entities_with_relationships = MagicMock(return_value=[metadata1, metadata2])
@@ -166,7 +252,7 @@ class TestAtlasProxy(unittest.TestCase, Data):
 
         metadata1 = self.to_class(meta1)
         metadata2 = self.to_class(meta2)
-        self.proxy._get_flat_values_from_dsl = MagicMock(return_value=[])
+        self.proxy._get_flat_values_from_dsl = MagicMock(return_value=['-1', '-2'])
 
         metadata_collection = MagicMock()
         metadata_collection.entities_with_relationships = MagicMock(return_value=[metadata1, metadata2])
@@ -185,6 +271,29 @@ class TestAtlasProxy(unittest.TestCase, Data):
 
         self.assertEqual(expected.__repr__(), response.__repr__())
 
+    def test_get_popular_tables_chunked(self):
+        self.proxy._popular_tables_dsl_page_size = 2
+        self.proxy._entity_bulk_chunk_size = 2
+        metadata = {guid: self.to_class({'guid': guid, 'relationshipAttributes': {'parentEntity': {
+            'typeName': self.entity_type, 'attributes': {'qualifiedName': guid, 'description': None}}}})
+            for guid in ['-1', '-2', '-3']}
+        self.proxy._get_flat_values_from_dsl = MagicMock(side_effect=[['-1', '-2'], ['-3']])
+
+        def entity_bulk(guid):
+            metadata_collection = MagicMock()
+            # entity_bulk doesn't keep the order of the GUIDs
+            metadata_collection.entities_with_relationships.return_value = [metadata[g] for g in reversed(guid)]
+            return [metadata_collection]
+
+        self.proxy._driver.entity_bulk = MagicMock(side_effect=entity_bulk)
+        response = self.proxy.get_popular_tables(num_entries=4)
+
+        self.assertEqual([table.name for table in response], ['-1', '-2', '-3'])
+        self.assertEqual(self.proxy._get_flat_values_from_dsl.call_args_list[1][1]['dsl_param']['query'],
+                         'FROM Table SELECT metadata.__guid ORDERBY popularityScore desc LIMIT 2 OFFSET 2')
+        self.assertEqual(sorted(call[1]['guid'] for call in self.proxy._driver.entity_bulk.call_args_list),
+                         [['-1', '-2'], ['-3']])
+
     def test_get_popular_tables_search_exception(self):
         with self.assertRaises(NotFoundException):
             self.proxy._get_flat_values_from_dsl = MagicMock(return_value=[])
@@ -202,6 +311,32 @@ class TestAtlasProxy(unittest.TestCase, Data):
         self.proxy.put_table_description(table_uri=self.table_uri,
                                          description="DOESNT_MATTER")
 
+    def test_put_table_description_unchanged(self):
+        entity = {'guid': 'DOESNT_MATTER', 'attributes': {'description': 'Dummy Description'}}
+        mocked_entity = self._mock_get_table_entity(entity=entity)
+        self.proxy._change_log = MagicMock()
+        self.proxy.put_table_description(table_uri=self.table_uri,
+                                         description=entity['attributes']['description'])
+        mocked_entity.update.assert_not_called()
+        self.proxy._change_log.append.assert_not_called()
+
+        self.proxy.put_table_description(table_uri=self.table_uri, description='new description')
+        self.proxy._change_log.append.assert_called_once_with([(self.table_uri, 'put_table_description')])
+
+    def test_put_table_description_etag(self):
+        entity = {'guid': 'DOESNT_MATTER', 'attributes': {'description': 'Dummy Description'}}
+        mocked_entity = self._mock_get_table_entity(entity=entity)
+        with self.assertRaises(PreconditionFailedException):
+            self.proxy.put_table_description(table_uri=self.table_uri,
+                                             description='new description',
+                                             etag=get_description_etag('stale description'))
+        mocked_entity.update.assert_not_called()
+
+        self.proxy.put_table_description(table_uri=self.table_uri,
+                                         description='new description',
+                                         etag=get_description_etag(entity['attributes']['description']))
+        mocked_entity.update.assert_called_once_with()
+
     def test_get_tags(self):
         name = "DUMMY_CLASSIFICATION"
         mocked_classif = MagicMock()
@@ -210,12 +345,44 @@ class TestAtlasProxy(unittest.TestCase, Data):
         mocked_def = MagicMock()
         mocked_def.classificationDefs = [mocked_classif]
 
-        self.proxy._driver.typedefs = [mocked_def]
+        self.proxy._driver.typedefs = MagicMock(return_value=[mocked_def])
+        self.proxy._classification_names_cache.clear()
+        self.proxy._get_flat_values_from_dsl = MagicMock(return_value=[3])
 
         response = self.proxy.get_tags()
 
-        expected = [TagDetail(tag_name=name, tag_count=0)]
+        expected = [TagDetail(tag_name=name, tag_count=3)]
         self.assertEqual(response.__repr__(), expected.__repr__())
+        self.proxy._driver.typedefs.assert_called_once_with(type='classification')
+        self.proxy._get_flat_values_from_dsl.assert_called_once_with(
+            dsl_param={'query': f'Table isa {name} select count()'})
+
+    def test_get_tags_cache(self):
+        self.app.config['PROXY_TAGS_CACHE_EXPIRY_SEC'] = 60
+        with patch('metadata_service.proxy.atlas_proxy.Atlas'):
+            from metadata_service.proxy.atlas_proxy import AtlasProxy
+            proxy = AtlasProxy(host='DOES_NOT_MATTER', port=0000)
+        proxy._tags_cache.clear()
+        proxy._classification_names_cache.clear()
+        proxy._driver = MagicMock()
+        mocked_classifs = [MagicMock(), MagicMock()]
+        mocked_classifs[0].name = 'TAG1'
+        mocked_classifs[1].name = 'TAG2'
+        proxy._driver.typedefs.return_value = [MagicMock(classificationDefs=mocked_classifs)]
+        proxy._get_flat_values_from_dsl = MagicMock(return_value=[2])
+
+        tags = proxy.get_tags()
+        self.assertEqual(tags.__repr__(), [TagDetail(tag_name='TAG1', tag_count=2),
+                                           TagDetail(tag_name='TAG2', tag_count=2)].__repr__())
+        self.assertIs(proxy.get_tags(), tags)
+        self.assertEqual(proxy._get_flat_values_from_dsl.call_count, 2)
+
+        # Tag updates invalidate the counts, but not the classification names
+        proxy._get_table_guid = MagicMock(return_value='DOESNT_MATTER')
+        proxy.add_tag(table_uri=self.table_uri, tag='TAG1')
+        proxy.get_tags()
+        self.assertEqual(proxy._get_flat_values_from_dsl.call_count, 4)
+        proxy._driver.typedefs.assert_called_once_with(type='classification')
 
     def test_add_tag(self):
         tag = "TAG"
@@ -227,6 +394,32 @@ class TestAtlasProxy(unittest.TestCase, Data):
                 data={'classification': {'typeName': tag}, 'entityGuids': [self.entity1['guid']]}
             )
 
+    def test_put_descriptions_bulk(self):
+        self.proxy.put_table_description = MagicMock()
+        self.proxy.put_column_description = MagicMock(side_effect=NotFoundException('missing'))
+
+        applied = self.proxy.put_descriptions_bulk(descriptions=[
+            {'table_uri': self.table_uri, 'description': 'foo'},
+            {'table_uri': self.table_uri, 'column_name': 'missing', 'description': 'bar'},
+        ])
+
+        self.assertEqual(applied, [True, False])
+        self.proxy.put_table_description.assert_called_once_with(table_uri=self.table_uri, description='foo')
+
+    def test_add_tags_bulk(self):
+        tag = "TAG"
+        self._mock_get_table_entity()
+        mocked_entity, table_info = self.proxy._get_table_entity.return_value
+        self.proxy._get_table_entity = MagicMock(side_effect=[(mocked_entity, table_info),
+                                                              NotFoundException('missing')])
+
+        with patch.object(self.proxy._driver.entity_bulk_classification, 'create') as mock_execute:
+            not_found = self.proxy.add_tags_bulk(table_uris=[self.table_uri, 'hive://gold.missing/table'], tag=tag)
+            mock_execute.assert_called_once_with(
+                data={'classification': {'typeName': tag}, 'entityGuids': [self.entity1['guid']]}
+            )
+            self.assertEqual(not_found, ['hive://gold.missing/table'])
+
     def test_delete_tag(self):
         tag = "TAG"
         self._mock_get_table_entity()
@@ -276,6 +469,55 @@ class TestAtlasProxy(unittest.TestCase, Data):
                                           column_name=self.test_column['attributes']['qualifiedName'],
                                           description='DOESNT_MATTER')
 
+    def test_column_index(self):
+        proxy = self._create_proxy_with_entity_cache()
+        column = {'guid': 'COLUMN_GUID', 'attributes': {'qualifiedName': 'col', 'description': 'Dummy Description'}}
+        unique_attr_response = proxy._driver.entity_unique_attribute.return_value
+        unique_attr_response.entity['relationshipAttributes'] = {'columns': [{'guid': 'COLUMN_GUID'}]}
+        unique_attr_response.referredEntities = {'COLUMN_GUID': column}
+
+        with patch.object(proxy, '_get_column_index', wraps=proxy._get_column_index) as mock_get_column_index:
+            for _ in range(2):
+                self.assertEqual(proxy.get_column_description(table_uri=self.table_uri, column_name='col'),
+                                 'Dummy Description')
+            self.assertEqual(len(proxy._column_indexes), 1)
+            self.assertEqual(mock_get_column_index.call_count, 2)
+
+        # The column GUID is known, so that the table entity is not fetched again
+        proxy._entity_cache.invalidate(self.table_uri)
+        proxy._driver.entity_guid.return_value.entity = {'guid': 'COLUMN_GUID', 'status': 'ACTIVE',
+                                                         'attributes': {'qualifiedName': 'col', 'description': None}}
+        proxy.put_column_description(table_uri=self.table_uri, column_name='col', description='New Description')
+        self.assertEqual(proxy._driver.entity_unique_attribute.call_count, 1)
+        proxy._driver.entity_guid.assert_called_once_with('COLUMN_GUID')
+        proxy._driver.entity_guid.return_value.update.assert_called_once_with(attribute='description')
+
+    def test_column_index_stale_guid(self):
+        proxy = self._create_proxy_with_entity_cache()
+        proxy._guid_cache.put((self.table_uri, 'col'), 'STALE_GUID')
+        column = {'guid': 'COLUMN_GUID', 'attributes': {'qualifiedName': 'col', 'description': None}}
+        unique_attr_response = proxy._driver.entity_unique_attribute.return_value
+        unique_attr_response.entity['relationshipAttributes'] = {'columns': [{'guid': 'COLUMN_GUID'}]}
+        unique_attr_response.referredEntities = {'COLUMN_GUID': column}
+
+        stale_entity, fresh_entity = MagicMock(), MagicMock()
+        # The column was deleted and recreated, so the stale GUID resolves to a deleted entity
+        stale_entity.entity = {'guid': 'STALE_GUID', 'status': 'DELETED',
+                               'attributes': {'qualifiedName': 'col', 'description': None}}
+        fresh_entity.entity = {'guid': 'COLUMN_GUID', 'status': 'ACTIVE',
+                               'attributes': {'qualifiedName': 'col', 'description': None}}
+        proxy._driver.entity_guid = MagicMock(side_effect=lambda guid: {'STALE_GUID': stale_entity,
+                                                                        'COLUMN_GUID': fresh_entity}[guid])
+
+        proxy.put_column_description(table_uri=self.table_uri, column_name='col', description='New Description')
+        stale_entity.update.assert_not_called()
+        fresh_entity.update.assert_called_once_with(attribute='description')
+        self.assertEqual(proxy._guid_cache.get((self.table_uri, 'col')), (True, 'COLUMN_GUID'))
+
+    def test_put_table_usages_bulk(self):
+        with self.assertRaises(NotSupportedException):
+            self.proxy.put_table_usages_bulk(usages=[('foo@bar.com', self.table_uri, 1)])
+
 
 if __name__ == '__main__':
     unittest.main()
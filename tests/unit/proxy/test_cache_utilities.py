@@ -0,0 +1,348 @@
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from typing import Dict, List
+
+from mock import patch, MagicMock
+
+from metadata_service import create_app
+from metadata_service.proxy import cache_utilities
+from metadata_service.proxy.cache_utilities import LRUTTLCache, PeriodicRefresher, cache_by_table_uri, \
+    cache_by_table_uris, invalidate_by_table_uri, single_flight
+
+
+class _Proxy:
+    def __init__(self, table_cache: LRUTTLCache) -> None:
+        self._table_cache = table_cache
+        self.backend = MagicMock()
+
+    @cache_by_table_uri
+    def get_table(self, *, table_uri: str) -> str:
+        return self.backend.get(table_uri)
+
+    @cache_by_table_uris
+    def get_tables(self, *, table_uris: List[str]) -> Dict[str, str]:
+        return self.backend.get_many(table_uris)
+
+    @invalidate_by_table_uri
+    def put_table_description(self, *, table_uri: str, description: str) -> None:
+        self.backend.put(table_uri, description)
+
+    @single_flight
+    def get_user_detail(self, *, user_id: str) -> str:
+        return self.backend.get_user(user_id)
+
+
+class TestCacheUtilities(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_lru_eviction(self) -> None:
+        cache = LRUTTLCache(name='test', max_size=2, ttl_sec=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), (True, 1))
+
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('b'), (False, None))
+        self.assertEqual(cache.get('a'), (True, 1))
+        self.assertEqual(cache.get('c'), (True, 3))
+
+    def test_ttl_expiry(self) -> None:
+        cache = LRUTTLCache(name='test', max_size=2, ttl_sec=60)
+        with patch.object(cache_utilities.time, 'monotonic', return_value=100):
+            cache.put('a', 1)
+        with patch.object(cache_utilities.time, 'monotonic', return_value=159):
+            self.assertEqual(cache.get('a'), (True, 1))
+        with patch.object(cache_utilities.time, 'monotonic', return_value=160):
+            self.assertEqual(cache.get('a'), (False, None))
+        self.assertEqual(len(cache), 0)
+
+    def test_put_after_invalidation(self) -> None:
+        cache = LRUTTLCache(name='test', max_size=2, ttl_sec=60)
+        generation = cache.generation()
+        cache.invalidate('a')
+        cache.put('a', 'stale', generation)
+        self.assertEqual(cache.get('a'), (False, None))
+
+    def test_metrics(self) -> None:
+        with patch.object(cache_utilities, '_get_statsd_client') as mock_statsd_client:
+            mock_incr = mock_statsd_client.return_value.incr
+
+            cache = LRUTTLCache(name='test', max_size=1, ttl_sec=60)
+            cache.get('a')
+            cache.put('a', 1)
+            cache.get('a')
+            cache.put('b', 2)
+
+            mock_incr.assert_any_call('test.miss', 1)
+            mock_incr.assert_any_call('test.hit', 1)
+            mock_incr.assert_any_call('test.eviction', 1)
+
+    def test_read_through_and_invalidation(self) -> None:
+        proxy = _Proxy(LRUTTLCache(name='test', max_size=10, ttl_sec=60))
+        proxy.backend.get.return_value = 'table'
+
+        self.assertEqual(proxy.get_table(table_uri='foo'), 'table')
+        self.assertEqual(proxy.get_table(table_uri='foo'), 'table')
+        self.assertEqual(proxy.backend.get.call_count, 1)
+
+        proxy.put_table_description(table_uri='foo', description='desc')
+        proxy.get_table(table_uri='foo')
+        self.assertEqual(proxy.backend.get.call_count, 2)
+
+    def test_bulk_read_through(self) -> None:
+        proxy = _Proxy(LRUTTLCache(name='test', max_size=10, ttl_sec=60))
+        proxy.backend.get.return_value = 'foo_table'
+        proxy.backend.get_many.return_value = {'bar': 'bar_table'}
+
+        proxy.get_table(table_uri='foo')
+        tables = proxy.get_tables(table_uris=['foo', 'bar', 'missing'])
+
+        self.assertEqual(tables, {'foo': 'foo_table', 'bar': 'bar_table'})
+        proxy.backend.get_many.assert_called_once_with(['bar', 'missing'])
+
+        self.assertEqual(proxy.get_table(table_uri='bar'), 'bar_table')
+        self.assertEqual(proxy.backend.get.call_count, 1)
+
+    def test_invalidation_on_failure(self) -> None:
+        proxy = _Proxy(LRUTTLCache(name='test', max_size=10, ttl_sec=60))
+        proxy.get_table(table_uri='foo')
+
+        proxy.backend.put.side_effect = RuntimeError('Boom!')
+        with self.assertRaises(RuntimeError):
+            proxy.put_table_description(table_uri='foo', description='desc')
+
+        proxy.get_table(table_uri='foo')
+        self.assertEqual(proxy.backend.get.call_count, 2)
+
+    def test_disabled(self) -> None:
+        self.assertIsNone(cache_utilities.create_table_cache())
+
+        proxy = _Proxy(None)
+        proxy.get_table(table_uri='foo')
+        proxy.get_table(table_uri='foo')
+        proxy.put_table_description(table_uri='foo', description='desc')
+        self.assertEqual(proxy.backend.get.call_count, 2)
+
+    def test_periodic_refresher(self) -> None:
+        refresh_fn = MagicMock(side_effect=[['foo'], RuntimeError('Boom!'), ['bar']])
+        refresher = PeriodicRefresher(name='test', refresh_fn=refresh_fn, interval_sec=60)
+        self.assertIsNone(refresher.get())
+
+        refresher.refresh()
+        self.assertEqual(refresher.get(), ['foo'])
+
+        # Keeps serving the previous value on failure
+        refresher.refresh()
+        self.assertEqual(refresher.get(), ['foo'])
+
+        refresher.refresh()
+        self.assertEqual(refresher.get(), ['bar'])
+
+    def test_periodic_refresher_thread(self) -> None:
+        refreshed = Event()
+        refresher = PeriodicRefresher(name='test', refresh_fn=lambda: refreshed.set() or ['foo'], interval_sec=60)
+        refresher.start()
+        try:
+            self.assertTrue(refreshed.wait(5))
+            for _ in range(50):
+                if refresher.get() is not None:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(refresher.get(), ['foo'])
+        finally:
+            refresher.stop()
+
+    def test_periodic_refresher_metrics(self) -> None:
+        with patch.object(cache_utilities, '_get_statsd_client') as mock_statsd_client:
+            mock_statsd = mock_statsd_client.return_value
+
+            refresher = PeriodicRefresher(name='test', refresh_fn=lambda: ['foo'], interval_sec=60)
+            refresher.refresh()
+            refresher.get()
+
+            self.assertEqual(mock_statsd.timing.call_args[0][0], 'test.refresh')
+            self.assertEqual(mock_statsd.gauge.call_args[0][0], 'test.age_sec')
+
+    def test_proxy_cache_disabled(self) -> None:
+        self.assertIsNone(cache_utilities.create_proxy_cache(namespace='test', expire_sec=0))
+
+    def test_shared_proxy_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as data_dir:
+            self.app.config['PROXY_CACHE_TYPE'] = 'dbm'
+            self.app.config['PROXY_CACHE_DATA_DIR'] = data_dir
+
+            # Two caches with the same namespace stand for the same cache in two processes on the host
+            cache_1 = cache_utilities.create_proxy_cache(namespace='test', expire_sec=60)
+            cache_2 = cache_utilities.create_proxy_cache(namespace='test', expire_sec=60)
+            createfunc = MagicMock(return_value=['foo'])
+
+            self.assertEqual(cache_1.get(key='10', createfunc=createfunc), ['foo'])
+            self.assertEqual(cache_2.get(key='10', createfunc=createfunc), ['foo'])
+            self.assertEqual(createfunc.call_count, 1)
+
+    def test_proxy_cache_stale_while_revalidate(self) -> None:
+        self.app.config['PROXY_CACHE_MAX_STALE_SEC'] = 60
+        cache = cache_utilities.create_proxy_cache(namespace='test.stale_while_revalidate', expire_sec=10)
+        cache.clear()
+
+        revalidated = Event()
+        createfunc = MagicMock(side_effect=[['foo'], ['bar']])
+
+        def revalidate() -> List[str]:
+            try:
+                return createfunc()
+            finally:
+                revalidated.set()
+
+        with patch.object(cache_utilities.time, 'time', return_value=1000):
+            self.assertEqual(cache.get(key='10', createfunc=revalidate), ['foo'])
+        revalidated.clear()
+
+        with patch.object(cache_utilities.time, 'time', return_value=1009):
+            self.assertEqual(cache.get(key='10', createfunc=revalidate), ['foo'])
+        self.assertFalse(revalidated.is_set())
+
+        # Expired entry is served right away and recomputed in the background
+        with patch.object(cache_utilities.time, 'time', return_value=1010):
+            self.assertEqual(cache.get(key='10', createfunc=revalidate), ['foo'])
+            self.assertTrue(revalidated.wait(5))
+            for _ in range(50):
+                if not cache._revalidating_keys:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(cache.get(key='10', createfunc=revalidate), ['bar'])
+        self.assertEqual(createfunc.call_count, 2)
+
+    def test_proxy_cache_revalidate_lock(self) -> None:
+        with tempfile.TemporaryDirectory() as data_dir:
+            self.app.config['PROXY_CACHE_TYPE'] = 'dbm'
+            self.app.config['PROXY_CACHE_DATA_DIR'] = data_dir
+            self.app.config['PROXY_CACHE_LOCK_DIR'] = data_dir
+            self.app.config['PROXY_CACHE_MAX_STALE_SEC'] = 60
+
+            # Two caches with the same namespace stand for the same cache in two processes on the host
+            cache_1 = cache_utilities.create_proxy_cache(namespace='test.revalidate_lock', expire_sec=10)
+            cache_2 = cache_utilities.create_proxy_cache(namespace='test.revalidate_lock', expire_sec=10)
+            createfunc = MagicMock(side_effect=[['foo'], ['bar']])
+
+            with patch.object(cache_utilities.time, 'time', return_value=1000):
+                self.assertEqual(cache_1.get(key='10', createfunc=createfunc), ['foo'])
+
+            with patch.object(cache_utilities.time, 'time', return_value=1010):
+                # Held by the other process, or another thread, as the lock is reentrant in the same thread
+                acquired, done = Event(), Event()
+
+                def hold_lock() -> None:
+                    creation_lock = cache_2._cache.namespace.get_creation_lock(b'10')
+                    creation_lock.acquire()
+                    acquired.set()
+                    done.wait(5)
+                    creation_lock.release()
+
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    executor.submit(hold_lock)
+                    self.assertTrue(acquired.wait(5))
+                    cache_1._recompute_if_stale(key='10', createfunc=createfunc)
+                    done.set()
+                self.assertEqual(createfunc.call_count, 1)
+
+                cache_1._recompute_if_stale(key='10', createfunc=createfunc)
+                self.assertEqual(createfunc.call_count, 2)
+                # Already recomputed by the other process
+                cache_2._recompute_if_stale(key='10', createfunc=createfunc)
+                self.assertEqual(createfunc.call_count, 2)
+                self.assertEqual(cache_2.get(key='10', createfunc=createfunc), ['bar'])
+
+    def test_proxy_cache_without_max_stale(self) -> None:
+        self.app.config['PROXY_CACHE_MAX_STALE_SEC'] = 0
+        cache = cache_utilities.create_proxy_cache(namespace='test.without_max_stale', expire_sec=10)
+        cache.clear()
+
+        def slow_createfunc() -> List[str]:
+            # Takes longer than expire_sec
+            time_mock.return_value = 1011
+            return ['foo']
+
+        with patch.object(cache_utilities.time, 'time', return_value=1000) as time_mock, \
+                patch.object(cache, '_revalidate') as mock_revalidate:
+            self.assertEqual(cache.get(key='10', createfunc=slow_createfunc), ['foo'])
+            self.assertEqual(cache.get(key='10', createfunc=slow_createfunc), ['foo'])
+            mock_revalidate.assert_not_called()
+
+            # Entry is stamped once it is computed
+            self.assertEqual(cache._cache.get(key='10')[0], 1011)
+
+    def test_proxy_cache_max_stale(self) -> None:
+        self.app.config['PROXY_CACHE_MAX_STALE_SEC'] = 60
+        cache = cache_utilities.create_proxy_cache(namespace='test.max_stale', expire_sec=10)
+        cache.clear()
+
+        # Hard expiry of the beaker cache is expiry + max staleness, after which callers block on createfunc
+        self.assertEqual(cache._cache.expiretime, 70)
+        self.assertEqual(cache.get(key='10', createfunc=lambda: ['foo']), ['foo'])
+        cache.remove_value(key='10')
+        self.assertEqual(cache.get(key='10', createfunc=lambda: ['bar']), ['bar'])
+
+    def test_single_flight(self) -> None:
+        self.app.config['PROXY_SINGLE_FLIGHT'] = True
+        proxy = _Proxy(None)
+        backend_called = Event()
+        release = Event()
+
+        def get_user(user_id: str) -> str:
+            backend_called.set()
+            release.wait(5)
+            return user_id
+
+        proxy.backend.get_user.side_effect = get_user
+        app = self.app
+
+        def call() -> str:
+            with app.app_context():
+                return proxy.get_user_detail(user_id='foo')
+
+        with patch.object(cache_utilities, '_get_statsd_client') as mock_statsd_client, \
+                ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(call)
+            self.assertTrue(backend_called.wait(5))
+            waiters = [executor.submit(call) for _ in range(2)]
+            # Waiters are counted before they wait for the leader
+            for _ in range(50):
+                if mock_statsd_client.return_value.incr.call_count == 2:
+                    break
+                time.sleep(0.1)
+            release.set()
+
+            self.assertEqual([f.result(5) for f in [leader] + waiters], ['foo'] * 3)
+            mock_statsd_client.return_value.incr.assert_called_with('get_user_detail.coalesced')
+
+        self.assertEqual(proxy.backend.get_user.call_count, 1)
+
+        # Calls after the in-flight one is done are not coalesced
+        self.assertEqual(proxy.get_user_detail(user_id='foo'), 'foo')
+        self.assertEqual(proxy.backend.get_user.call_count, 2)
+
+    def test_single_flight_exception(self) -> None:
+        self.app.config['PROXY_SINGLE_FLIGHT'] = True
+        proxy = _Proxy(None)
+        proxy.backend.get_user.side_effect = RuntimeError('Boom!')
+
+        with self.assertRaises(RuntimeError):
+            proxy.get_user_detail(user_id='foo')
+        with self.assertRaises(RuntimeError):
+            proxy.get_user_detail(user_id='foo')
+        self.assertEqual(proxy.backend.get_user.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
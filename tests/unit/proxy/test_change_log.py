@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+import unittest
+from typing import List
+
+from mock import MagicMock
+
+from metadata_service import create_app
+from metadata_service.proxy.change_log import ChangeLog, get_change_log, log_change_by_table_uri, \
+    log_change_by_table_uris
+
+
+class TestChangeLog(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'changes.log')
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_append_and_read(self) -> None:
+        change_log = ChangeLog(self.path)
+        self.assertEqual(list(change_log.read(since=0)), [])
+
+        change_log.append([('table_1', 'add_tag'), ('table_2', 'add_tag')])
+        # Another process appending to the same file continues the sequence
+        ChangeLog(self.path).append([('table_1', 'delete_tag')])
+
+        records = list(change_log.read(since=0))
+        self.assertEqual([(r['seq'], r['uri'], r['change']) for r in records],
+                         [(1, 'table_1', 'add_tag'), (2, 'table_2', 'add_tag'), (3, 'table_1', 'delete_tag')])
+        self.assertEqual([r['seq'] for r in change_log.read(since=2)], [3])
+        self.assertEqual(list(change_log.read(since=3)), [])
+
+    def test_read_since(self) -> None:
+        change_log = ChangeLog(self.path)
+        change_log.append(('hive://gold.schema/table_{}'.format('x' * (i % 7)), 'add_tag') for i in range(500))
+
+        for since in (0, 1, 13, 250, 499, 500, 600):
+            self.assertEqual([r['seq'] for r in change_log.read(since=since)], list(range(since + 1, 501)))
+
+    def test_read_partial_last_line(self) -> None:
+        change_log = ChangeLog(self.path)
+        change_log.append([('table_1', 'add_tag')])
+        with open(self.path, 'ab') as f:
+            f.write(b'{"seq":2,"ts"')
+
+        self.assertEqual([r['seq'] for r in change_log.read(since=0)], [1])
+
+    def test_append_after_torn_last_line(self) -> None:
+        change_log = ChangeLog(self.path)
+        change_log.append([('table_1', 'add_tag')])
+        # e.g. crash or full disk in the middle of a write
+        with open(self.path, 'ab') as f:
+            f.write(b'{"seq":2,"ts"')
+
+        change_log.append([('table_2', 'add_tag')])
+        self.assertEqual([(r['seq'], r['uri']) for r in change_log.read(since=0)], [(1, 'table_1'), (2, 'table_2')])
+
+        # Torn line of the first record
+        with open(self.path, 'wb') as f:
+            f.write(b'{"seq":1,')
+        change_log.append([('table_3', 'add_tag')])
+        self.assertEqual([(r['seq'], r['uri']) for r in change_log.read(since=0)], [(1, 'table_3')])
+
+    def test_corrupt_record(self) -> None:
+        change_log = ChangeLog(self.path)
+        change_log.append(('table_{}'.format(i), 'add_tag') for i in range(1, 101))
+        with open(self.path, 'ab') as f:
+            f.write(b'not json\n')
+        change_log.append([('table_101', 'add_tag')])
+
+        with open(self.path, 'rb') as f:
+            lines = f.readlines()
+        lines[49] = b'{"seq":\n'
+        with open(self.path, 'wb') as f:
+            f.writelines(lines)
+
+        for since in (0, 30, 49, 50, 100):
+            self.assertEqual([r['seq'] for r in change_log.read(since=since)],
+                             [seq for seq in range(since + 1, 102) if seq != 50])
+
+    def test_get_change_log(self) -> None:
+        self.assertIsNone(get_change_log())
+
+        self.app.config['CHANGE_LOG_PATH'] = self.path
+        self.assertIs(get_change_log(), get_change_log())
+        self.assertEqual(get_change_log().path, self.path)
+
+    def test_decorators(self) -> None:
+        class Proxy:
+            def __init__(self, change_log: ChangeLog) -> None:
+                self._change_log = change_log
+
+            @log_change_by_table_uri
+            def add_tag(self, *, table_uri: str, tag: str) -> None:
+                raise RuntimeError()
+
+            @log_change_by_table_uri
+            def delete_tag(self, *, table_uri: str, tag: str) -> None:
+                pass
+
+            @log_change_by_table_uris
+            def add_tags_bulk(self, *, table_uris: List[str], tag: str) -> List[str]:
+                # table_4 does not exist
+                return ['table_4']
+
+        change_log = MagicMock()
+        proxy = Proxy(change_log)
+        with self.assertRaises(RuntimeError):
+            proxy.add_tag(table_uri='table_1', tag='tag')
+        self.assertEqual(change_log.append.call_count, 0)
+
+        proxy.delete_tag(table_uri='table_1', tag='tag')
+        proxy.add_tags_bulk(table_uris=['table_2', 'table_3', 'table_4'], tag='tag')
+
+        self.assertEqual(change_log.append.call_args_list[0][0][0], [('table_1', 'delete_tag')])
+        self.assertEqual(list(change_log.append.call_args_list[1][0][0]),
+                         [('table_2', 'add_tags_bulk'), ('table_3', 'add_tags_bulk')])
+
+        # Disabled
+        Proxy(None).add_tags_bulk(table_uris=['table_2'], tag='tag')
+
+        # The update is applied, so it doesn't fail
+        change_log.append.side_effect = OSError('No space left on device')
+        proxy.delete_tag(table_uri='table_1', tag='tag')
+
+
+if __name__ == '__main__':
+    unittest.main()
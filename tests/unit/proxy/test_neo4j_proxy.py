@@ -1,19 +1,27 @@
-import copy
 import textwrap
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict  # noqa: F401
 
 from mock import patch, MagicMock
 from neo4j.v1 import GraphDatabase
 
 from metadata_service import create_app
+from metadata_service.config import LocalConfig
 from metadata_service.entity.popular_table import PopularTable
 from metadata_service.entity.table_detail import (Application, Column, Table, Tag,
                                                   Watermark, Source, Statistics, User)
 from metadata_service.entity.tag_detail import TagDetail
-from metadata_service.exception import NotFoundException
-from metadata_service.proxy.neo4j_proxy import Neo4jProxy
-from metadata_service.util import UserResourceRel
+from metadata_service.exception import NotFoundException, PreconditionFailedException
+from metadata_service.proxy.cache_utilities import PeriodicRefresher
+from metadata_service.proxy.write_behind import WriteBehindQueue
+from metadata_service.proxy.neo4j_proxy import Neo4jProxy, bootstrap_schema
+from metadata_service.util import UserResourceRel, get_description_etag
+
+
+class StrictSchemaBootstrapConfig(LocalConfig):
+    NEO4J_SCHEMA_BOOTSTRAP = True
+    NEO4J_SCHEMA_STRICT = True
 
 
 class TestNeo4jProxy(unittest.TestCase):
@@ -23,30 +31,28 @@ class TestNeo4jProxy(unittest.TestCase):
         self.app_context = self.app.app_context()
         self.app_context.push()
 
-        table_entry = {'db': {'name': 'hive'},
-                       'clstr': {
-                           'name': 'gold'},
-                       'schema': {
-                           'name': 'foo_schema'},
-                       'tbl': {
-                           'name': 'foo_table'},
-                       'tbl_dscrpt': {
-                           'description': 'foo description'}
-                       }
-
-        col1 = copy.deepcopy(table_entry)  # type: Dict[Any, Any]
-        col1['col'] = {'name': 'bar_id_1',
-                       'type': 'varchar',
-                       'sort_order': 0}
-        col1['col_dscrpt'] = {'description': 'bar col description'}
-        col1['col_stats'] = [{'stat_name': 'avg', 'start_epoch': 1, 'end_epoch': 1, 'stat_val': '1'}]
-
-        col2 = copy.deepcopy(table_entry)  # type: Dict[Any, Any]
-        col2['col'] = {'name': 'bar_id_2',
-                       'type': 'bigint',
-                       'sort_order': 1}
-        col2['col_dscrpt'] = {'description': 'bar col2 description'}
-        col2['col_stats'] = [{'stat_name': 'avg', 'start_epoch': 2, 'end_epoch': 2, 'stat_val': '2'}]
+        self.table_context = {'database_name': 'hive',
+                              'cluster_name': 'gold',
+                              'schema_name': 'foo_schema',
+                              'table_name': 'foo_table',
+                              'table_description': 'foo description',
+                              'is_view': None}  # type: Dict[str, Any]
+
+        col1 = {'name': 'bar_id_1',
+                'type': 'varchar',
+                'sort_order': 0,
+                'description': 'bar col description',
+                'stats': [{'stat_name': 'avg', 'start_epoch': 1, 'end_epoch': 1, 'stat_val': '1'}]}
+
+        col2 = {'name': 'bar_id_2',
+                'type': 'bigint',
+                'sort_order': 1,
+                'description': 'bar col2 description',
+                'stats': [{'stat_name': 'avg', 'start_epoch': 2, 'end_epoch': 2, 'stat_val': '2'}]}
+
+        self.table_context['cols'] = [col1, col2]
+        col_level_results = MagicMock()
+        col_level_results.single.return_value = self.table_context
 
         table_level_results = MagicMock()
         table_level_results.single.return_value = {
@@ -99,10 +105,7 @@ class TestNeo4jProxy(unittest.TestCase):
 
         last_updated_timestamp = '01'
 
-        self.col_usage_return_value = [
-            col1,
-            col2
-        ]
+        self.col_usage_return_value = col_level_results
         self.table_level_return_value = table_level_results
 
         self.table_writer = table_writer
@@ -153,9 +156,8 @@ class TestNeo4jProxy(unittest.TestCase):
             self.assertEqual(str(expected), str(table))
 
     def test_get_table_view_only(self) -> None:
-        col_usage_return_value = copy.deepcopy(self.col_usage_return_value)
-        for col in col_usage_return_value:
-            col['tbl']['is_view'] = True
+        col_usage_return_value = MagicMock()
+        col_usage_return_value.single.return_value = dict(self.table_context, is_view=True)
 
         with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
             mock_execute.side_effect = [col_usage_return_value, [], self.table_level_return_value]
@@ -196,6 +198,169 @@ class TestNeo4jProxy(unittest.TestCase):
 
             self.assertEqual(str(expected), str(table))
 
+    def test_get_table_concurrently(self) -> None:
+        def execute_by_statement(*, statement: str, param_dict: Dict[str, Any]) -> Any:
+            # Queries are sent at the same time, so the mocked results can't rely on call order
+            if '[:COLUMN]' in statement:
+                return self.col_usage_return_value
+            if '[read:READ]' in statement:
+                return []
+            return self.table_level_return_value
+
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.side_effect = [self.col_usage_return_value, [], self.table_level_return_value]
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            expected = neo4j_proxy.get_table(table_uri='dummy_uri')
+
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.side_effect = execute_by_statement
+
+            self.app.config['NEO4J_CONCURRENT_TABLE_QUERY'] = True
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            self.assertIsNotNone(neo4j_proxy._table_query_executor)
+            table = neo4j_proxy.get_table(table_uri='dummy_uri')
+
+            self.assertEqual(mock_execute.call_count, 3)
+            self.assertEqual(str(expected), str(table))
+
+    def test_get_table_concurrently_not_found(self) -> None:
+        self.app.config['NEO4J_CONCURRENT_TABLE_QUERY'] = True
+
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.side_effect = lambda *, statement, param_dict: \
+                MagicMock(**{'single.return_value': None}) if '[:COLUMN]' in statement \
+                else self.table_level_return_value
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            self.assertRaises(NotFoundException, neo4j_proxy.get_table, table_uri='dummy_uri')
+
+    def test_get_table_single_query(self) -> None:
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.side_effect = [self.col_usage_return_value, [], self.table_level_return_value]
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            expected = neo4j_proxy.get_table(table_uri='dummy_uri')
+
+        table_detail_record = dict(self.table_level_return_value.single.return_value)
+        table_detail_record.update(self.table_context)
+        table_detail_record['usage_records'] = []
+
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.return_value.single.return_value = table_detail_record
+
+            self.app.config['NEO4J_SINGLE_TABLE_DETAIL_QUERY'] = True
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            table = neo4j_proxy.get_table(table_uri='dummy_uri')
+
+            self.assertEqual(mock_execute.call_count, 1)
+            self.assertEqual(str(expected), str(table))
+            # Watermarks, owners and tags are de-duplicated as collect(distinct) does
+            statement = mock_execute.call_args[1]['statement']
+            for name in ('wmk', 'owner', 'tag'):
+                self.assertIn('CASE WHEN {0} IN {0}s THEN {0}s ELSE {0}s + {0} END) as {0}_records'.format(name),
+                              statement)
+
+            mock_execute.return_value.single.return_value = None
+            self.assertRaises(NotFoundException, neo4j_proxy.get_table, table_uri='dummy_uri')
+
+    def test_get_table_cache(self) -> None:
+        self.app.config['TABLE_CACHE_MAX_SIZE'] = 10
+
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.side_effect = [self.col_usage_return_value, [], self.table_level_return_value] * 2
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            table = neo4j_proxy.get_table(table_uri='dummy_uri')
+            self.assertIs(neo4j_proxy.get_table(table_uri='dummy_uri'), table)
+            self.assertEqual(mock_execute.call_count, 3)
+
+            neo4j_proxy.add_tag(table_uri='dummy_uri', tag='hive')
+            self.assertIsNot(neo4j_proxy.get_table(table_uri='dummy_uri'), table)
+            self.assertEqual(mock_execute.call_count, 6)
+
+    def test_get_tables(self) -> None:
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.side_effect = [self.col_usage_return_value, [], self.table_level_return_value]
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            expected = neo4j_proxy.get_table(table_uri='dummy_uri')
+
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.side_effect = [
+                [dict(self.table_context, tbl_key='dummy_uri')],
+                [],
+                [dict(self.table_level_return_value.single.return_value, tbl_key='dummy_uri')],
+            ]
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            tables = neo4j_proxy.get_tables(table_uris=['dummy_uri', 'missing_uri'])
+
+            self.assertEqual(mock_execute.call_count, 3)
+            self.assertEqual(mock_execute.call_args[1]['param_dict'], {'tbl_keys': ['dummy_uri', 'missing_uri']})
+            self.assertEqual(list(tables.keys()), ['dummy_uri'])
+            self.assertEqual(str(expected), str(tables['dummy_uri']))
+
+    def test_get_tables_in_batches(self) -> None:
+        self.app.config['NEO4J_BULK_TABLE_BATCH_SIZE'] = 2
+
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.return_value = []
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            tables = neo4j_proxy.get_tables(table_uris=['uri_1', 'uri_2', 'uri_3'])
+
+            self.assertEqual(tables, {})
+            # Usage and table level queries are skipped when no table is found in the chunk
+            self.assertEqual([call[1]['param_dict'] for call in mock_execute.call_args_list],
+                             [{'tbl_keys': ['uri_1', 'uri_2']}, {'tbl_keys': ['uri_3']}])
+
+    def test_get_table_without_columns(self) -> None:
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            column_count_results = MagicMock()
+            column_count_results.single.return_value = dict(self.table_context, column_count=2)
+            mock_execute.side_effect = [column_count_results, [], self.table_level_return_value]
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            table = neo4j_proxy.get_table(table_uri='dummy_uri', include_columns=False)
+
+            self.assertEqual(table.columns, [])
+            self.assertEqual(table.column_count, 2)
+            self.assertIn('column_count', mock_execute.call_args_list[0][1]['statement'])
+
+    def test_get_table_without_columns_not_found(self) -> None:
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.return_value.single.return_value = None
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            self.assertRaises(NotFoundException, neo4j_proxy.get_table, table_uri='missing_uri',
+                              include_columns=False)
+
+    def test_get_columns(self) -> None:
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.return_value = [{'col_record': self.table_context['cols'][1]}]
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            columns = neo4j_proxy.get_columns(table_uri='dummy_uri', offset=1, limit=1)
+
+            self.assertEqual(mock_execute.call_args[1]['param_dict'], {'tbl_key': 'dummy_uri', 'offset': 1, 'limit': 1})
+            expected = [Column(name='bar_id_2', description='bar col2 description', col_type='bigint', sort_order=1,
+                               stats=[Statistics(start_epoch=2, end_epoch=2, stat_type='avg', stat_val='2')])]
+            self.assertEqual(str(expected), str(columns))
+
+    def test_get_columns_not_found(self) -> None:
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            table_exists = MagicMock()
+            table_exists.single.return_value = None
+            mock_execute.side_effect = [[], table_exists, [], table_exists]
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            self.assertRaises(NotFoundException, neo4j_proxy.get_columns, table_uri='missing_uri', offset=0, limit=10)
+            # The table is checked regardless of the page
+            self.assertRaises(NotFoundException, neo4j_proxy.get_columns, table_uri='missing_uri', offset=10, limit=10)
+
+            # Offset beyond the last column of an existing table is an empty page
+            table_exists.single.return_value = {'tbl_key': 'dummy_uri'}
+            mock_execute.side_effect = [[], table_exists]
+            self.assertEqual(neo4j_proxy.get_columns(table_uri='dummy_uri', offset=10, limit=10), [])
+
     def test_get_table_with_valid_description(self) -> None:
         """
         Test description is returned for table
@@ -257,9 +422,37 @@ class TestNeo4jProxy(unittest.TestCase):
             neo4j_proxy.put_table_description(table_uri='test_table',
                                               description='test_description')
 
-            self.assertEquals(mock_run.call_count, 2)
+            self.assertEquals(mock_run.call_count, 1)
             self.assertEquals(mock_commit.call_count, 1)
 
+    def test_put_table_description_etag(self) -> None:
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_transaction = mock_driver.return_value.session.return_value.begin_transaction.return_value
+            mock_transaction.closed.return_value = False
+            mock_transaction.run.return_value.single.return_value = {'description': 'current description'}
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            with self.assertRaises(PreconditionFailedException):
+                neo4j_proxy.put_table_description(table_uri='test_table',
+                                                  description='test_description',
+                                                  etag=get_description_etag('stale description'))
+
+            # only the current description is read, after locking the node
+            self.assertEqual(mock_transaction.run.call_count, 1)
+            self.assertEqual(mock_transaction.commit.call_count, 0)
+            statement = mock_transaction.run.call_args[0][0]
+            self.assertLess(statement.index('SET n2._lock = true'), statement.index('d.description'))
+
+            mock_transaction.run.reset_mock()
+            mock_transaction.run.return_value.single.side_effect = [{'description': 'current description'},
+                                                                    {'n2.key': 'test_table', 'unchanged': False}]
+            neo4j_proxy.put_table_description(table_uri='test_table',
+                                              description='test_description',
+                                              etag=get_description_etag('current description'))
+
+            self.assertEqual(mock_transaction.run.call_count, 2)
+            self.assertEqual(mock_transaction.commit.call_count, 1)
+
     def test_get_column_with_valid_description(self) -> None:
         """
         Test description is returned for column
@@ -326,7 +519,7 @@ class TestNeo4jProxy(unittest.TestCase):
                                                column_name='test_column',
                                                description='test_description')
 
-            self.assertEquals(mock_run.call_count, 2)
+            self.assertEquals(mock_run.call_count, 1)
             self.assertEquals(mock_commit.call_count, 1)
 
     def test_add_owner(self) -> None:
@@ -345,10 +538,76 @@ class TestNeo4jProxy(unittest.TestCase):
             neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
             neo4j_proxy.add_owner(table_uri='dummy_uri',
                                   owner='tester')
-            # we call neo4j twice in add_owner call
-            self.assertEquals(mock_run.call_count, 2)
+            # we call neo4j once in add_owner call
+            self.assertEquals(mock_run.call_count, 1)
             self.assertEquals(mock_commit.call_count, 1)
 
+    def test_add_owner_failure(self) -> None:
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_session = MagicMock()
+            mock_driver.return_value.session.return_value = mock_session
+
+            mock_transaction = MagicMock()
+            mock_session.begin_transaction.return_value = mock_transaction
+            mock_transaction.closed.return_value = False
+            mock_transaction.run.return_value.single.return_value = None
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            with self.assertRaises(RuntimeError):
+                neo4j_proxy.add_owner(table_uri='dummy_uri',
+                                      owner='tester')
+
+            self.assertEqual(mock_transaction.commit.call_count, 0)
+            self.assertEqual(mock_transaction.rollback.call_count, 1)
+            self.assertEqual(mock_session.close.call_count, 1)
+            self.assertEqual(neo4j_proxy._sessions_in_use, 0)
+
+    def test_session_metrics(self) -> None:
+        with patch.object(GraphDatabase, 'driver'), \
+                patch('metadata_service.proxy.neo4j_proxy._get_statsd_client') as mock_statsd_client:
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000, num_conns=2)
+
+            with neo4j_proxy._session():
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    executor.submit(self._hold_session, neo4j_proxy).result()
+
+            self.assertEqual(neo4j_proxy._sessions_in_use, 0)
+            self.assertEqual(mock_statsd_client.return_value.timing.call_args_list[0][0][0],
+                             'sessions.acquire_wait')
+            self.assertEqual([c[0] for c in mock_statsd_client.return_value.gauge.call_args_list],
+                             [('sessions.open', 1), ('sessions.open', 2),
+                              ('sessions.open', 1), ('sessions.open', 0)])
+
+    def _hold_session(self, neo4j_proxy: Neo4jProxy) -> None:
+        with self.app.app_context(), neo4j_proxy._session():
+            self.assertEqual(neo4j_proxy._sessions_in_use, 2)
+
+    def test_nested_session(self) -> None:
+        with patch.object(GraphDatabase, 'driver'):
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+
+            with neo4j_proxy._transaction():
+                with self.assertRaises(RuntimeError):
+                    neo4j_proxy._execute_cypher_query(statement='RETURN 1', param_dict={})
+                self.assertEqual(neo4j_proxy._sessions_in_use, 1)
+
+            with neo4j_proxy._session():
+                pass
+            self.assertEqual(neo4j_proxy._sessions_in_use, 0)
+
+    def test_session_acquisition_timeout(self) -> None:
+        self.app.config['NEO4J_SESSION_ACQUISITION_TIMEOUT_SEC'] = 0.01
+        with patch.object(GraphDatabase, 'driver'):
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000, num_conns=1)
+
+            with neo4j_proxy._session():
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    with self.assertRaisesRegex(RuntimeError, 'within'):
+                        executor.submit(self._hold_session, neo4j_proxy).result()
+
+            with neo4j_proxy._session():
+                self.assertEqual(neo4j_proxy._sessions_in_use, 1)
+
     def test_delete_owner(self) -> None:
         with patch.object(GraphDatabase, 'driver') as mock_driver:
             mock_session = MagicMock()
@@ -385,10 +644,160 @@ class TestNeo4jProxy(unittest.TestCase):
             neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
             neo4j_proxy.add_tag(table_uri='dummy_uri',
                                 tag='hive')
-            # we call neo4j twice in add_tag call
-            self.assertEquals(mock_run.call_count, 3)
+            # we call neo4j once in add_tag call
+            self.assertEquals(mock_run.call_count, 1)
             self.assertEquals(mock_commit.call_count, 1)
 
+    def test_add_tag_table_not_found(self) -> None:
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_transaction = mock_driver.return_value.session.return_value.begin_transaction.return_value
+            mock_transaction.closed.return_value = False
+            mock_transaction.run.return_value.single.return_value = None
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            with self.assertRaises(NotFoundException):
+                neo4j_proxy.add_tag(table_uri='dummy_uri',
+                                    tag='hive')
+
+            self.assertEqual(mock_transaction.commit.call_count, 0)
+            self.assertEqual(mock_transaction.rollback.call_count, 1)
+
+    def test_put_descriptions_bulk(self) -> None:
+        self.app.config['NEO4J_BULK_WRITE_BATCH_SIZE'] = 2
+
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_transaction = mock_driver.return_value.session.return_value.begin_transaction.return_value
+            mock_transaction.closed.return_value = False
+            mock_transaction.run.side_effect = [
+                [{'key': 'tbl_1'}],  # tables of the first chunk
+                [],  # columns of the first chunk
+                [{'key': 'tbl_2'}],  # tables of the second chunk
+            ]
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            applied = neo4j_proxy.put_descriptions_bulk(descriptions=[
+                {'table_uri': 'tbl_1', 'description': 'desc_1'},
+                {'table_uri': 'tbl_1', 'column_name': 'col_1', 'description': 'col_desc_1'},
+                {'table_uri': 'tbl_2', 'description': 'desc_2'},
+            ])
+
+            self.assertEqual(applied, [True, False, True])
+            self.assertEqual(mock_transaction.commit.call_count, 2)
+            self.assertEqual([call[0][1]['items'] for call in mock_transaction.run.call_args_list], [
+                [{'key': 'tbl_1', 'desc_key': 'tbl_1/_description', 'description': 'desc_1'}],
+                [{'key': 'tbl_1/col_1', 'desc_key': 'tbl_1/col_1/_description', 'description': 'col_desc_1'}],
+                [{'key': 'tbl_2', 'desc_key': 'tbl_2/_description', 'description': 'desc_2'}],
+            ])
+            self.assertIn('MATCH (n2:Column {key: item.key})', mock_transaction.run.call_args_list[1][0][0])
+
+    def test_put_table_usages_bulk(self) -> None:
+        self.app.config['NEO4J_BULK_WRITE_BATCH_SIZE'] = 2
+
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_transaction = mock_driver.return_value.session.return_value.begin_transaction.return_value
+            mock_transaction.closed.return_value = False
+            mock_transaction.run.return_value.single.side_effect = [{'count': 2, 'tbl_keys': ['tbl_1']},
+                                                                    {'count': 0, 'tbl_keys': []}]
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            usages = iter([('user_b', 'tbl_1', 3), ('user_a', 'tbl_1', 5), ('user_a', 'tbl_3', 1)])
+            applied = neo4j_proxy.put_table_usages_bulk(usages=usages)
+
+            self.assertEqual(applied, 2)
+            self.assertEqual(mock_transaction.commit.call_count, 2)
+            self.assertEqual([call[0][1]['usages'] for call in mock_transaction.run.call_args_list], [
+                [{'user_email': 'user_a', 'tbl_key': 'tbl_1', 'read_count': 5},
+                 {'user_email': 'user_b', 'tbl_key': 'tbl_1', 'read_count': 3}],
+                [{'user_email': 'user_a', 'tbl_key': 'tbl_3', 'read_count': 1}],
+            ])
+
+    def test_bootstrap_schema(self) -> None:
+        constraints = [{'description': 'CONSTRAINT ON ( n:{} ) ASSERT n.key IS UNIQUE'.format(label)}
+                       for label in ('Table', 'Column', 'User', 'Description', 'Updatedtimestamp')]
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_session = mock_driver.return_value.session.return_value.__enter__.return_value
+            mock_session.run.side_effect = [constraints, MagicMock(), constraints + [
+                {'description': 'CONSTRAINT ON ( tag:Tag ) ASSERT tag.key IS UNIQUE'}]]
+
+            missing = bootstrap_schema(host='DOES_NOT_MATTER', port=0000, strict=True)
+
+            self.assertEqual(missing, [])
+            self.assertEqual([call[0][0] for call in mock_session.run.call_args_list],
+                             ['CALL db.constraints()', 'CREATE CONSTRAINT ON (n:Tag) ASSERT n.key IS UNIQUE',
+                              'CALL db.constraints()'])
+            mock_driver.return_value.close.assert_called_once_with()
+
+    def test_bootstrap_schema_strict(self) -> None:
+        constraints = [{'description': 'CONSTRAINT ON ( n:{} ) ASSERT n.key IS UNIQUE'.format(label)}
+                       for label in ('Column', 'User', 'Tag', 'Description', 'Updatedtimestamp')]
+
+        def run(statement: str) -> Any:
+            if statement.startswith('CREATE'):
+                # e.g. duplicate table keys
+                raise Exception('duplicate keys')
+            return constraints
+
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_session = mock_driver.return_value.session.return_value.__enter__.return_value
+            mock_session.run.side_effect = run
+
+            self.assertEqual(bootstrap_schema(host='DOES_NOT_MATTER', port=0000, create_missing=False), ['Table'])
+            self.assertEqual(mock_session.run.call_count, 1)
+
+            with self.assertRaises(RuntimeError):
+                bootstrap_schema(host='DOES_NOT_MATTER', port=0000, strict=True)
+            self.assertEqual(mock_session.run.call_count, 4)
+
+            # At start up of the service, without creating the proxy client and its background threads
+            with patch.object(Neo4jProxy, '__init__') as mock_init, self.assertRaises(RuntimeError):
+                create_app(config_module_class='tests.unit.proxy.test_neo4j_proxy.StrictSchemaBootstrapConfig')
+            mock_init.assert_not_called()
+            self.assertEqual(mock_session.run.call_count, 7)
+
+    def test_change_log(self) -> None:
+        with patch.object(GraphDatabase, 'driver') as mock_driver, \
+                patch('metadata_service.proxy.neo4j_proxy.get_change_log') as mock_get_change_log:
+            mock_transaction = mock_driver.return_value.session.return_value.begin_transaction.return_value
+            mock_transaction.closed.return_value = False
+            mock_change_log = mock_get_change_log.return_value
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            neo4j_proxy.add_tag(table_uri='tbl_1', tag='hive')
+
+            # tbl_3 does not exist
+            mock_transaction.run.return_value = [{'key': 'tbl_2'}]
+            neo4j_proxy.put_descriptions_bulk(descriptions=[{'table_uri': 'tbl_2', 'description': 'desc_2'},
+                                                            {'table_uri': 'tbl_3', 'description': 'desc_3'}])
+
+            # unchanged description
+            mock_transaction.run.return_value = MagicMock()
+            mock_transaction.run.return_value.single.return_value = {'n2.key': 'tbl_2', 'unchanged': True}
+            neo4j_proxy.put_table_description(table_uri='tbl_2', description='desc_2')
+
+            self.assertEqual([list(call[0][0]) for call in mock_change_log.append.call_args_list],
+                             [[('tbl_1', 'add_tag')], [('tbl_2', 'put_descriptions_bulk')]])
+
+            mock_transaction.run.return_value.single.return_value = {'n2.key': 'tbl_2', 'unchanged': False}
+            neo4j_proxy.put_table_description(table_uri='tbl_2', description='desc_new')
+            self.assertEqual(mock_change_log.append.call_args[0][0], [('tbl_2', 'put_table_description')])
+
+    def test_add_tags_bulk(self) -> None:
+        self.app.config['NEO4J_BULK_WRITE_BATCH_SIZE'] = 2
+
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_transaction = mock_driver.return_value.session.return_value.begin_transaction.return_value
+            mock_transaction.closed.return_value = False
+            mock_transaction.run.side_effect = [[{'tbl_key': 'uri_1'}], [{'tbl_key': 'uri_3'}]]
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            not_found = neo4j_proxy.add_tags_bulk(table_uris=['uri_1', 'uri_2', 'uri_3'], tag='pii')
+
+            self.assertEqual(not_found, ['uri_2'])
+            # One statement and transaction per chunk
+            self.assertEqual([call[0][1]['tbl_keys'] for call in mock_transaction.run.call_args_list],
+                             [['uri_1', 'uri_2'], ['uri_3']])
+            self.assertEqual(mock_transaction.commit.call_count, 2)
+
     def test_delete_tag(self) -> None:
         with patch.object(GraphDatabase, 'driver') as mock_driver:
             mock_session = MagicMock()
@@ -427,6 +836,25 @@ class TestNeo4jProxy(unittest.TestCase):
 
             self.assertEqual(actual.__repr__(), expected.__repr__())
 
+    def test_get_tags_cache(self) -> None:
+        self.app.config['PROXY_TAGS_CACHE_EXPIRY_SEC'] = 60
+
+        with patch.object(GraphDatabase, 'driver') as mock_driver, \
+                patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
+            mock_execute.return_value = [{'tag_name': {'key': 'tag1'}, 'tag_count': 2}]
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            neo4j_proxy._tags_cache.clear()
+
+            tags = neo4j_proxy.get_tags()
+            self.assertIs(neo4j_proxy.get_tags(), tags)
+            self.assertEqual(mock_execute.call_count, 1)
+
+            mock_driver.return_value.session.return_value.begin_transaction.return_value.closed.return_value = False
+            neo4j_proxy.delete_tag(table_uri='dummy_uri', tag='tag1')
+            neo4j_proxy.get_tags()
+            self.assertEqual(mock_execute.call_count, 2)
+
     def test_get_neo4j_latest_updated_ts(self) -> None:
         with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
             mock_execute.return_value.single.return_value = {
@@ -481,6 +909,32 @@ class TestNeo4jProxy(unittest.TestCase):
 
             self.assertEqual(actual.__repr__(), expected.__repr__())
 
+    def test_get_popular_tables_precomputed(self) -> None:
+        self.app.config['NEO4J_POPULAR_TABLES_REFRESH_INTERVAL_SEC'] = 60
+        self.app.config['NEO4J_POPULAR_TABLES_PRECOMPUTE_SIZE'] = 3
+
+        with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute, \
+                patch.object(PeriodicRefresher, 'start') as mock_start:
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            neo4j_proxy._popular_tables_ranking_cache.clear()
+            mock_start.assert_called_once_with()
+
+            # Not read by the refresher yet, so it's computed on request
+            mock_execute.side_effect = [[{'table_key': 'foo'}, {'table_key': 'bar'}, {'table_key': 'baz'}], []]
+            neo4j_proxy.get_popular_tables(num_entries=2)
+            self.assertEqual(mock_execute.call_args_list[0][1]['param_dict'], {'num_entries': 3})
+            self.assertEqual(mock_execute.call_args_list[1][1]['param_dict'], {'table_uris': ['foo', 'bar']})
+
+            # Refresher reads the ranking from the cache instead of computing it again
+            neo4j_proxy._popular_tables_refresher.refresh()
+            self.assertEqual(mock_execute.call_count, 2)
+
+            mock_execute.side_effect = None
+            mock_execute.return_value = []
+            neo4j_proxy.get_popular_tables(num_entries='1')
+            self.assertEqual(mock_execute.call_args[1]['param_dict'], {'table_uris': ['foo']})
+            self.assertEqual(mock_execute.call_count, 3)
+
     def test_get_users(self) -> None:
         with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
             mock_execute.return_value.single.return_value = {
@@ -572,6 +1026,116 @@ class TestNeo4jProxy(unittest.TestCase):
             self.assertEquals(mock_run.call_count, 1)
             self.assertEquals(mock_commit.call_count, 1)
 
+    def test_resource_relation_by_user_statements(self) -> None:
+        with patch.object(GraphDatabase, 'driver') as mock_driver:
+            mock_run = mock_driver.return_value.session.return_value.begin_transaction.return_value.run
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            for user_email, table_uri in (('tester_1', 'dummy_uri_1'), ('tester_2', 'dummy_uri_2')):
+                neo4j_proxy.add_table_relation_by_user(table_uri=table_uri, user_email=user_email,
+                                                       relation_type=UserResourceRel.follow)
+                neo4j_proxy.delete_table_relation_by_user(table_uri=table_uri, user_email=user_email,
+                                                          relation_type=UserResourceRel.follow)
+
+            calls = mock_run.call_args_list
+            # Values are passed as parameters, so statements are the same regardless of user and table
+            self.assertEqual([call[0][0] for call in calls[:3]], [call[0][0] for call in calls[3:]])
+            self.assertEqual(calls[1][0][1], {'user_email': 'tester_1', 'tbl_key': 'dummy_uri_1'})
+            self.assertEqual(calls[5][0][1], {'user_email': 'tester_2', 'tbl_key': 'dummy_uri_2'})
+            self.assertNotIn('tester', ''.join(call[0][0] for call in calls))
+            # User node is upserted with the email itself
+            self.assertEqual(calls[0][0][1], {'user_email': 'tester_1'})
+
+    def test_get_invalid_relation_type(self) -> None:
+        with patch.object(GraphDatabase, 'driver'):
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            self.assertRaises(NotImplementedError, neo4j_proxy.add_table_relation_by_user, table_uri='dummy_uri',
+                              user_email='tester', relation_type='unknown')
+
+    def test_resource_relation_by_user_write_behind(self) -> None:
+        self.app.config['NEO4J_RELATION_WRITE_BEHIND'] = True
+        self.app.config['NEO4J_BULK_WRITE_BATCH_SIZE'] = 2
+
+        with patch.object(GraphDatabase, 'driver') as mock_driver, \
+                patch.object(WriteBehindQueue, 'start') as mock_start, \
+                patch('metadata_service.proxy.neo4j_proxy.get_change_log') as mock_get_change_log:
+            mock_transaction = mock_driver.return_value.session.return_value.begin_transaction.return_value
+            mock_transaction.closed.return_value = False
+            mock_change_log = mock_get_change_log.return_value
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            mock_start.assert_called_once_with()
+
+            neo4j_proxy.add_table_relation_by_user(table_uri='uri_1', user_email='b@lyft.com',
+                                                   relation_type=UserResourceRel.follow)
+            neo4j_proxy.add_table_relation_by_user(table_uri='uri_2', user_email='b@lyft.com',
+                                                   relation_type=UserResourceRel.follow)
+            neo4j_proxy.add_table_relation_by_user(table_uri='uri_1', user_email='a@lyft.com',
+                                                   relation_type=UserResourceRel.follow)
+            # Toggled back, so only the delete is written
+            neo4j_proxy.delete_table_relation_by_user(table_uri='uri_2', user_email='b@lyft.com',
+                                                      relation_type=UserResourceRel.follow)
+            self.assertEqual(mock_transaction.run.call_count, 0)
+            # Queued updates are logged once they are flushed
+            self.assertEqual(mock_change_log.append.call_count, 0)
+
+            neo4j_proxy._relation_write_behind_queue.flush()
+
+            calls = mock_transaction.run.call_args_list
+            self.assertEqual(len(calls), 2)
+            self.assertIn('MERGE (n1)-[r1:FOLLOW]->(n2)-[r2:FOLLOWED_BY]->(n1)', calls[0][0][0])
+            # Sorted by user
+            self.assertEqual(calls[0][0][1], {'relations': [{'user_email': 'a@lyft.com', 'tbl_key': 'uri_1'},
+                                                            {'user_email': 'b@lyft.com', 'tbl_key': 'uri_1'}]})
+            self.assertIn('DELETE r1,r2', calls[1][0][0])
+            self.assertEqual(calls[1][0][1], {'relations': [{'user_email': 'b@lyft.com', 'tbl_key': 'uri_2'}]})
+            self.assertEqual(mock_transaction.commit.call_count, 2)
+            self.assertEqual([list(call[0][0]) for call in mock_change_log.append.call_args_list],
+                             [[('uri_1', 'add_table_relation_by_user'), ('uri_1', 'add_table_relation_by_user')],
+                              [('uri_2', 'delete_table_relation_by_user')]])
+
+            # Own relation is written synchronously
+            neo4j_proxy.add_table_relation_by_user(table_uri='uri_1', user_email='a@lyft.com',
+                                                   relation_type=UserResourceRel.own)
+            self.assertEqual(mock_transaction.run.call_count, 4)
+
+    def test_resource_relation_by_user_write_behind_failure(self) -> None:
+        self.app.config['NEO4J_RELATION_WRITE_BEHIND'] = True
+        self.app.config['NEO4J_RELATION_QUEUE_MAX_SIZE'] = 2
+        self.app.config['NEO4J_BULK_WRITE_BATCH_SIZE'] = 1
+
+        with patch.object(GraphDatabase, 'driver') as mock_driver, \
+                patch.object(WriteBehindQueue, 'start'), \
+                patch('metadata_service.proxy.neo4j_proxy.get_change_log') as mock_get_change_log:
+            mock_transaction = mock_driver.return_value.session.return_value.begin_transaction.return_value
+            mock_transaction.closed.return_value = False
+            mock_change_log = mock_get_change_log.return_value
+
+            neo4j_proxy = Neo4jProxy(host='DOES_NOT_MATTER', port=0000)
+            queue = neo4j_proxy._relation_write_behind_queue
+
+            neo4j_proxy.add_table_relation_by_user(table_uri='uri_1', user_email='a@lyft.com',
+                                                   relation_type=UserResourceRel.follow)
+            neo4j_proxy.add_table_relation_by_user(table_uri='uri_2', user_email='a@lyft.com',
+                                                   relation_type=UserResourceRel.follow)
+
+            # Only the second chunk fails, so only its update is queued again
+            mock_transaction.run.side_effect = [None, RuntimeError('Boom!')]
+            queue.flush()
+            self.assertEqual(list(queue._pending.items()), [(('a@lyft.com', 'uri_2', UserResourceRel.follow), True)])
+            self.assertEqual([list(call[0][0]) for call in mock_change_log.append.call_args_list],
+                             [[('uri_1', 'add_table_relation_by_user')]])
+
+            # The queue is full, so the update is written synchronously while holding the flush lock
+            mock_transaction.run.side_effect = None
+            queue.put(('a@lyft.com', 'uri_3', UserResourceRel.follow), True)
+            with patch.object(queue, 'synchronous_write', wraps=queue.synchronous_write) as mock_synchronous_write:
+                neo4j_proxy.delete_table_relation_by_user(table_uri='uri_1', user_email='a@lyft.com',
+                                                          relation_type=UserResourceRel.follow)
+                mock_synchronous_write.assert_called_once_with(('a@lyft.com', 'uri_1', UserResourceRel.follow))
+            self.assertIn('DELETE r1,r2', mock_transaction.run.call_args[0][0])
+            self.assertEqual(len(queue), 2)
+
     def test_get_invalid_user(self) -> None:
         with patch.object(GraphDatabase, 'driver'), patch.object(Neo4jProxy, '_execute_cypher_query') as mock_execute:
             mock_execute.return_value.single.return_value = None
@@ -0,0 +1,112 @@
+import unittest
+
+from mock import patch, MagicMock
+
+from metadata_service import create_app
+from metadata_service.proxy import write_behind
+from metadata_service.proxy.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app(config_module_class='metadata_service.config.LocalConfig')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+
+    def test_coalesce(self) -> None:
+        flush_fn = MagicMock()
+        queue = WriteBehindQueue(name='test', flush_fn=flush_fn, interval_sec=60, max_size=10)
+
+        self.assertTrue(queue.put(('user', 'table_1'), True))
+        self.assertTrue(queue.put(('user', 'table_2'), True))
+        self.assertTrue(queue.put(('user', 'table_1'), False))
+        self.assertEqual(len(queue), 2)
+
+        queue.flush()
+        flush_fn.assert_called_once_with([(('user', 'table_2'), True), (('user', 'table_1'), False)])
+        self.assertEqual(len(queue), 0)
+
+        # Nothing to flush
+        queue.flush()
+        self.assertEqual(flush_fn.call_count, 1)
+
+    def test_full(self) -> None:
+        queue = WriteBehindQueue(name='test', flush_fn=MagicMock(), interval_sec=60, max_size=1)
+
+        self.assertTrue(queue.put('key_1', True))
+        self.assertFalse(queue.put('key_2', True))
+        # Replacing a pending write doesn't need more room
+        self.assertTrue(queue.put('key_1', False))
+
+    def test_flush_failure(self) -> None:
+        flush_fn = MagicMock(side_effect=RuntimeError('Boom!'))
+        queue = WriteBehindQueue(name='test', flush_fn=flush_fn, interval_sec=60, max_size=10)
+        queue.put('key_1', True)
+        queue.put('key_2', True)
+
+        def replace_during_flush(writes: list) -> None:
+            queue.put('key_1', False)
+            raise RuntimeError('Boom!')
+
+        flush_fn.side_effect = replace_during_flush
+        queue.flush()
+
+        flush_fn.side_effect = None
+        queue.flush()
+        self.assertEqual(sorted(flush_fn.call_args[0][0]), [('key_1', False), ('key_2', True)])
+
+    def test_partial_flush_failure(self) -> None:
+        flush_fn = MagicMock(return_value=[('key_2', True)])
+        queue = WriteBehindQueue(name='test', flush_fn=flush_fn, interval_sec=60, max_size=10)
+        queue.put('key_1', True)
+        queue.put('key_2', True)
+
+        queue.flush()
+        self.assertEqual(list(queue._pending.items()), [('key_2', True)])
+
+        flush_fn.return_value = None
+        queue.flush()
+        flush_fn.assert_called_with([('key_2', True)])
+        self.assertEqual(len(queue), 0)
+
+    def test_synchronous_write(self) -> None:
+        queue = WriteBehindQueue(name='test', flush_fn=MagicMock(), interval_sec=60, max_size=10)
+        queue.put('key_1', True)
+        queue.put('key_2', True)
+
+        with queue.synchronous_write('key_1'):
+            # Waits for the in-flight flush
+            self.assertTrue(queue._flush_lock.locked())
+            self.assertEqual(list(queue._pending), ['key_2'])
+
+        self.assertFalse(queue._flush_lock.locked())
+
+    def test_close(self) -> None:
+        flush_fn = MagicMock()
+        with patch.object(write_behind.atexit, 'register') as mock_register:
+            queue = WriteBehindQueue(name='test', flush_fn=flush_fn, interval_sec=60, max_size=10)
+            queue.start()
+            mock_register.assert_called_once_with(queue.close)
+
+        queue.put('key_1', True)
+        queue.close()
+        flush_fn.assert_called_once_with([('key_1', True)])
+        queue._thread.join(5)
+        self.assertFalse(queue._thread.is_alive())
+
+    def test_metrics(self) -> None:
+        with patch.object(write_behind, '_get_statsd_client') as mock_statsd_client:
+            mock_statsd = mock_statsd_client.return_value
+            queue = WriteBehindQueue(name='test', flush_fn=MagicMock(), interval_sec=60, max_size=10)
+            queue.put('key_1', True)
+            queue.flush()
+
+            mock_statsd.gauge.assert_called_once_with('test.queue_depth', 1)
+            self.assertEqual(mock_statsd.timing.call_args[0][0], 'test.flush')
+
+
+if __name__ == '__main__':
+    unittest.main()